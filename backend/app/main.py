@@ -1,12 +1,42 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional, List, Dict
-from app.services.unusual_whales import get_congress_trades
-from app.services.greek_flow import get_greek_flow, get_greek_descriptions
+from contextlib import asynccontextmanager, suppress
+import asyncio
+from typing import Awaitable, Callable, Optional, List, Dict
+from starlette.responses import Response, StreamingResponse
+from app.responses import (
+    FastJSONResponse,
+    CompressionMiddleware,
+    conditional_response,
+    render_payload,
+    FORMAT_PATTERN
+)
+from app.services.cache import make_key, payload_cache, RESPONSE_CACHE_TTL
+from app.services.persistence import close_pool
+from app.services.scheduler import create_scheduler
+from app.services import snapshot, cache, deadlines, admission, memprofile, trade_store
+from app.services.admission import AdmissionMiddleware
+from app.services.deadlines import DeadlineMiddleware
+from app.services.memprofile import MemoryProfileMiddleware
+from app.services.live import hub
+from app.services.search import MAX_RESULTS, congress_search
+from app.services.projection import parse_fields, project
+from app.services import executors
+from app.services.executors import run_sync
+from app.services.pagination import (
+    get_dataset,
+    paginate,
+    InvalidCursor,
+    SORT_PATTERN,
+    ORDER_PATTERN,
+    MAX_PAGE_SIZE
+)
+from app.services.unusual_whales import get_congress_rows, close_http_client
+from app.services.greek_flow import RangeTooLong, get_greek_flow, get_greek_descriptions
 from app.services.market_tide import get_market_tide
 from app.services.earnings import generate_mock_earnings_data
-from app.services.insider_trading import generate_mock_insider_data
-from app.services.premium_flow import generate_mock_premium_flow, get_sector_descriptions
+from app.services.insider_trading import get_insider_trades
+from app.services.premium_flow import get_premium_flow, get_sector_descriptions
 from app.services.insights import (
     generate_congress_trades_insight,
     generate_greek_flow_insight,
@@ -15,7 +45,40 @@ from app.services.insights import (
     generate_premium_flow_insight
 )
 
-app = FastAPI()
+# Cache-Control policies; every policy revalidates through ETags once stale
+STATIC_CACHE_CONTROL = "public, max-age=86400"
+UPSTREAM_CACHE_CONTROL = f"public, max-age={int(RESPONSE_CACHE_TTL)}"
+LIVE_CACHE_CONTROL = "no-cache"
+
+FIELDS_DESCRIPTION = "Comma-separated row fields to return; omit for every field"
+
+# Server-sent event streams must not be buffered by proxies
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if memprofile.MEMORY_PROFILING:
+        memprofile.start()
+    # Restoring only maps the snapshot; values are decoded on first use
+    snapshot.restore()
+    snapshot_task = asyncio.create_task(snapshot.run_periodic())
+    scheduler = create_scheduler()
+    if scheduler:
+        scheduler.start()
+    app.state.scheduler = scheduler
+    yield
+    if scheduler:
+        await scheduler.stop()
+    await hub.close()
+    snapshot_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await snapshot_task
+    await snapshot.save()
+    await close_http_client()
+    await close_pool()
+    executors.shutdown(wait=False)
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
@@ -26,110 +89,323 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Large flow payloads go out brotli/gzip compressed when the client accepts it
+app.add_middleware(CompressionMiddleware)
+
+# Each budget covers the whole request once it is admitted
+app.add_middleware(DeadlineMiddleware)
+
+# Inside admission, so only admitted requests are profiled
+app.add_middleware(MemoryProfileMiddleware)
+
+# Outermost, so shed requests cost neither a budget nor a task
+app.add_middleware(AdmissionMiddleware)
+
 @app.get("/healthz")
 async def healthz():
     return {"status": "ok"}
 
+@app.get("/api/metrics")
+async def metrics() -> FastJSONResponse:
+    """Get admission, cache, deadline, memory, stream, prewarm, search and trade store counters"""
+    scheduler = app.state.scheduler if hasattr(app.state, "scheduler") else None
+    return FastJSONResponse({
+        "admission": admission.get_stats(),
+        "caches": cache.get_stats(),
+        "deadlines": deadlines.get_stats(),
+        "live": hub.get_status(),
+        "memory": memprofile.get_stats(),
+        "prewarm": scheduler.get_status() if scheduler else [],
+        "search": congress_search.get_stats(),
+        "trades": trade_store.get_stats()
+    })
+
+def render_page(
+    dataset,
+    sort: str,
+    order: str,
+    limit: Optional[int],
+    cursor: Optional[str],
+    fields: Optional[str]
+) -> FastJSONResponse:
+    """Render one page of a dataset, rejecting cursors from another sort"""
+    try:
+        return FastJSONResponse(paginate(dataset, sort, order, limit, cursor, parse_fields(fields)))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def cached_payload(key: str, build: Callable[[], Awaitable[Dict]]) -> Dict:
+    """Get a chart route's payload, building it at most once per response TTL
+
+    Upstream responses are cached for as long, so the payload could not be
+    fresher. The same object comes back until it expires, which lets
+    conditional_response answer revalidations without serializing it.
+    """
+    payload = payload_cache.get(key)
+    if payload is None:
+        payload = await build()
+        payload_cache.set(key, payload)
+    return payload
+
 @app.get("/api/congress/trades")
 async def congress_trades(
+    request: Request,
     ticker: Optional[str] = Query(None, description="Filter by stock ticker"),
     congress_member: Optional[str] = Query(None, description="Filter by congress member name"),
+    sector: Optional[str] = Query(None, description="Filter by the traded ticker's sector"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
-) -> Dict:
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    sort: str = Query("date", pattern=SORT_PATTERN, description="Sort key: 'date', 'amount' or 'ticker'"),
+    order: str = Query("desc", pattern=ORDER_PATTERN, description="Sort order: 'asc' or 'desc'"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit for every row"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+) -> Response:
     """Get recent congress trades with optional filtering"""
     try:
-        return await get_congress_trades(ticker, congress_member, start_date, end_date)
+        rows = await get_congress_rows(ticker, congress_member, start_date, end_date, sector)
+        dataset = await run_sync(
+            get_dataset,
+            make_key("congress_trades", ticker, congress_member, sector, start_date, end_date),
+            rows,
+            lambda rows: {"insight": generate_congress_trades_insight(rows)}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # The dataset is rebuilt only when the rows change, so each page's
+    # rendered body is reused for as long as the dataset version lives
+    return conditional_response(
+        request,
+        lambda: render_page(dataset, sort, order, limit, cursor, fields),
+        UPSTREAM_CACHE_CONTROL,
+        key=make_key("congress_trades", ticker, congress_member, sector, start_date, end_date, sort, order, limit, cursor, fields),
+        source=dataset
+    )
+
+@app.get("/api/congress/search")
+async def congress_search_names(
+    q: str = Query(..., min_length=1, description="Partial or misspelled member name, ticker or company name"),
+    kind: Optional[str] = Query(None, pattern="^(member|ticker)$", description="Only 'member' or 'ticker' results"),
+    limit: int = Query(10, ge=1, le=MAX_RESULTS, description="Most results to return")
+) -> FastJSONResponse:
+    """Suggest congress members and tickers for the trades filters, most active first"""
+    if not congress_search:
+        # Nothing ingested yet; the recent trades seed the index
+        try:
+            await get_congress_rows()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    return FastJSONResponse({"query": q, "results": congress_search.search(q, limit, kind)})
 
 @app.get("/api/greek-flow/data")
 async def greek_flow_data(
+    request: Request,
     ticker: str = Query(..., description="Stock ticker (required)"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
-) -> Dict:
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    format: str = Query("row", pattern=FORMAT_PATTERN, description="Response format: 'row', 'columnar' or 'msgpack'"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+) -> Response:
     """Get Greek flow data with optional filtering"""
+    async def build() -> Dict:
+        payload = await get_greek_flow(ticker, start_date, end_date)
+        return {**payload, "data": project(payload["data"], parse_fields(fields))}
+
     try:
-        return await get_greek_flow(ticker, start_date, end_date)
+        payload = await cached_payload(make_key("greek_flow", ticker, start_date, end_date, fields), build)
+    except RangeTooLong as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return conditional_response(
+        request,
+        lambda: render_payload(payload, format),
+        LIVE_CACHE_CONTROL,
+        key=make_key("greek_flow", ticker, start_date, end_date, fields, format),
+        source=payload
+    )
 
 @app.get("/api/greek-flow/descriptions")
-async def greek_descriptions() -> Dict[str, str]:
+async def greek_descriptions(request: Request) -> Response:
     """Get descriptions of Greek metrics for tooltips"""
-    return get_greek_descriptions()
+    return conditional_response(
+        request,
+        lambda: FastJSONResponse(get_greek_descriptions()),
+        STATIC_CACHE_CONTROL,
+        key="greek_descriptions"
+    )
 
 @app.get("/api/earnings/data")
 async def earnings_data(
     sector: Optional[str] = Query(None, description="Filter by sector"),
     surprise_type: Optional[str] = Query(None, description="Filter by surprise type (positive/negative)"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
-) -> Dict:
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+) -> FastJSONResponse:
     """Get earnings data with optional filtering"""
     try:
-        data = generate_mock_earnings_data(sector, surprise_type, start_date, end_date)
-        return {
-            "data": data,
-            "insight": generate_earnings_insight(data)
-        }
+        data = await run_sync(generate_mock_earnings_data, sector, surprise_type, start_date, end_date)
+        return FastJSONResponse({
+            "data": project(data, parse_fields(fields)),
+            "insight": await run_sync(generate_earnings_insight, data)
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/insider-trading/data")
 async def insider_trading_data(
+    request: Request,
     insider_role: Optional[str] = Query(None, description="Filter by insider role (e.g., CEO, CFO)"),
     trade_type: Optional[str] = Query(None, description="Filter by trade type (buy/sell)"),
+    sector: Optional[str] = Query(None, description="Filter by sector"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
-) -> Dict:
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    sort: str = Query("date", pattern=SORT_PATTERN, description="Sort key: 'date', 'amount' or 'ticker'"),
+    order: str = Query("desc", pattern=ORDER_PATTERN, description="Sort order: 'asc' or 'desc'"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit for every row"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+) -> Response:
     """Get insider trading data with optional filtering"""
     try:
-        data = generate_mock_insider_data(insider_role, trade_type, start_date, end_date)
-        return {
-            "data": data,
-            "insight": generate_insider_trading_insight(data)
-        }
+        rows = await get_insider_trades(insider_role, trade_type, start_date, end_date, sector)
+        dataset = await run_sync(
+            get_dataset,
+            make_key("insider_trades", insider_role, trade_type, sector, start_date, end_date),
+            rows,
+            lambda rows: {"insight": generate_insider_trading_insight(rows)}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return conditional_response(
+        request,
+        lambda: render_page(dataset, sort, order, limit, cursor, fields),
+        LIVE_CACHE_CONTROL,
+        key=make_key("insider_trades", insider_role, trade_type, sector, start_date, end_date, sort, order, limit, cursor, fields),
+        source=dataset
+    )
+
+async def premium_flow_payload(
+    option_type: Optional[str],
+    sector: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    lookback_days: int,
+    is_intraday: bool,
+    fields: Optional[str] = None
+) -> Dict:
+    """Build the premium flow payload shared by the data and stream routes"""
+    fields = parse_fields(fields)
+    data, historical_stats = await get_premium_flow(
+        option_type, sector, start_date, end_date, lookback_days, is_intraday, fields
+    )
+    return {
+        "data": project(data, fields),
+        "historical_stats": historical_stats,
+        "insight": await run_sync(generate_premium_flow_insight, data, historical_stats, is_intraday)
+    }
 
 @app.get("/api/premium-flow/data")
 async def premium_flow_data(
+    request: Request,
     option_type: Optional[str] = Query(None, description="Filter by option type (call/put)"),
     sector: Optional[str] = Query(None, description="Filter by sector"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     lookback_days: int = Query(30, description="Number of days to look back for historical comparison"),
-    is_intraday: bool = Query(False, description="Use intraday granularity")
-) -> Dict:
+    is_intraday: bool = Query(False, description="Use intraday granularity"),
+    format: str = Query("row", pattern=FORMAT_PATTERN, description="Response format: 'row', 'columnar' or 'msgpack'"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+) -> Response:
     """Get premium flow data with optional filtering and historical context"""
+    query = (option_type, sector, start_date, end_date, lookback_days, is_intraday, fields)
     try:
-        data, historical_stats = generate_mock_premium_flow(
-            option_type, sector, start_date, end_date, lookback_days, is_intraday
+        payload = await cached_payload(
+            make_key("premium_flow", *query),
+            lambda: premium_flow_payload(*query)
         )
-        return {
-            "data": data,
-            "historical_stats": historical_stats,
-            "insight": generate_premium_flow_insight(data, historical_stats, is_intraday)
-        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return conditional_response(
+        request,
+        lambda: render_payload(payload, format),
+        LIVE_CACHE_CONTROL,
+        key=make_key("premium_flow", *query, format),
+        source=payload
+    )
+
+@app.get("/api/premium-flow/stream")
+async def premium_flow_stream(
+    option_type: Optional[str] = Query(None, description="Filter by option type (call/put)"),
+    sector: Optional[str] = Query(None, description="Filter by sector"),
+    lookback_days: int = Query(30, description="Number of days to look back for historical comparison"),
+    is_intraday: bool = Query(True, description="Use intraday granularity")
+) -> StreamingResponse:
+    """Stream today's premium flow as server-sent snapshot and delta events"""
+    params = {"option_type": option_type, "sector": sector, "lookback_days": lookback_days, "is_intraday": is_intraday}
+    return StreamingResponse(
+        hub.stream(
+            "premium_flow",
+            params,
+            lambda: premium_flow_payload(option_type, sector, None, None, lookback_days, is_intraday),
+            lambda row: (row["date"], row.get("timestamp", ""))
+        ),
+        media_type="text/event-stream",
+        headers=STREAM_HEADERS
+    )
 
 @app.get("/api/market-tide/data")
 async def market_tide_data(
+    request: Request,
     date: Optional[str] = Query(None, description="Target date (YYYY-MM-DD)"),
     interval_5m: bool = Query(False, description="Use 5-minute intervals instead of 1-minute"),
     lookback_days: int = Query(30, description="Number of days to look back for historical comparison"),
-    granularity: str = Query("minute", description="Data granularity: 'minute' or 'daily'")
-) -> Dict:
+    granularity: str = Query("minute", description="Data granularity: 'minute' or 'daily'"),
+    format: str = Query("row", pattern=FORMAT_PATTERN, description="Response format: 'row', 'columnar' or 'msgpack'"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+) -> Response:
     """Get market-wide options flow data with historical context"""
+    query = (date, interval_5m, lookback_days, granularity, fields)
     try:
-        return await get_market_tide(date, interval_5m, lookback_days, granularity)
+        payload = await cached_payload(
+            make_key("market_tide", *query),
+            lambda: get_market_tide(date, interval_5m, lookback_days, granularity, parse_fields(fields))
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return conditional_response(
+        request,
+        lambda: render_payload(payload, format),
+        LIVE_CACHE_CONTROL,
+        key=make_key("market_tide", *query, format),
+        source=payload
+    )
+
+@app.get("/api/market-tide/stream")
+async def market_tide_stream(
+    interval_5m: bool = Query(False, description="Use 5-minute intervals instead of 1-minute"),
+    lookback_days: int = Query(30, description="Number of days to look back for historical comparison")
+) -> StreamingResponse:
+    """Stream today's market tide as server-sent snapshot and delta events"""
+    params = {"interval_5m": interval_5m, "lookback_days": lookback_days}
+    return StreamingResponse(
+        hub.stream(
+            "market_tide",
+            params,
+            lambda: get_market_tide(None, interval_5m, lookback_days, "minute"),
+            lambda row: row["timestamp"]
+        ),
+        media_type="text/event-stream",
+        headers=STREAM_HEADERS
+    )
 
 @app.get("/api/premium-flow/sectors")
-async def sector_descriptions() -> Dict[str, str]:
+async def sector_descriptions(request: Request) -> Response:
     """Get descriptions of sectors for tooltips"""
-    return get_sector_descriptions()
+    return conditional_response(
+        request,
+        lambda: FastJSONResponse(get_sector_descriptions()),
+        STATIC_CACHE_CONTROL,
+        key="sector_descriptions"
+    )
@@ -0,0 +1,247 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import gzip
+import hashlib
+import json
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.services.cache import TTLCache
+from app.services.columnar import to_columnar
+from app.services import memprofile
+from app.services.records import to_plain
+from app.settings import get_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+# Values accepted by the format= query parameter on chart endpoints
+RESPONSE_FORMATS = ("row", "columnar", "msgpack")
+FORMAT_PATTERN = f"^({'|'.join(RESPONSE_FORMATS)})$"
+
+def dumps(content: Any) -> bytes:
+    """Serialize straight to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, default=to_plain, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=to_plain, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+class FastJSONResponse(Response):
+    """JSON response that skips FastAPI's jsonable_encoder walk
+
+    Routes return this directly, so FastAPI hands it through untouched and
+    the payload is serialized exactly once.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class MsgpackResponse(Response):
+    """Binary MessagePack response for clients that opt in with format=msgpack"""
+
+    media_type = "application/x-msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=to_plain, use_bin_type=True)
+
+def render_payload(payload: Dict, format: str = "row") -> Response:
+    """Render a {"data": rows, ...} payload in the requested format
+
+    "row" is the default list of dicts; "columnar" replaces the rows with
+    parallel arrays and dictionary-encoded categoricals; "msgpack" is the
+    columnar payload in MessagePack.
+    """
+    with memprofile.stage("render", len(payload.get("data", []))):
+        if format == "row":
+            return FastJSONResponse(payload)
+        payload = {**payload, "data": to_columnar(payload.get("data", []))}
+        if format == "columnar":
+            return FastJSONResponse(payload)
+        if msgpack is None:
+            raise HTTPException(status_code=406, detail="msgpack format is not available on this server")
+        return MsgpackResponse(payload)
+
+# Rendered bodies by route key: key -> (source, body, media_type, etag).
+# An entry is reused only while the route's source object (typically a value
+# held in response_cache) is the very same object it was rendered from.
+rendered_cache = TTLCache(None)
+
+_UNSET = object()
+
+def make_etag(body: bytes) -> str:
+    """Build a strong ETag from a response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, and also
+    accepts the per-encoding variants CompressionMiddleware hands out.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[1:-1]
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        if candidate == opaque or candidate.rsplit("-", 1)[0] == opaque:
+            return True
+    return False
+
+def conditional_response(
+    request: Request,
+    build: Callable[[], Response],
+    cache_control: str,
+    key: Optional[str] = None,
+    source: Any = _UNSET
+) -> Response:
+    """Answer a GET with an ETag, or a bodiless 304 when the client has it
+
+    build() renders the full response. With a key, the rendered body is
+    memoized and reused while source is the same object, so a client
+    revalidating unchanged data costs neither serialization nor compression.
+    """
+    entry = rendered_cache.get(key) if key is not None else None
+    if entry is None or entry[0] is not source:
+        response = build()
+        entry = (source, response.body, response.media_type, make_etag(response.body))
+        if key is not None:
+            rendered_cache.set(key, entry)
+    _, body, media_type, etag = entry
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        # CompressionMiddleware tags the 304 as it would have tagged this body
+        request.state.full_body_size = len(body)
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported content-coding from an Accept-Encoding header"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best = max(candidates, key=lambda c: accepted.get(c, accepted.get("*", 0.0)))
+    if accepted.get(best, accepted.get("*", 0.0)) <= 0:
+        return None
+    return best
+
+def compress(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    """Compress a body with the negotiated content-coding"""
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+def tag_encoded(headers: MutableHeaders, encoding: str) -> None:
+    """Mark a response as the encoded representation
+
+    A strong ETag names one representation, so the encoded one gets its own.
+    """
+    if headers.get("etag", "").endswith('"'):
+        headers["ETag"] = headers["etag"][:-1] + f'-{encoding}"'
+    headers.add_vary_header("Accept-Encoding")
+
+class CompressionMiddleware:
+    """Compress buffered responses with brotli or gzip above a size threshold
+
+    Streaming responses (anything sent in more than one body message, such as
+    server-sent events) and already-encoded responses pass through untouched.
+    A 304 from conditional_response gets the ETag and Vary header its full
+    body would have been sent with, as RFC 9110 requires.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        gzip_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None
+    ):
+        settings = get_settings()
+        self.app = app
+        self.minimum_size = settings.compression_minimum_size if minimum_size is None else minimum_size
+        self.gzip_level = settings.gzip_level if gzip_level is None else gzip_level
+        self.brotli_quality = settings.brotli_quality if brotli_quality is None else brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if start["status"] == 304:
+                full_body_size = scope.get("state", {}).get("full_body_size")
+                if (
+                    full_body_size is not None
+                    and full_body_size >= self.minimum_size
+                    and "content-encoding" not in headers
+                ):
+                    tag_encoded(headers, encoding)
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            tag_encoded(headers, encoding)
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,234 @@
+from typing import Deque, Dict, Optional
+from collections import deque
+from contextvars import ContextVar
+import asyncio
+import logging
+import math
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.responses import dumps
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_CONCURRENCY = get_settings().admission_concurrency
+TARGET_DELAY = get_settings().admission_target_delay
+INTERVAL = get_settings().admission_interval
+MAX_QUEUE_TIME = get_settings().admission_max_queue_time
+
+# Concurrent requests per route; the CPU-heavy mock routes get fewer slots.
+# ROUTE_CONCURRENCY in the environment overrides these
+ROUTE_CONCURRENCY: Dict[str, int] = {
+    "/api/premium-flow/data": 8,
+    "/api/earnings/data": 8,
+    "/api/insider-trading/data": 8,
+    **{path: int(limit) for path, limit in get_settings().route_concurrency.items()}
+}
+
+# Routes that, once shed, are still answered from cached upstream data with
+# the local insight instead of a 503
+DEGRADABLE_PATHS = {"/api/market-tide/data", "/api/greek-flow/data", "/api/congress/trades"}
+
+# Routes that are never queued or shed: health checks and long-lived streams
+EXEMPT_PATHS = {"/healthz"}
+EXEMPT_SUFFIXES = ("/stream",)
+
+_degraded: ContextVar[bool] = ContextVar("admission_degraded", default=False)
+
+class RequestShed(BaseException):
+    """Raised when a degraded request needs work beyond cached data
+
+    Derives from BaseException so the services' mock-data fallbacks let it
+    through to AdmissionMiddleware, which answers 503.
+    """
+
+def is_degraded() -> bool:
+    """Check whether the current request may only use cached data"""
+    return _degraded.get()
+
+def require_capacity() -> None:
+    """Checkpoint before upstream or LLM work; raises in degraded requests"""
+    if _degraded.get():
+        raise RequestShed()
+
+class RouteLimiter:
+    """Concurrency limit with a queue-delay based shedding policy
+
+    Requests beyond the limit wait in FIFO order for up to max_queue_time.
+    Once every request has waited longer than target_delay for a whole
+    interval, the queue is standing rather than absorbing a burst, and new
+    arrivals only wait target_delay before being shed. The first request
+    admitted within target_delay ends the overload.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        target_delay: float = TARGET_DELAY,
+        interval: float = INTERVAL,
+        max_queue_time: float = MAX_QUEUE_TIME
+    ):
+        self.limit = limit
+        self.target_delay = target_delay
+        self.interval = interval
+        self.max_queue_time = max_queue_time
+        self.active = 0
+        self.degraded_active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.overloaded = False
+        self._above_target_until: Optional[float] = None
+        self.admitted = 0
+        self.shed = 0
+        self.degraded = 0
+
+    async def acquire(self) -> bool:
+        """Wait for a slot; False means the request should be shed"""
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            self._record_delay(0.0)
+            return True
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        started = time.monotonic()
+        timeout = self.target_delay if self.overloaded else self.max_queue_time
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:
+            # The client went away while queued; pass on a slot it was handed
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        if not waiter.done():
+            waiter.cancel()
+            self._record_delay(time.monotonic() - started)
+            self.shed += 1
+            return False
+        self._record_delay(time.monotonic() - started)
+        return True
+
+    def release(self) -> None:
+        """Hand the slot to the oldest waiter, or free it"""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait before retrying"""
+        return max(1, math.ceil(self.max_queue_time))
+
+    def _record_delay(self, delay: float) -> None:
+        now = time.monotonic()
+        if delay <= self.target_delay:
+            self._above_target_until = None
+            if self.overloaded:
+                logger.info("Admission queue drained")
+            self.overloaded = False
+            return
+        if self._above_target_until is None:
+            self._above_target_until = now + self.interval
+        elif now >= self._above_target_until and not self.overloaded:
+            logger.warning("Admission queue standing above %.2fs, shedding early", self.target_delay)
+            self.overloaded = True
+
+# Limiters by route path, created on first request
+limiters: Dict[str, RouteLimiter] = {}
+
+def get_limiter(path: str) -> RouteLimiter:
+    """Get the limiter for a route"""
+    if path not in limiters:
+        limiters[path] = RouteLimiter(
+            ROUTE_CONCURRENCY.get(path, ADMISSION_CONCURRENCY), TARGET_DELAY, INTERVAL, MAX_QUEUE_TIME
+        )
+    return limiters[path]
+
+def get_stats() -> Dict[str, Dict]:
+    """Get admission counters by route"""
+    return {
+        path: {
+            "limit": limiter.limit,
+            "active": limiter.active,
+            "queued": len(limiter.waiters),
+            "overloaded": limiter.overloaded,
+            "admitted": limiter.admitted,
+            "degraded": limiter.degraded,
+            "shed": limiter.shed
+        }
+        for path, limiter in limiters.items()
+    }
+
+async def send_unavailable(send: Send, retry_after: int) -> None:
+    """Answer 503 with Retry-After"""
+    body = dumps({"detail": "Server busy, retry shortly"})
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode())
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class AdmissionMiddleware:
+    """Limit concurrent requests per route and shed the excess quickly
+
+    A shed request to a degradable route is still served, but only from
+    cached upstream data with the local insight; anything that would need an
+    upstream or LLM call gets a 503 with Retry-After instead.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._route_paths: Optional[set] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path in EXEMPT_PATHS or path.endswith(EXEMPT_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        # Unknown paths (404s) share one limiter so they cannot grow the table
+        if self._route_paths is None and "app" in scope:
+            self._route_paths = {getattr(route, "path", None) for route in scope["app"].routes}
+        if self._route_paths is not None and path not in self._route_paths:
+            path = "*"
+        limiter = get_limiter(path)
+        if await limiter.acquire():
+            limiter.admitted += 1
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                limiter.release()
+            return
+
+        if path not in DEGRADABLE_PATHS or limiter.degraded_active >= limiter.limit:
+            await send_unavailable(send, limiter.retry_after())
+            return
+
+        started = False
+
+        async def send_degraded(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                message = {**message, "headers": [*message.get("headers", []), (b"x-degraded", b"1")]}
+            await send(message)
+
+        limiter.degraded_active += 1
+        token = _degraded.set(True)
+        try:
+            await self.app(scope, receive, send_degraded)
+            limiter.degraded += 1
+        except RequestShed:
+            if not started:
+                await send_unavailable(send, limiter.retry_after())
+        finally:
+            _degraded.reset(token)
+            limiter.degraded_active -= 1
@@ -0,0 +1,79 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from functools import lru_cache
+import re
+
+class AmountRange(NamedTuple):
+    """A disclosed dollar range; high is None for open-ended bands such as "Over $50,000,000" """
+
+    low: float
+    high: Optional[float]
+    mid: float
+
+# What unparseable amounts count as, as the old float-only parser did
+UNKNOWN = AmountRange(0.0, 0.0, 0.0)
+
+# Bands congress periodic transaction reports disclose amounts in
+STANDARD_BANDS = [
+    (1_001, 15_000),
+    (15_001, 50_000),
+    (50_001, 100_000),
+    (100_001, 250_000),
+    (250_001, 500_000),
+    (500_001, 1_000_000),
+    (1_000_001, 5_000_000),
+    (5_000_001, 25_000_000),
+    (25_000_001, 50_000_000),
+    (50_000_001, None)
+]
+
+def _label(low: int, high: Optional[int]) -> str:
+    return f"${low:,} - ${high:,}" if high is not None else f"Over ${low - 1:,}"
+
+def _band(low: float, high: Optional[float]) -> AmountRange:
+    # Open-ended bands count at their floor
+    return AmountRange(low, high, low if high is None else (low + high) / 2)
+
+# Exact disclosure strings, so the common case is one dict lookup
+BANDS: Dict[str, AmountRange] = {
+    _label(low, high): _band(float(low), None if high is None else float(high)) for low, high in STANDARD_BANDS
+}
+
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+@lru_cache(maxsize=4096)
+def _parse_nonstandard(text: str) -> AmountRange:
+    """Parse "$X - $Y", "$X", "Over $X" and "$X +" in any spacing; anything else is UNKNOWN"""
+    numbers = [float(number.replace(",", "")) for number in _NUMBER.findall(text)]
+    if len(numbers) == 2:
+        return _band(numbers[0], numbers[1])
+    if len(numbers) == 1:
+        if text.lstrip().lower().startswith("over") or text.rstrip().endswith("+"):
+            return _band(numbers[0], None)
+        return _band(numbers[0], numbers[0])
+    return UNKNOWN
+
+def parse_amount(value: Any) -> AmountRange:
+    """Parse one disclosed amount, a band string or a plain number"""
+    if isinstance(value, str):
+        return BANDS.get(value) or _parse_nonstandard(value)
+    if isinstance(value, (int, float)):
+        return AmountRange(float(value), float(value), float(value))
+    return UNKNOWN
+
+def parse_amounts(values: Iterable[Any]) -> List[AmountRange]:
+    """Parse a column of disclosed amounts in one pass"""
+    get = BANDS.get
+    parse = _parse_nonstandard
+    return [
+        (get(value) or parse(value)) if isinstance(value, str) else parse_amount(value)
+        for value in values
+    ]
+
+def total_range(ranges: Iterable[AmountRange]) -> Dict[str, Optional[float]]:
+    """Sum ranges into the least and most the trades can add up to; max is None if any band is open-ended"""
+    low = 0.0
+    high: Optional[float] = 0.0
+    for amount in ranges:
+        low += amount.low
+        high = None if high is None or amount.high is None else high + amount.high
+    return {"min": low, "max": high}
@@ -0,0 +1,346 @@
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import uuid
+from app.services.executors import run_sync
+from app.settings import get_settings
+
+RESPONSE_CACHE_TTL = get_settings().response_cache_ttl
+INSIGHT_CACHE_TTL = get_settings().insight_cache_ttl
+CACHE_MAX_ENTRIES = get_settings().cache_max_entries
+PARTITION_CACHE_MAX_ENTRIES = get_settings().partition_cache_max_entries
+CACHE_BACKEND = get_settings().cache_backend
+# Longest a worker keeps its own copy of a shared entry before re-reading it
+CACHE_LOCAL_TTL = get_settings().cache_local_ttl
+# Single-flight locks expire on their own if the holder dies mid-fill
+LOCK_TTL = get_settings().cache_lock_ttl
+LOCK_POLL_INTERVAL = 0.05
+LOCK_POLL_MAX_INTERVAL = 0.5
+
+# Set while a background refresh runs so cache reads are skipped and the
+# fresh result replaces the cached one
+_refreshing: ContextVar[bool] = ContextVar("cache_refreshing", default=False)
+
+_DEFAULT_TTL = object()
+
+class TTLCache:
+    """In-process LRU cache with per-entry expiry
+
+    Safe to use from the service thread pool as well as the event loop.
+    """
+
+    def __init__(self, default_ttl: Optional[float], max_entries: int = CACHE_MAX_ENTRIES):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        # key -> (expires_at or None for no expiry, value)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Optional lookup for keys not in memory, e.g. a restored snapshot
+        self._fallback: Optional[Callable[[str], Optional[tuple]]] = None
+        # Keys deleted since the fallback was attached, which it must not bring back
+        self._deleted: set = set()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        # Lock name -> (token, expires_at), for single-flight within this process
+        self._locks: Dict[str, Tuple[str, float]] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= time.time():
+                self._entries.pop(key, None)
+                entry = None
+        if entry is None:
+            entry = self._load(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            self.hits += 1
+            return value
+
+    def _load(self, key: str) -> Optional[tuple]:
+        """Look up (expires_at, value) for a key not held in memory"""
+        if self.from_fallback(key):
+            return self._fallback(key)
+        return None
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def set(self, key: str, value: Any, ttl: Any = _DEFAULT_TTL) -> None:
+        """Store a value; ttl=None never expires, omitting it uses default_ttl"""
+        if ttl is _DEFAULT_TTL:
+            ttl = self.default_ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._deleted.discard(key)
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def attach_fallback(self, loader: Optional[Callable[[str], Optional[tuple]]]) -> None:
+        """Consult loader(key) -> (expires_at, value) on misses, or detach with None"""
+        with self._lock:
+            self._fallback = loader
+            self._deleted.clear()
+
+    def from_fallback(self, key: str) -> bool:
+        """Check whether the fallback may answer for a key: attached, and the key not deleted since"""
+        return self._fallback is not None and key not in self._deleted
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present, including any copy in the fallback"""
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._fallback is not None:
+                self._deleted.add(key)
+
+    def clear(self) -> None:
+        """Remove every entry, detaching the fallback"""
+        with self._lock:
+            self._entries.clear()
+            self._fallback = None
+            self._deleted.clear()
+
+    def items(self) -> Iterator[tuple]:
+        """Iterate over (key, expires_at, value) for every live entry"""
+        now = time.time()
+        with self._lock:
+            entries = list(self._entries.items())
+        for key, (expires_at, value) in entries:
+            if expires_at is None or expires_at > now:
+                yield key, expires_at, value
+
+    def try_lock(self, name: str, ttl: float) -> Optional[str]:
+        """Take a named lock for up to ttl seconds; returns a token, or None if held"""
+        now = time.time()
+        with self._lock:
+            held = self._locks.get(name)
+            if held is not None and held[1] > now:
+                return None
+            token = uuid.uuid4().hex
+            self._locks[name] = (token, now + ttl)
+            return token
+
+    def unlock(self, name: str, token: str) -> None:
+        """Release a lock if it is still held with this token"""
+        with self._lock:
+            held = self._locks.get(name)
+            if held is not None and held[0] == token:
+                del self._locks[name]
+
+    # Coroutine versions for the event loop. Memory entries are read in place;
+    # SharedCache sends what reaches its backend to the thread pool instead.
+    async def get_async(self, key: str) -> Optional[Any]:
+        return self.get(key)
+
+    async def set_async(self, key: str, value: Any, ttl: Any = _DEFAULT_TTL) -> None:
+        self.set(key, value, ttl)
+
+    async def try_lock_async(self, name: str, ttl: float) -> Optional[str]:
+        return self.try_lock(name, ttl)
+
+    async def unlock_async(self, name: str, token: str) -> None:
+        self.unlock(name, token)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SharedCache(TTLCache):
+    """TTLCache in front of a backend shared by every worker process
+
+    Reads go to the local entries first and then to the backend; writes go to
+    both. Local copies live for at most local_ttl, so an entry refreshed by
+    another worker is seen within that time while repeated reads of the same
+    key within one request still return the same object. Locks live in the
+    backend so single-flight works across processes and machines.
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        default_ttl: Optional[float],
+        local_ttl: float = CACHE_LOCAL_TTL,
+        max_entries: int = CACHE_MAX_ENTRIES
+    ):
+        super().__init__(default_ttl, max_entries)
+        self.backend = backend
+        self.local_ttl = local_ttl
+
+    def _local_expiry(self, expires_at: Optional[float]) -> float:
+        local_expires_at = time.time() + self.local_ttl
+        return local_expires_at if expires_at is None else min(expires_at, local_expires_at)
+
+    def _load(self, key: str) -> Optional[tuple]:
+        entry = self.backend.get(key)
+        if entry is None:
+            return super()._load(key)
+        expires_at, value = entry
+        return self._local_expiry(expires_at), value
+
+    def set(self, key: str, value: Any, ttl: Any = _DEFAULT_TTL) -> None:
+        """Store a value locally and in the backend"""
+        if ttl is _DEFAULT_TTL:
+            ttl = self.default_ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        self.backend.set(key, expires_at, value)
+        with self._lock:
+            self._deleted.discard(key)
+            self._entries[key] = (self._local_expiry(expires_at), value)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        """Remove a key locally and from the backend"""
+        super().delete(key)
+        self.backend.delete(key)
+
+    def clear(self) -> None:
+        """Remove every entry locally and from the backend"""
+        super().clear()
+        self.backend.clear()
+
+    def try_lock(self, name: str, ttl: float) -> Optional[str]:
+        return self.backend.try_lock(name, ttl)
+
+    def unlock(self, name: str, token: str) -> None:
+        self.backend.unlock(name, token)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """get that waits on the backend in the thread pool, never on the event loop"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.time()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        return await run_sync(self.get, key)
+
+    async def set_async(self, key: str, value: Any, ttl: Any = _DEFAULT_TTL) -> None:
+        await run_sync(self.set, key, value, ttl)
+
+    async def try_lock_async(self, name: str, ttl: float) -> Optional[str]:
+        return await run_sync(self.try_lock, name, ttl)
+
+    async def unlock_async(self, name: str, token: str) -> None:
+        await run_sync(self.unlock, name, token)
+
+def build_cache(name: str, default_ttl: Optional[float]) -> TTLCache:
+    """Build a cache on the backend chosen by CACHE_BACKEND: memory, sqlite or network"""
+    if CACHE_BACKEND == "memory":
+        return TTLCache(default_ttl)
+    from app.services.cache_backends import build_backend
+
+    return SharedCache(build_backend(CACHE_BACKEND, name), default_ttl)
+
+def _lock_waits(wait: Optional[float]) -> Iterator[float]:
+    """Yield growing poll delays until wait seconds have passed"""
+    give_up_at = time.monotonic() + (LOCK_TTL if wait is None else wait)
+    delay = LOCK_POLL_INTERVAL
+    while time.monotonic() < give_up_at:
+        yield min(delay, max(give_up_at - time.monotonic(), 0.0))
+        delay = min(delay * 2, LOCK_POLL_MAX_INTERVAL)
+
+@asynccontextmanager
+async def single_flight(cache: TTLCache, key: str, wait: Optional[float] = None) -> AsyncIterator[bool]:
+    """Let one caller at a time, across workers, fill a cache key
+
+    Callers should re-check the cache inside the block, since whoever held
+    the lock before them has usually just filled it. A holder that takes
+    longer than wait seconds is not waited for; the block then runs
+    uncoordinated and yields False.
+    """
+    name = f"flight:{key}"
+    token = await cache.try_lock_async(name, LOCK_TTL)
+    if token is None:
+        for delay in _lock_waits(wait):
+            await asyncio.sleep(delay)
+            token = await cache.try_lock_async(name, LOCK_TTL)
+            if token is not None:
+                break
+    try:
+        yield token is not None
+    finally:
+        if token is not None:
+            await cache.unlock_async(name, token)
+
+@contextmanager
+def single_flight_sync(cache: TTLCache, key: str, wait: Optional[float] = None) -> Iterator[bool]:
+    """single_flight for blocking code running in the thread pool"""
+    name = f"flight:{key}"
+    token = cache.try_lock(name, LOCK_TTL)
+    if token is None:
+        for delay in _lock_waits(wait):
+            time.sleep(delay)
+            token = cache.try_lock(name, LOCK_TTL)
+            if token is not None:
+                break
+    try:
+        yield token is not None
+    finally:
+        if token is not None:
+            cache.unlock(name, token)
+
+def make_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serializable parts"""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+def is_refreshing() -> bool:
+    """Check whether cache reads should be bypassed in the current context"""
+    return _refreshing.get()
+
+@contextmanager
+def refreshing() -> Iterator[None]:
+    """Bypass cache reads for work done inside the block"""
+    token = _refreshing.set(True)
+    try:
+        yield
+    finally:
+        _refreshing.reset(token)
+
+def get_stats() -> Dict[str, Dict[str, int]]:
+    """Get entry and hit counts for the shared caches"""
+    return {
+        name: {"entries": len(cache), "hits": cache.hits, "misses": cache.misses}
+        for name, cache in CACHES.items()
+    }
+
+# Upstream API responses, keyed by endpoint and params; shared between
+# workers when CACHE_BACKEND is not memory
+response_cache = build_cache("responses", RESPONSE_CACHE_TTL)
+
+# Generated insights, keyed by the data and context they were generated from
+insight_cache = build_cache("insights", INSIGHT_CACHE_TTL)
+
+# Per-(ticker, trading day) data partitions; closed days never expire
+partition_cache = TTLCache(None, max_entries=PARTITION_CACHE_MAX_ENTRIES)
+
+# Built chart payloads by route and query, kept for as long as the upstream
+# responses they come from. Local to the worker, since conditional responses
+# recognise an unchanged payload by identity
+payload_cache = TTLCache(RESPONSE_CACHE_TTL)
+
+# Shared caches by name, as used in stats and snapshots
+CACHES: Dict[str, TTLCache] = {
+    "responses": response_cache,
+    "insights": insight_cache,
+    "partitions": partition_cache
+}
@@ -0,0 +1,244 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+import importlib
+import json
+import threading
+import time
+import uuid
+from app.settings import get_settings
+
+CACHE_PATH = get_settings().cache_path
+CACHE_NETWORK_CLIENT = get_settings().cache_network_client
+
+# Expired rows are swept after this many writes rather than on every write
+PRUNE_EVERY = 256
+# Memory-map this much of the database file so reads skip the read() syscall
+MMAP_SIZE = 256 * 1024 * 1024
+
+def encode_entry(expires_at: Optional[float], value: Any) -> bytes:
+    """Serialize an entry for a backend that stores bytes"""
+    return json.dumps([expires_at, value], separators=(",", ":")).encode()
+
+def decode_entry(raw: bytes) -> Tuple[Optional[float], Any]:
+    """Deserialize an entry written by encode_entry"""
+    expires_at, value = json.loads(raw)
+    return expires_at, value
+
+class SQLiteBackend:
+    """Cache entries and locks in a local SQLite file shared by every worker
+
+    Each thread gets its own connection. The database runs in WAL mode with
+    the file memory-mapped, so readers in other processes never block on a
+    writer and hot pages are read straight from the page cache. Locks are
+    rows with an expiry, taken with a conditional upsert so only one process
+    can win.
+    """
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.namespace = namespace
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT, key TEXT, expires_at REAL, value BLOB, "
+                "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS locks ("
+                "namespace TEXT, name TEXT, token TEXT, expires_at REAL, "
+                "PRIMARY KEY (namespace, name)) WITHOUT ROWID"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        """Get (expires_at, value) for a live key"""
+        row = self._connect().execute(
+            "SELECT expires_at, value FROM entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+        if row is None or (row[0] is not None and row[0] <= time.time()):
+            return None
+        return row[0], json.loads(row[1])
+
+    def set(self, key: str, expires_at: Optional[float], value: Any) -> None:
+        """Store a value until expires_at, or forever with None"""
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            (self.namespace, key, expires_at, json.dumps(value, separators=(",", ":")).encode())
+        )
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present"""
+        self._connect().execute(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+        )
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace"""
+        self._connect().execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+
+    def prune(self) -> None:
+        """Remove expired entries and locks"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "DELETE FROM entries WHERE namespace = ? AND expires_at <= ?", (self.namespace, now)
+        )
+        conn.execute("DELETE FROM locks WHERE namespace = ? AND expires_at <= ?", (self.namespace, now))
+
+    def try_lock(self, name: str, ttl: float) -> Optional[str]:
+        """Take a lock unless another live holder has it; returns a token"""
+        token = uuid.uuid4().hex
+        now = time.time()
+        cursor = self._connect().execute(
+            "INSERT INTO locks VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (namespace, name) DO UPDATE SET token = excluded.token, "
+            "expires_at = excluded.expires_at WHERE locks.expires_at <= ?",
+            (self.namespace, name, token, now + ttl, now)
+        )
+        return token if cursor.rowcount == 1 else None
+
+    def unlock(self, name: str, token: str) -> None:
+        """Release a lock if it is still held with this token"""
+        self._connect().execute(
+            "DELETE FROM locks WHERE namespace = ? AND name = ? AND token = ?",
+            (self.namespace, name, token)
+        )
+
+    def __len__(self) -> int:
+        (count,) = self._connect().execute(
+            "SELECT COUNT(*) FROM entries WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (self.namespace, time.time())
+        ).fetchone()
+        return count
+
+class LocalNetworkClient:
+    """In-process stand-in for a network key-value server
+
+    Implements the client interface NetworkBackend needs, with the same
+    semantics as Redis GET, SET EX, DEL and SET NX EX, so tests and single
+    machines can run the network backend without a server.
+    """
+
+    def __init__(self):
+        # key -> (expires_at or None, raw value)
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= time.time():
+            del self._data[key]
+            return None
+        return entry[1]
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + ttl if ttl is not None else None, value)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store a value only if the key is absent"""
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._data[key] = (time.time() + ttl if ttl is not None else None, value)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._data if key.startswith(prefix)]:
+                del self._data[key]
+
+class NetworkBackend:
+    """Cache entries and locks on a key-value server shared by every machine
+
+    The client needs get(key), set(key, value, ttl), add(key, value, ttl)
+    that stores only if the key is absent, and delete(key); delete_prefix is
+    used by clear() when the client has it. Keys are prefixed with the cache
+    name so several caches can share one server.
+    """
+
+    def __init__(self, client: Any, namespace: str):
+        self.client = client
+        self.prefix = f"lukz:{namespace}:"
+
+    def get(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        expires_at, value = decode_entry(raw)
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return expires_at, value
+
+    def set(self, key: str, expires_at: Optional[float], value: Any) -> None:
+        ttl = max(expires_at - time.time(), 0.001) if expires_at is not None else None
+        self.client.set(self.prefix + key, encode_entry(expires_at, value), ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        if hasattr(self.client, "delete_prefix"):
+            self.client.delete_prefix(self.prefix)
+
+    def try_lock(self, name: str, ttl: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        return token if self.client.add(f"{self.prefix}lock:{name}", token.encode(), ttl) else None
+
+    def unlock(self, name: str, token: str) -> None:
+        # Only the holder releases; a lock that expired and was retaken stays
+        lock_key = f"{self.prefix}lock:{name}"
+        held = self.client.get(lock_key)
+        if held is not None and held.decode() == token:
+            self.client.delete(lock_key)
+
+def load_factory(path: str) -> Callable[[], Any]:
+    """Import a "module:attribute" factory"""
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+# One network client per process, shared by every cache built on it
+_network_client = None
+
+def get_network_client() -> Any:
+    """Build the network client named by CACHE_NETWORK_CLIENT on first use"""
+    global _network_client
+    if _network_client is None:
+        if not CACHE_NETWORK_CLIENT:
+            raise ValueError("CACHE_NETWORK_CLIENT must be set for the network cache backend")
+        _network_client = load_factory(CACHE_NETWORK_CLIENT)()
+    return _network_client
+
+def build_backend(kind: str, namespace: str) -> Any:
+    """Build the shared backend for one named cache"""
+    if kind == "sqlite":
+        return SQLiteBackend(CACHE_PATH, namespace)
+    if kind == "network":
+        return NetworkBackend(get_network_client(), namespace)
+    raise ValueError(f"Unknown cache backend: {kind}")
@@ -1,16 +1,33 @@
 from typing import Dict, List, Optional
 from datetime import datetime
-import os
-from openai import OpenAI
-from dotenv import load_dotenv
+from functools import lru_cache
+from app.services import deadlines, admission
+from app.services.cache import LOCK_TTL, insight_cache, make_key, single_flight_sync
+from app.settings import get_settings
 
-load_dotenv()
+class InsightUnavailable(Exception):
+    """Raised instead of calling the LLM; callers fall back to local insights"""
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+@lru_cache(maxsize=1)
+def get_client():
+    """Build the OpenAI client on first use; importing openai is slow"""
+    from openai import OpenAI
+
+    return OpenAI(api_key=get_settings().openai_api_key, base_url=get_settings().openai_base_url)
 
 def generate_insight(data: Dict | List, context: Dict) -> str:
     """Generate insights using ChatGPT based on data and context"""
     
+    # Identical data and context always produce the same prompt, so reuse it
+    key = make_key(data, context)
+    cached = insight_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    # Shed requests are served from cache, so skip the LLM for the local insight
+    if admission.is_degraded():
+        raise InsightUnavailable("Insight generation is shed under load")
+    
     # Format historical high and timing if available
     prefix_parts = []
     
@@ -165,9 +182,20 @@ def generate_insight(data: Dict | List, context: Dict) -> str:
     Data to Analyze:
     {str(data)}"""
     
+    # Nobody is waiting for an insight on an abandoned or expired request
+    deadlines.check()
+    # One worker generates an insight while the others wait for the cached copy
+    with single_flight_sync(insight_cache, key, deadlines.timeout(LOCK_TTL)):
+        cached = insight_cache.get(key)
+        if cached is not None:
+            return cached
+        return request_insight(prompt, key)
+
+def request_insight(prompt: str, key: str) -> str:
+    """Ask the LLM for an insight and cache it under key"""
     try:
         # Generate insight using ChatGPT
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model="gpt-4",
             messages=[
                 {"role": "system", "content": """You are a senior financial analyst. Your insights MUST follow this EXACT format and requirements:
@@ -199,9 +227,12 @@ CRITICAL: Your response MUST:
                 {"role": "assistant", "content": "I understand I must explicitly mention '30-day High' metrics and include ET timestamps for intraday data in my analysis."}
             ],
             temperature=0.3,  # Lower temperature for more consistent formatting
-            max_tokens=400
+            max_tokens=400,
+            timeout=deadlines.timeout(None)
         )
         
-        return response.choices[0].message.content.strip()
+        insight = response.choices[0].message.content.strip()
+        insight_cache.set(key, insight)
+        return insight
     except Exception as e:
         return f"Error generating insight: {str(e)}"
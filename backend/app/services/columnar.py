@@ -0,0 +1,45 @@
+from typing import Any, Dict, Iterable, List
+
+# Low-cardinality string fields that are dictionary-encoded in columnar output
+CATEGORICAL_FIELDS = {"sector", "option_type", "date", "ticker"}
+
+def to_columnar(rows: List[Dict], categorical: Iterable[str] = CATEGORICAL_FIELDS) -> Dict[str, Any]:
+    """Convert rows to parallel per-field arrays
+
+    Categorical fields become {"dictionary": [...], "codes": [...]} where each
+    code indexes into the dictionary. Fields missing from a row are null.
+    """
+    categorical = set(categorical)
+    fields: List[str] = []
+    seen = set()
+    for row in rows:
+        for field in row:
+            if field not in seen:
+                seen.add(field)
+                fields.append(field)
+
+    columns: Dict[str, Any] = {}
+    for field in fields:
+        values = [row.get(field) for row in rows]
+        if field in categorical:
+            dictionary: Dict[Any, int] = {}
+            codes = [dictionary.setdefault(value, len(dictionary)) for value in values]
+            columns[field] = {"dictionary": list(dictionary), "codes": codes}
+        else:
+            columns[field] = values
+
+    return {"format": "columnar", "length": len(rows), "columns": columns}
+
+def to_rows(table: Dict[str, Any]) -> List[Dict]:
+    """Convert columnar output back to rows, dropping nulls for missing fields"""
+    decoded = {}
+    for field, column in table["columns"].items():
+        if isinstance(column, dict):
+            dictionary = column["dictionary"]
+            decoded[field] = [dictionary[code] for code in column["codes"]]
+        else:
+            decoded[field] = column
+    return [
+        {field: values[i] for field, values in decoded.items() if values[i] is not None}
+        for i in range(table["length"])
+    ]
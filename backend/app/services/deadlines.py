@@ -0,0 +1,201 @@
+from typing import Dict, Iterator, Optional
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
+import logging
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.responses import dumps
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_DEADLINE = get_settings().request_deadline
+
+# Budgets in seconds for routes that should give up sooner or later than the
+# default; ROUTE_DEADLINES in the environment overrides these
+ROUTE_DEADLINES: Dict[str, float] = {
+    "/api/greek-flow/descriptions": 2,
+    "/api/premium-flow/sectors": 2,
+    "/api/earnings/data": 10,
+    "/api/insider-trading/data": 10,
+    **get_settings().route_deadlines
+}
+
+# Rows between checkpoints in the per-row transform loops
+CHECKPOINT_ROWS = 256
+
+# Routes that never get a budget: health checks and long-lived streams
+EXEMPT_PATHS = {"/healthz"}
+EXEMPT_SUFFIXES = ("/stream",)
+
+class RequestAborted(BaseException):
+    """Raised at a checkpoint once the request's work is no longer wanted
+
+    Derives from BaseException, like asyncio.CancelledError, so the services'
+    broad `except Exception` fallbacks do not turn it into mock data.
+    """
+
+class DeadlineExceeded(RequestAborted):
+    """The request ran past its deadline budget"""
+
+class RequestCancelled(RequestAborted):
+    """The client went away before the response was ready"""
+
+class Budget:
+    """The time left for one request, shared with every task and thread it starts"""
+
+    def __init__(self, seconds: Optional[float]):
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        self.cancelled = False
+
+    def remaining(self) -> Optional[float]:
+        """Get seconds left, or None without a deadline"""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def check(self) -> None:
+        """Raise if the work should stop"""
+        if self.cancelled:
+            raise RequestCancelled()
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            raise DeadlineExceeded()
+
+_budget: ContextVar[Optional[Budget]] = ContextVar("request_budget", default=None)
+
+# Aborted request counts by route
+stats: Dict[str, Counter] = {"deadline_exceeded": Counter(), "cancelled": Counter()}
+
+def check() -> None:
+    """Cooperative checkpoint for long-running work; a no-op outside requests"""
+    budget = _budget.get()
+    if budget is not None:
+        budget.check()
+
+def remaining() -> Optional[float]:
+    """Get seconds left in the current request's budget, or None"""
+    budget = _budget.get()
+    return budget.remaining() if budget is not None else None
+
+def expires_at() -> Optional[float]:
+    """Get when the current request's budget runs out on the monotonic clock, or None"""
+    budget = _budget.get()
+    return budget.expires_at if budget is not None else None
+
+@contextmanager
+def expiring_at(moment: Optional[float]) -> Iterator[None]:
+    """Run a block under a budget that runs out at a monotonic time
+
+    Used in process-pool workers, which share the system-wide monotonic
+    clock but not the caller's context; None runs the block without one.
+    """
+    if moment is None:
+        yield
+        return
+    budget = Budget(None)
+    budget.expires_at = moment
+    token = _budget.set(budget)
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+def timeout(default: Optional[float]) -> Optional[float]:
+    """Cap a call's timeout at the time left in the current budget"""
+    left = remaining()
+    if left is None:
+        return default
+    return left if default is None else min(default, left)
+
+def get_budget_seconds(path: str) -> Optional[float]:
+    """Get the deadline budget for a route, or None if it is exempt"""
+    if path in EXEMPT_PATHS or path.endswith(EXEMPT_SUFFIXES):
+        return None
+    return ROUTE_DEADLINES.get(path, REQUEST_DEADLINE)
+
+def get_stats() -> Dict[str, Dict[str, int]]:
+    """Get deadline-exceeded and cancelled counts by route"""
+    return {name: dict(counts) for name, counts in stats.items()}
+
+class DeadlineMiddleware:
+    """Give each request a deadline and cancel its work on timeout or disconnect
+
+    The route runs in its own task with a Budget in context. When the budget
+    runs out the task is cancelled and the client gets a 504; when the client
+    disconnects first the task is cancelled too. Thread-pool work sees the
+    same Budget and stops at its next checkpoint; process-pool work gets its
+    expiry and stops at the deadline, but a disconnect only drops it while
+    it is still queued.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        seconds = get_budget_seconds(path)
+        if seconds is None:
+            await self.app(scope, receive, send)
+            return
+
+        budget = Budget(seconds)
+        token = _budget.set(budget)
+        inbox: asyncio.Queue = asyncio.Queue()
+        started = False
+
+        async def send_tracked(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            task = asyncio.create_task(self.app(scope, inbox.get, send_tracked))
+        finally:
+            _budget.reset(token)
+
+        async def watch_client() -> None:
+            # Forward client messages to the route and cancel it on disconnect
+            while True:
+                message = await receive()
+                await inbox.put(message)
+                if message["type"] == "http.disconnect":
+                    if not task.done():
+                        budget.cancelled = True
+                        task.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch_client())
+        try:
+            done, _ = await asyncio.wait({task}, timeout=seconds)
+            if not done:
+                task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, RequestAborted) as e:
+                if budget.cancelled or isinstance(e, RequestCancelled):
+                    stats["cancelled"][path] += 1
+                    logger.info("Cancelled %s after client disconnect", path)
+                    return
+                stats["deadline_exceeded"][path] += 1
+                logger.warning("Deadline of %.1fs exceeded for %s", seconds, path)
+                if not started:
+                    body = dumps({"detail": "Deadline exceeded"})
+                    await send({
+                        "type": "http.response.start",
+                        "status": 504,
+                        "headers": [
+                            (b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode())
+                        ]
+                    })
+                    await send({"type": "http.response.body", "body": body})
+        finally:
+            watcher.cancel()
+            if not task.done():
+                task.cancel()
@@ -1,7 +1,11 @@
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 import random
+from app.services.executors import cpu_bound
+from app.services.planner import plan_dates, restrict, surprise_bounds
+from app.services.tickers import MOCK_MARKET_CAPS, get_registry
 
+@cpu_bound
 def generate_mock_earnings_data(
     sector: Optional[str] = None,
     surprise_type: Optional[str] = None,
@@ -9,42 +13,27 @@ def generate_mock_earnings_data(
     end_date: Optional[str] = None
 ) -> List[Dict]:
     """Generate mock earnings data for development"""
-    companies = {
-        "tech": ["AAPL", "MSFT", "GOOGL", "META", "NVDA"],
-        "healthcare": ["JNJ", "PFE", "UNH", "ABBV", "MRK"],
-        "energy": ["XOM", "CVX", "COP", "SLB", "EOG"],
-        "finance": ["JPM", "BAC", "GS", "MS", "WFC"]
-    }
+    registry = get_registry()
+    sectors = restrict(["tech", "healthcare", "energy", "finance"], sector)
+    companies = {name: registry.tickers_in(name, MOCK_MARKET_CAPS) for name in sectors}
+    sectors = [name for name in sectors if companies[name]]
     
-    base_date = datetime.now() - timedelta(days=30)
+    # Filters become the ranges values are drawn from, so all 50 reports are kept
+    base_date = date.today() - timedelta(days=30)
+    dates = plan_dates(base_date, base_date + timedelta(days=30), start_date, end_date)
+    if not dates or not sectors:
+        return []
+    low, high = surprise_bounds(surprise_type)
     data_points = []
     
-    sectors = [sector] if sector else list(companies.keys())
-    
     for _ in range(50):  # Generate 50 earnings reports
         current_sector = random.choice(sectors)
-        ticker = random.choice(companies[current_sector])
-        earnings_surprise = round(random.uniform(-0.5, 0.5), 2)  # -50% to +50%
-        price_movement = round(random.uniform(-0.15, 0.15), 2)  # -15% to +15%
-        
-        if surprise_type == "positive" and earnings_surprise < 0:
-            continue
-        if surprise_type == "negative" and earnings_surprise > 0:
-            continue
-            
-        report_date = (base_date + timedelta(days=random.randint(0, 30))).strftime("%Y-%m-%d")
-        
-        if start_date and report_date < start_date:
-            continue
-        if end_date and report_date > end_date:
-            continue
-            
         data_points.append({
-            "ticker": ticker,
+            "ticker": random.choice(companies[current_sector]),
             "sector": current_sector,
-            "earnings_surprise": earnings_surprise,
-            "price_movement": price_movement,
-            "report_date": report_date,
+            "earnings_surprise": round(random.uniform(low, high), 2),  # Within the filter's bounds, -50% to +50% unfiltered
+            "price_movement": round(random.uniform(-0.15, 0.15), 2),  # -15% to +15%
+            "report_date": random.choice(dates),
             "market_cap": random.randint(1000000000, 2000000000000)  # $1B to $2T
         })
     
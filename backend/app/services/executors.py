@@ -0,0 +1,116 @@
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from concurrent.futures import Executor, ThreadPoolExecutor
+import asyncio
+import contextvars
+import functools
+from app.services import memprofile
+from app.settings import get_settings
+
+EXECUTOR_MODE = get_settings().executor_mode
+THREAD_WORKERS = get_settings().executor_thread_workers
+PROCESS_WORKERS = get_settings().executor_process_workers
+
+F = TypeVar("F", bound=Callable)
+
+# Pools are created on first use so importing the app stays cheap
+_executors: Dict[str, Executor] = {}
+
+def cpu_bound(func: F) -> F:
+    """Mark a pure, module-level function to run in the process pool
+
+    Its arguments and result must be picklable, and it must not rely on
+    in-process state such as the shared caches. The request's deadline and
+    memory profiling are carried over by run_sync.
+    """
+    func.__executor__ = "process"
+    return func
+
+def io_bound(func: F) -> F:
+    """Mark a function that blocks on I/O to run in the thread pool"""
+    func.__executor__ = "thread"
+    return func
+
+def get_pool_kind(func: Callable) -> str:
+    """Get the pool a function runs in: process, thread or inline"""
+    if EXECUTOR_MODE == "inline":
+        return "inline"
+    kind = getattr(func, "__executor__", "thread")
+    if kind == "process" and (EXECUTOR_MODE == "thread" or PROCESS_WORKERS <= 0):
+        return "thread"
+    return kind
+
+def _start_worker() -> None:
+    """Load the ticker registry as a worker starts, rather than in its first call"""
+    from app.services.tickers import get_registry
+
+    get_registry()
+
+def get_executor(kind: str) -> Executor:
+    """Get the shared pool of a kind, creating it on first use"""
+    if kind not in _executors:
+        if kind == "process":
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Forking a process that runs an event loop and worker threads is
+            # unsafe, so workers are spawned and import only what they run
+            _executors[kind] = ProcessPoolExecutor(
+                max_workers=PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_start_worker
+            )
+        else:
+            _executors[kind] = ThreadPoolExecutor(max_workers=THREAD_WORKERS, thread_name_prefix="service")
+    return _executors[kind]
+
+def _run_in_worker(call: Callable[[], Any], expires_at: Optional[float], route: Optional[str]) -> Tuple[Any, Optional[Dict]]:
+    """Run a call in a process-pool worker under the caller's deadline and profiling
+
+    A spawned worker has neither the caller's context variables nor its
+    tracemalloc session, so the budget comes in as its expiry and, when
+    route is set, the call is profiled here and its figures sent back.
+    """
+    from app.services import deadlines
+
+    with deadlines.expiring_at(expires_at):
+        if route is None:
+            return call(), None
+        with memprofile.session(route) as figures:
+            result = call()
+        return result, figures
+
+async def run_sync(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run synchronous service code off the event loop
+
+    Functions marked cpu_bound go to the process pool, everything else to the
+    thread pool. Thread work sees the caller's context variables, such as the
+    cache-refresh flag. Process work only gets the request's deadline, which
+    stops it at its checkpoints, and the profiling route; cancelling the
+    caller drops it while queued but cannot interrupt it once running.
+    """
+    kind = get_pool_kind(func)
+    if kind == "inline":
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    if kind == "thread":
+        call = functools.partial(contextvars.copy_context().run, call)
+        return await loop.run_in_executor(get_executor(kind), call)
+
+    from app.services import deadlines
+
+    # Work whose request is already over is never dispatched
+    deadlines.check()
+    route = memprofile.current_route() if memprofile.is_active() else None
+    result, figures = await loop.run_in_executor(
+        get_executor(kind), functools.partial(_run_in_worker, call, deadlines.expires_at(), route)
+    )
+    if figures:
+        memprofile.merge(figures)
+    return result
+
+def shutdown(wait: bool = True) -> None:
+    """Shut the pools down, cancelling queued work"""
+    for executor in _executors.values():
+        executor.shutdown(wait=wait, cancel_futures=True)
+    _executors.clear()
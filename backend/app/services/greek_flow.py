@@ -1,7 +1,60 @@
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import random
 from app.services.unusual_whales import make_api_request
+from app.services import persistence, market_calendar
+from app.services.cache import partition_cache, make_key, is_refreshing, RESPONSE_CACHE_TTL
+from app.services.executors import io_bound, run_sync
+from app.services.planner import plan_dates, restrict
+from app.services.tickers import MOCK_MARKET_CAPS, get_registry
+from app.settings import get_settings
+
+MAX_RANGE_DAYS = get_settings().greek_flow_max_range_days
+FETCH_CONCURRENCY = get_settings().greek_flow_fetch_concurrency
+
+class RangeTooLong(ValueError):
+    """Raised for a date range spanning more than MAX_RANGE_DAYS trading days"""
+
+def get_range_days(start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[str]:
+    """Resolve a request's date range to the trading days it covers
+
+    A single date, given as either bound, is that one day.
+    """
+    latest = market_calendar.latest_session_day()
+    if not start_date and not end_date:
+        return [latest.isoformat()]
+    start = datetime.strptime(start_date or end_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date or start_date, "%Y-%m-%d").date()
+    days = market_calendar.trading_days(start, min(end, latest))
+    if len(days) > MAX_RANGE_DAYS:
+        raise RangeTooLong(
+            f"Date range covers {len(days)} trading days; at most {MAX_RANGE_DAYS} can be requested at once"
+        )
+    return [day.isoformat() for day in days]
+
+async def fetch_greek_flow_day(ticker: str, day: str, semaphore: asyncio.Semaphore) -> List[Dict]:
+    """Get one ticker's Greek flow for one trading day, cached per partition"""
+    closed = day < market_calendar.market_now().strftime("%Y-%m-%d")
+    key = make_key("greek_flow", ticker, day)
+    # A closed day never changes, so only today's partition is ever refreshed
+    if closed or not is_refreshing():
+        cached = partition_cache.get(key)
+        if cached is not None:
+            return cached
+
+    rows = []
+    if closed:
+        rows = await persistence.fetch_rows("greek_flow", ticker=ticker, start_date=day, end_date=day)
+    if not rows:
+        async with semaphore:
+            response = await make_api_request(f"stock/{ticker}/greek-flow", {"date": day})
+        rows = response.get('data', [])
+        await persistence.store_rows("greek_flow", rows, coverage={"ticker": ticker, "start_date": day, "end_date": day})
+
+    # An empty closed day may be an outage or a late backfill, so it is retried
+    partition_cache.set(key, rows, ttl=None if closed and rows else RESPONSE_CACHE_TTL)
+    return rows
 
 async def get_greek_flow(
     ticker: str,
@@ -10,18 +63,20 @@ async def get_greek_flow(
 ) -> Dict:
     """Fetch Greek flow data from Unusual Whales API"""
     try:
-        params = {"date": start_date} if start_date else {}
-        response = await make_api_request(f"stock/{ticker}/greek-flow", params)
-        data = response.get('data', [])
-        
-        # Filter by date range if provided
-        if end_date:
-            data = [d for d in data if d['date'] <= end_date]
+        # Assemble the range from per-day partitions, fetching missing days concurrently
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+        partitions = await asyncio.gather(*(
+            fetch_greek_flow_day(ticker, day, semaphore)
+            for day in get_range_days(start_date, end_date)
+        ))
+        data = [row for rows in partitions for row in rows]
             
         return {
             "data": data,
-            "insight": generate_greek_flow_insight(data)
+            "insight": await run_sync(generate_greek_flow_insight, data)
         }
+    except RangeTooLong:
+        raise
     except Exception:
         # Fallback to mock data
         return {
@@ -29,8 +84,10 @@ async def get_greek_flow(
             "insight": "Using mock data for development"
         }
 
-from .chatgpt import generate_insight, GREEK_FLOW_PROMPT
+from .chatgpt import generate_insight
+from .prompts import GREEK_FLOW_PROMPT
 
+@io_bound
 def generate_greek_flow_insight(data: List[Dict]) -> str:
     """Generate insights for Greek flow data using ChatGPT"""
     if not data:
@@ -61,22 +118,14 @@ def generate_mock_greek_flow(
     end_date: str = None
 ) -> List[Dict]:
     """Generate mock Greek flow data for development"""
-    tickers = ["AAPL", "TSLA", "GOOGL", "MSFT", "AMZN"]
+    tickers = restrict(get_registry().tickers_in(None, MOCK_MARKET_CAPS), ticker)
     
-    if ticker:
-        tickers = [ticker]
-        
-    base_date = datetime.now() - timedelta(days=30)
+    # Only the days of the 30-day window inside the requested range
+    base_date = datetime.now().date() - timedelta(days=30)
+    dates = plan_dates(base_date, base_date + timedelta(days=29), start_date, end_date)
     data_points = []
     
-    for _ in range(30):  # Generate 30 days of data
-        current_date = (base_date + timedelta(days=_)).strftime("%Y-%m-%d")
-        
-        if start_date and current_date < start_date:
-            continue
-        if end_date and current_date > end_date:
-            continue
-            
+    for current_date in dates:
         for ticker in tickers:
             data_points.append({
                 "ticker": ticker,
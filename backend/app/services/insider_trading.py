@@ -1,7 +1,12 @@
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 import random
+from app.services.executors import cpu_bound, run_sync
+from app.services.planner import plan_dates, restrict
+from app.services.trade_store import insider_store
+from app.services.tickers import MOCK_MARKET_CAPS, get_registry
 
+@cpu_bound
 def generate_mock_insider_data(
     insider_role: Optional[str] = None,
     trade_type: Optional[str] = None,
@@ -9,36 +14,26 @@ def generate_mock_insider_data(
     end_date: Optional[str] = None
 ) -> List[Dict]:
     """Generate mock insider trading data for development"""
-    sectors = ["tech", "healthcare", "energy", "finance", "consumer", "industrial"]
+    registry = get_registry()
+    sectors = registry.sectors
     roles = ["CEO", "CFO", "CTO", "Director", "VP"]
     trade_types = ["buy", "sell"]
-    companies = {
-        "tech": ["AAPL", "MSFT", "GOOGL", "META", "NVDA"],
-        "healthcare": ["JNJ", "PFE", "UNH", "ABBV", "MRK"],
-        "energy": ["XOM", "CVX", "COP", "SLB", "EOG"],
-        "finance": ["JPM", "BAC", "GS", "MS", "WFC"],
-        "consumer": ["AMZN", "WMT", "PG", "KO", "PEP"],
-        "industrial": ["GE", "BA", "CAT", "HON", "MMM"]
-    }
+    companies = {sector: registry.tickers_in(sector, MOCK_MARKET_CAPS) for sector in sectors}
+    sectors = [sector for sector in sectors if companies[sector]]
     
-    if insider_role:
-        roles = [insider_role]
-    if trade_type:
-        trade_types = [trade_type]
-        
-    base_date = datetime.now() - timedelta(days=30)
+    roles = restrict(roles, insider_role)
+    trade_types = restrict(trade_types, trade_type)
+    
+    # Only dates inside the requested range are ever drawn
+    base_date = date.today() - timedelta(days=30)
+    dates = plan_dates(base_date, base_date + timedelta(days=30), start_date, end_date)
+    if not dates:
+        return []
     data_points = []
     
     for sector in sectors:
         sector_volume = 0
         for _ in range(random.randint(5, 15)):  # 5-15 trades per sector
-            trade_date = (base_date + timedelta(days=random.randint(0, 30))).strftime("%Y-%m-%d")
-            
-            if start_date and trade_date < start_date:
-                continue
-            if end_date and trade_date > end_date:
-                continue
-                
             amount = random.randint(100000, 5000000)
             sector_volume += amount
             
@@ -48,8 +43,23 @@ def generate_mock_insider_data(
                 "insider_role": random.choice(roles),
                 "trade_type": random.choice(trade_types),
                 "amount": amount,
-                "trade_date": trade_date,
+                "trade_date": random.choice(dates),
                 "sector_volume": sector_volume
             })
     
     return sorted(data_points, key=lambda x: x["trade_date"], reverse=True)
+
+async def get_insider_trades(
+    insider_role: Optional[str] = None,
+    trade_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    sector: Optional[str] = None
+) -> List[Dict]:
+    """Get insider trades, which have no upstream source yet, from the trade store"""
+    # One complete mock set answers every filter until it goes stale
+    if not insider_store.covers():
+        insider_store.replace(await run_sync(generate_mock_insider_data))
+    return insider_store.query(
+        start_date, end_date, member=insider_role, category=trade_type, sector=sector
+    )
@@ -1,6 +1,10 @@
 from typing import Dict, List, Optional
 import random
+from .amounts import parse_amount, parse_amounts, total_range
 from .chatgpt import generate_insight
+from .executors import io_bound
+from .market_calendar import market_time_label
+from .memprofile import profiled
 from .prompts import (
     CONGRESS_TRADES_PROMPT,
     GREEK_FLOW_PROMPT,
@@ -8,7 +12,10 @@ from .prompts import (
     INSIDER_TRADING_PROMPT,
     PREMIUM_FLOW_PROMPT
 )
+from .tickers import UNKNOWN_SECTOR, get_registry
 
+@io_bound
+@profiled("insights.congress_trades")
 def generate_congress_trades_insight(trades: List[Dict]) -> str:
     """Generate insights for Congress trades data using ChatGPT"""
     if not trades:
@@ -19,38 +26,16 @@ def generate_congress_trades_insight(trades: List[Dict]) -> str:
     member_summary = {}
     large_trades = []  # Track trades >$1M
     
-    # Sector mapping for common stocks
-    sector_map = {
-        # Technology
-        "AAPL": "tech", "MSFT": "tech", "GOOGL": "tech", "META": "tech",
-        "NVDA": "tech", "AMZN": "tech", "ADBE": "tech", "NOW": "tech",
-        "PANW": "tech", "INTC": "tech", "AMD": "tech", "CRM": "tech",
-        
-        # Healthcare
-        "JNJ": "healthcare", "PFE": "healthcare", "UNH": "healthcare",
-        "ABBV": "healthcare", "MRK": "healthcare", "LLY": "healthcare",
-        "ISRG": "healthcare", "DXCM": "healthcare",
-        
-        # Energy
-        "XOM": "energy", "CVX": "energy", "COP": "energy", "SLB": "energy",
-        "EOG": "energy", "DVN": "energy", "MPC": "energy",
-        
-        # Finance
-        "JPM": "finance", "BAC": "finance", "GS": "finance", "MS": "finance",
-        "WFC": "finance", "C": "finance", "BLK": "finance",
-        
-        # Consumer
-        "WMT": "consumer", "PG": "consumer", "KO": "consumer", "PEP": "consumer",
-        "COST": "consumer", "HD": "consumer", "NKE": "consumer"
-    }
+    registry = get_registry()
     
     try:
-        for trade in trades:
+        # Amount ranges and sectors for every trade at once; sizes below use the midpoints
+        ranges = parse_amounts([trade["amounts"] for trade in trades])
+        sectors = registry.sectors_of([trade["ticker"] for trade in trades])
+        for trade, amount_range, sector in zip(trades, ranges, sectors):
             ticker = trade["ticker"]
             member = trade["reporter"]
-            amount_str = trade["amounts"]
-            # Convert amount range to average value
-            amount = parse_amount_range(amount_str)
+            amount = amount_range.mid
             trade_type = trade["txn_type"].lower()
             
             # Track large trades (>$1M)
@@ -59,6 +44,8 @@ def generate_congress_trades_insight(trades: List[Dict]) -> str:
                     "ticker": ticker,
                     "member": member,
                     "amount": amount,
+                    "min_amount": amount_range.low,
+                    "max_amount": amount_range.high,
                     "type": trade_type,
                     "date": trade["transaction_date"]
                 })
@@ -68,7 +55,7 @@ def generate_congress_trades_insight(trades: List[Dict]) -> str:
                 ticker_summary[ticker] = {
                     "buy": 0, "sell": 0, "exchange": 0,
                     "total": 0, "traders": set(),
-                    "sector": sector_map.get(ticker, "other")
+                    "sector": sector
                 }
             if member not in member_summary:
                 member_summary[member] = {
@@ -122,6 +109,8 @@ def generate_congress_trades_insight(trades: List[Dict]) -> str:
         
         # Create summarized data for ChatGPT
         summary = {
+            # Disclosures are bands, so the true total lies between these bounds
+            "disclosed_range": total_range(ranges),
             "large_trades": sorted(large_trades, key=lambda x: x["amount"], reverse=True),
             "top_stocks": [
                 {
@@ -155,7 +144,7 @@ def generate_congress_trades_insight(trades: List[Dict]) -> str:
                     "sentiment": "bullish" if data["buy"] > data["sell"] else "bearish" if data["sell"] > data["buy"] else "neutral"
                 }
                 for sector, data in sector_summary.items()
-                if sector != "other"  # Exclude uncategorized stocks
+                if sector != UNKNOWN_SECTOR  # Exclude uncategorized stocks
             ]
         }
         
@@ -185,17 +174,10 @@ def generate_congress_trades_insight(trades: List[Dict]) -> str:
 
 def parse_amount_range(amount_str: str) -> float:
     """Convert amount range string to average value"""
-    try:
-        # Remove "$" and "," and split on " - "
-        parts = amount_str.replace("$", "").replace(",", "").split(" - ")
-        if len(parts) == 2:
-            low = float(parts[0])
-            high = float(parts[1])
-            return (low + high) / 2
-        return float(parts[0])
-    except:
-        return 0.0
+    return parse_amount(amount_str).mid
 
+@io_bound
+@profiled("insights.greek_flow")
 def generate_greek_flow_insight(data: List[Dict]) -> str:
     """Generate insights for Greek flow data using ChatGPT"""
     if not data:
@@ -274,6 +256,8 @@ def generate_greek_flow_insight(data: List[Dict]) -> str:
         except Exception:
             return "Insufficient data to generate meaningful insights."
 
+@io_bound
+@profiled("insights.earnings")
 def generate_earnings_insight(data: List[Dict]) -> str:
     """Generate insights for earnings data using ChatGPT"""
     if not data:
@@ -420,6 +404,8 @@ def calculate_correlation(pairs: List[tuple]) -> float:
         
     return covariance / (variance_x * variance_y) ** 0.5
 
+@io_bound
+@profiled("insights.insider_trading")
 def generate_insider_trading_insight(data: List[Dict]) -> str:
     """Generate insights for insider trading data using ChatGPT"""
     if not data:
@@ -572,6 +558,8 @@ def generate_insider_trading_insight(data: List[Dict]) -> str:
         except Exception:
             return "Insufficient data to generate meaningful insights."
 
+@io_bound
+@profiled("insights.premium_flow")
 def generate_premium_flow_insight(data: List[Dict], historical_stats: Dict = None, is_intraday: bool = False) -> str:
     """Generate insights for premium flow data with historical context"""
     if not data or len(data) == 0:
@@ -603,6 +591,8 @@ def generate_premium_flow_insight(data: List[Dict], historical_stats: Dict = Non
         sector_summary = {}
         time_series = {}
         latest_time = None
+        # Rows projected without market_time; only the latest is labelled
+        latest_moment = None
         
         # Process each flow entry
         for flow in data:
@@ -615,7 +605,11 @@ def generate_premium_flow_insight(data: List[Dict], historical_stats: Dict = Non
             market_time = flow.get("market_time", date)
             
             # Track latest time for intraday data
-            if market_time:
+            if "market_time" not in flow:
+                moment = (date, flow.get("time", "00:00:00"))
+                if date and (latest_moment is None or moment > latest_moment):
+                    latest_moment = moment
+            elif market_time:
                 # Convert market_time to string if it's not already
                 market_time = str(market_time)
                 # Add ET timezone if not present
@@ -669,6 +663,11 @@ def generate_premium_flow_insight(data: List[Dict], historical_stats: Dict = Non
             print(f"Processing flow: time_key={time_key}, premium={premium}, volume={volume}, type={option_type}")
             print(f"Updated time series: {ts}")
         
+        if latest_moment is not None:
+            label = market_time_label(*latest_moment)
+            if not latest_time or label > latest_time:
+                latest_time = label
+
         # Calculate final metrics with sector comparisons
         sectors_list = [
             {
@@ -833,6 +832,7 @@ def format_currency(amount: float) -> str:
         return f"${amount / 1_000_000_000:.1f}B"
     return f"${amount / 1_000_000:.1f}M"
 
+@io_bound
 def generate_market_tide_insight(data: List[Dict]) -> str:
     """Generate insights for market tide data using ChatGPT"""
     if not data:
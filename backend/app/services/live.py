@@ -0,0 +1,183 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+from app.responses import dumps
+from app.services import market_calendar
+from app.services.cache import make_key
+from app.services.pagination import row_id
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+LIVE_POLL_INTERVAL = get_settings().live_poll_interval
+LIVE_HEARTBEAT_INTERVAL = get_settings().live_heartbeat_interval
+LIVE_QUEUE_SIZE = get_settings().live_queue_size
+
+HEARTBEAT = b": heartbeat\n\n"
+
+def format_event(event: str, sequence: int, data: Any) -> bytes:
+    """Encode one server-sent event"""
+    return b"event: %s\nid: %d\ndata: %s\n\n" % (event.encode(), sequence, dumps(data))
+
+class Topic:
+    """One filter set, polled once per interval and fanned out to its subscribers"""
+
+    def __init__(self, key: str, fetch: Callable[[], Awaitable[Dict]], row_key: Callable[[Dict], Any]):
+        self.key = key
+        self.fetch = fetch
+        self.row_key = row_key
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.task: Optional[asyncio.Task] = None
+        # Last full payload as an encoded snapshot event, for joiners and resyncs
+        self.snapshot: Optional[bytes] = None
+        self.last_row_key: Any = None
+        # Content hashes of the rows sent at last_row_key; several rows can share
+        # a key (a minute across sectors, a whole day in daily mode) and arrive
+        # or change after it was first sent
+        self.last_row_ids: Set[str] = set()
+        self.sequence = 0
+        self.polls = 0
+        self.resyncs = 0
+
+class LiveHub:
+    """Shares one polling loop per filter set across every stream subscriber
+
+    Each poll produces either a snapshot (first poll, or the series restarted)
+    or a delta holding the rows past the last key sent, plus rows at that key
+    that are new or changed since. Every event is
+    serialized once and the same bytes go to all subscribers, so the work per
+    interval depends on the number of filter sets, not on the number of viewers.
+    A subscriber whose queue fills up has its backlog replaced by the latest
+    snapshot instead of holding back the others.
+    """
+
+    def __init__(
+        self,
+        interval: float = LIVE_POLL_INTERVAL,
+        heartbeat: float = LIVE_HEARTBEAT_INTERVAL,
+        queue_size: int = LIVE_QUEUE_SIZE,
+        is_open: Callable[[], bool] = market_calendar.is_market_open
+    ):
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.queue_size = queue_size
+        self.is_open = is_open
+        self.topics: Dict[str, Topic] = {}
+
+    def subscribe(
+        self,
+        stream: str,
+        params: Dict,
+        fetch: Callable[[], Awaitable[Dict]],
+        row_key: Callable[[Dict], Any]
+    ) -> Tuple[Topic, asyncio.Queue]:
+        """Join the topic for a filter set, starting its poller if needed"""
+        key = make_key(stream, params)
+        topic = self.topics.get(key)
+        if topic is None:
+            topic = self.topics[key] = Topic(key, fetch, row_key)
+            topic.task = asyncio.create_task(self._poll(topic), name=f"live:{stream}")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if topic.snapshot is not None:
+            queue.put_nowait(topic.snapshot)
+        topic.subscribers.add(queue)
+        return topic, queue
+
+    def unsubscribe(self, topic: Topic, queue: asyncio.Queue) -> None:
+        """Leave a topic, stopping its poller once nobody is listening"""
+        topic.subscribers.discard(queue)
+        if not topic.subscribers:
+            if topic.task is not None:
+                topic.task.cancel()
+            self.topics.pop(topic.key, None)
+
+    async def stream(
+        self,
+        stream: str,
+        params: Dict,
+        fetch: Callable[[], Awaitable[Dict]],
+        row_key: Callable[[Dict], Any]
+    ) -> AsyncIterator[bytes]:
+        """Yield encoded events for one subscriber, with heartbeats while idle"""
+        topic, queue = self.subscribe(stream, params, fetch, row_key)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+        finally:
+            self.unsubscribe(topic, queue)
+
+    def publish(self, topic: Topic, payload: Dict) -> None:
+        """Turn a freshly polled payload into an event for every subscriber"""
+        rows: List[Dict] = payload.get("data", [])
+        if not rows:
+            return
+        newest = max(topic.row_key(row) for row in rows)
+        topic.sequence += 1
+        topic.snapshot = format_event("snapshot", topic.sequence, payload)
+
+        last_key, last_ids = topic.last_row_key, topic.last_row_ids
+        if last_key is None or newest < last_key:
+            event = topic.snapshot
+        else:
+            new_rows = []
+            for row in rows:
+                key = topic.row_key(row)
+                if key > last_key or (key == last_key and row_id(row) not in last_ids):
+                    new_rows.append(row)
+            if not new_rows:
+                return
+            event = format_event("delta", topic.sequence, {**payload, "data": new_rows})
+        topic.last_row_key = newest
+        topic.last_row_ids = {row_id(row) for row in rows if topic.row_key(row) == newest}
+
+        for queue in list(topic.subscribers):
+            self._offer(topic, queue, event)
+
+    def _offer(self, topic: Topic, queue: asyncio.Queue, event: bytes) -> None:
+        """Queue an event, resyncing a slow subscriber from the latest snapshot"""
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(topic.snapshot)
+            topic.resyncs += 1
+
+    async def _poll(self, topic: Topic) -> None:
+        """Poll a topic until its last subscriber leaves"""
+        while True:
+            # Outside market hours the series cannot change after the first poll
+            if topic.snapshot is None or self.is_open():
+                try:
+                    topic.polls += 1
+                    self.publish(topic, await topic.fetch())
+                except Exception as e:
+                    logger.warning("Live poll for %s failed: %s", topic.key, e)
+            await asyncio.sleep(self.interval)
+
+    async def close(self) -> None:
+        """Stop every poller"""
+        tasks = [topic.task for topic in self.topics.values() if topic.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.topics.clear()
+
+    def get_status(self) -> List[Dict]:
+        """Get subscriber, poll and resync counts per topic"""
+        return [
+            {
+                "key": topic.key,
+                "subscribers": len(topic.subscribers),
+                "polls": topic.polls,
+                "resyncs": topic.resyncs,
+                "sequence": topic.sequence
+            }
+            for topic in self.topics.values()
+        ]
+
+# Shared hub for the streaming routes
+hub = LiveHub()
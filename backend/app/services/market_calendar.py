@@ -0,0 +1,140 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """Get the nth given weekday of a month (n=-1 for the last one)"""
+    if n > 0:
+        first = date(year, month, 1)
+        offset = (weekday - first.weekday()) % 7
+        return first + timedelta(days=offset + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _observed(day: date) -> date:
+    """Shift a fixed-date holiday off the weekend"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+def _easter(year: int) -> date:
+    """Get Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+@lru_cache(maxsize=1)
+def get_market_tz():
+    """Get the market timezone, importing pytz on first use"""
+    import pytz
+
+    return pytz.timezone("America/New_York")
+
+def market_time_label(day: str, clock: str = "00:00:00") -> str:
+    """Label a UTC date and time in market time, e.g. 2024-03-01 09:30:00 ET"""
+    moment = datetime.strptime(f"{day} {clock}", "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    return moment.astimezone(get_market_tz()).strftime("%Y-%m-%d %H:%M:%S ET")
+
+@lru_cache(maxsize=32)
+def get_holidays(year: int) -> Dict[date, str]:
+    """Get NYSE full-day holidays for a year"""
+    holidays = {
+        _nth_weekday(year, 1, 0, 3): "Martin Luther King Jr. Day",
+        _nth_weekday(year, 2, 0, 3): "Presidents' Day",
+        _easter(year) - timedelta(days=2): "Good Friday",
+        _nth_weekday(year, 5, 0, -1): "Memorial Day",
+        _observed(date(year, 7, 4)): "Independence Day",
+        _nth_weekday(year, 9, 0, 1): "Labor Day",
+        _nth_weekday(year, 11, 3, 4): "Thanksgiving Day",
+        _observed(date(year, 12, 25)): "Christmas Day"
+    }
+    # New Year's Day falling on a Saturday is not observed on the prior Friday
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays[_observed(new_year)] = "New Year's Day"
+    if year >= 2022:
+        holidays[_observed(date(year, 6, 19))] = "Juneteenth"
+    return holidays
+
+@lru_cache(maxsize=32)
+def get_early_closes(year: int) -> Dict[date, str]:
+    """Get NYSE 1:00 PM ET early-close days for a year"""
+    early = {}
+    july_3 = date(year, 7, 3)
+    if july_3.weekday() < 5 and july_3 not in get_holidays(year):
+        early[july_3] = "Independence Day Eve"
+    early[_nth_weekday(year, 11, 3, 4) + timedelta(days=1)] = "Day after Thanksgiving"
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 5 and christmas_eve not in get_holidays(year):
+        early[christmas_eve] = "Christmas Eve"
+    return early
+
+def is_trading_day(day: date) -> bool:
+    """Check whether the market is open at all on a date"""
+    return day.weekday() < 5 and day not in get_holidays(day.year)
+
+def session_bounds(day: date) -> Optional[Tuple[datetime, datetime]]:
+    """Get the tz-aware (open, close) for a date, or None if closed"""
+    if not is_trading_day(day):
+        return None
+    close = EARLY_CLOSE if day in get_early_closes(day.year) else MARKET_CLOSE
+    return (
+        get_market_tz().localize(datetime.combine(day, MARKET_OPEN)),
+        get_market_tz().localize(datetime.combine(day, close))
+    )
+
+def market_now() -> datetime:
+    """Get the current time in the market timezone"""
+    return datetime.now(get_market_tz())
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """Check whether the regular session is in progress"""
+    now = (now or market_now()).astimezone(get_market_tz())
+    bounds = session_bounds(now.date())
+    return bool(bounds) and bounds[0] <= now < bounds[1]
+
+def next_open(now: Optional[datetime] = None) -> datetime:
+    """Get the start of the next regular session at or after now"""
+    now = (now or market_now()).astimezone(get_market_tz())
+    day = now.date()
+    while True:
+        bounds = session_bounds(day)
+        if bounds and now < bounds[1]:
+            return max(bounds[0], now)
+        day += timedelta(days=1)
+
+def trading_days(start: date, end: date) -> List[date]:
+    """Get every trading day in the inclusive range"""
+    days = []
+    day = start
+    while day <= end:
+        if is_trading_day(day):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+def latest_session_day(now: Optional[datetime] = None) -> date:
+    """Get the most recent trading day whose session has started"""
+    now = (now or market_now()).astimezone(get_market_tz())
+    day = now.date()
+    bounds = session_bounds(day)
+    if bounds and now >= bounds[0]:
+        return day
+    day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
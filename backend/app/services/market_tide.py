@@ -1,9 +1,15 @@
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import random
-import pytz
 from app.services.unusual_whales import make_api_request
+from app.services import persistence, deadlines
+from app.services.market_calendar import get_market_tz
+from app.services.projection import project, wants
+from app.services.executors import io_bound, run_sync
+from app.services.memprofile import profiled
+from app.services.records import TidePoint
 
+@profiled("market_tide.historical_stats")
 def get_historical_stats(data: List[Dict], lookback_days: int = 30) -> Dict:
     """Calculate historical statistics for market tide data"""
     # Convert lookback_days to date threshold
@@ -36,63 +42,111 @@ def get_historical_stats(data: List[Dict], lookback_days: int = 30) -> Dict:
     
     return stats
 
+@profiled("market_tide.cumulative")
+def add_cumulative_tide(data: List[Dict], fields: Optional[FrozenSet[str]] = None) -> List[TidePoint]:
+    """Sort market tide points and add cumulative premiums and NY market time
+
+    Derived fields left out of fields are never built, which also skips the
+    per-row timezone conversion when market_time is not requested. Rows come
+    back as TidePoint records, which read like dicts and serialize as them.
+    """
+    with_call = wants(fields, "cumulative_call_premium")
+    with_put = wants(fields, "cumulative_put_premium")
+    with_net = wants(fields, "net_premium")
+    with_time = wants(fields, "market_time")
+    market_tz = get_market_tz() if with_time else None
+
+    cumulative_data = []
+    call_sum = 0
+    put_sum = 0
+    # The market's UTC offset only changes on the hour, so it is looked up
+    # once per hour of data rather than converting every row's timezone
+    offsets: Dict[str, timedelta] = {}
+
+    for i, point in enumerate(sorted(data, key=lambda x: x["timestamp"])):
+        if i % deadlines.CHECKPOINT_ROWS == 0:
+            deadlines.check()
+        call_sum += float(point["net_call_premium"])
+        put_sum += float(point["net_put_premium"])
+
+        row = TidePoint.from_dict(point)
+        if with_call:
+            row.cumulative_call_premium = call_sum
+        if with_put:
+            row.cumulative_put_premium = put_sum
+        if with_net:
+            row.net_premium = call_sum - put_sum
+        if with_time:
+            # Convert timestamp to NY timezone
+            timestamp = point["timestamp"]
+            # fromisoformat parses the usual "...Z" shape several times faster;
+            # strptime still rejects anything else as before
+            if timestamp.endswith("Z"):
+                moment = datetime.fromisoformat(timestamp[:-1])
+            else:
+                moment = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ")
+            offset = offsets.get(timestamp[:13])
+            if offset is None:
+                offset = offsets[timestamp[:13]] = moment.replace(tzinfo=timezone.utc).astimezone(market_tz).utcoffset()
+            row.market_time = (moment + offset).strftime("%Y-%m-%d %H:%M:%S")
+        cumulative_data.append(row)
+
+    return cumulative_data
+
 async def get_market_tide(
     date: Optional[str] = None,
     interval_5m: bool = False,
     lookback_days: int = 30,
-    granularity: str = "minute"
+    granularity: str = "minute",
+    fields: Optional[FrozenSet[str]] = None
 ) -> Dict:
     """Fetch market tide data from Unusual Whales API"""
     try:
-        params = {
-            **({"date": date} if date else {}),
-            "interval_5m": str(interval_5m).lower()
-        }
-        response = await make_api_request("market/market-tide", params)
-        data = response.get('data', [])
+        interval = "5m" if interval_5m else "1m"
+        data = []
+        # Closed historical days are answered from the database when an earlier
+        # fetch covered them
+        if persistence.is_historical(date):
+            data = await persistence.fetch_rows(
+                "market_tide", category=interval, start_date=date, end_date=date
+            )
+        if not data:
+            params = {
+                **({"date": date} if date else {}),
+                "interval_5m": str(interval_5m).lower()
+            }
+            response = await make_api_request("market/market-tide", params)
+            data = response.get('data', [])
+            await persistence.store_rows(
+                "market_tide", data, category=interval,
+                coverage={"category": interval, "start_date": date, "end_date": date}
+            )
         
         # Calculate historical statistics
         historical_stats = get_historical_stats(data, lookback_days)
         
         # Add cumulative calculations and timezone
-        cumulative_data = []
-        call_sum = 0
-        put_sum = 0
-        
-        for point in sorted(data, key=lambda x: x["timestamp"]):
-            call_sum += float(point["net_call_premium"])
-            put_sum += float(point["net_put_premium"])
-            
-            # Convert timestamp to NY timezone
-            market_time = datetime.strptime(point["timestamp"], "%Y-%m-%dT%H:%M:%SZ").replace(
-                tzinfo=pytz.UTC
-            ).astimezone(pytz.timezone("America/New_York"))
-            
-            cumulative_data.append({
-                **point,
-                "cumulative_call_premium": call_sum,
-                "cumulative_put_premium": put_sum,
-                "net_premium": call_sum - put_sum,
-                "market_time": market_time.strftime("%Y-%m-%d %H:%M:%S")
-            })
+        cumulative_data = add_cumulative_tide(data, fields)
         
         return {
-            "data": cumulative_data,
+            "data": project(cumulative_data, fields),
             "historical_stats": historical_stats,
-            "insight": generate_market_tide_insight(cumulative_data, granularity)
+            "insight": await run_sync(generate_market_tide_insight, cumulative_data, granularity)
         }
     except Exception:
         # Fallback to mock data
-        mock_data = generate_mock_market_tide(date, interval_5m, lookback_days, granularity)
+        mock_data = generate_mock_market_tide(date, interval_5m, lookback_days, granularity, fields)
         historical_stats = get_historical_stats(mock_data, lookback_days)
         return {
-            "data": mock_data,
+            "data": project(mock_data, fields),
             "historical_stats": historical_stats,
-            "insight": generate_market_tide_insight(mock_data, granularity)
+            "insight": await run_sync(generate_market_tide_insight, mock_data, granularity)
         }
 
-from .chatgpt import generate_insight, MARKET_TIDE_PROMPT
+from .chatgpt import generate_insight
+from .prompts import MARKET_TIDE_PROMPT
 
+@io_bound
 def generate_market_tide_insight(data: List[Dict], historical_stats: Dict = None, granularity: str = "minute") -> str:
     """Generate insights for market tide data using ChatGPT with historical context"""
     if not data:
@@ -147,7 +201,8 @@ def generate_mock_market_tide(
     date: Optional[str] = None,
     interval_5m: bool = False,
     lookback_days: int = 30,
-    granularity: str = "minute"
+    granularity: str = "minute",
+    fields: Optional[FrozenSet[str]] = None
 ) -> List[Dict]:
     """Generate mock market tide data for development"""
     base_date = datetime.now()
@@ -192,27 +247,4 @@ def generate_mock_market_tide(
         })
     
     # Sort and add cumulative calculations
-    sorted_data = sorted(data_points, key=lambda x: x["timestamp"])
-    
-    cumulative_data = []
-    call_sum = 0
-    put_sum = 0
-    
-    for point in sorted_data:
-        call_sum += float(point["net_call_premium"])
-        put_sum += float(point["net_put_premium"])
-        
-        # Convert timestamp to NY timezone
-        market_time = datetime.strptime(point["timestamp"], "%Y-%m-%dT%H:%M:%SZ").replace(
-            tzinfo=pytz.UTC
-        ).astimezone(pytz.timezone("America/New_York"))
-        
-        cumulative_data.append({
-            **point,
-            "cumulative_call_premium": call_sum,
-            "cumulative_put_premium": put_sum,
-            "net_premium": call_sum - put_sum,
-            "market_time": market_time.strftime("%Y-%m-%d %H:%M:%S")
-        })
-    
-    return cumulative_data
+    return add_cumulative_tide(data_points, fields)
@@ -0,0 +1,224 @@
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import logging
+import threading
+import tracemalloc
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+MEMORY_PROFILING = get_settings().memory_profiling
+TRACE_FRAMES = get_settings().memory_profiling_frames
+
+# Peak bytes per input row each stage may allocate on top of what was live
+# when it started: about 1.5x what 5,000 synthetic rows with every field
+# requested measure, which tests/test_services/test_memprofile.py enforces
+ROW_BUDGETS: Dict[str, int] = {
+    "market_tide.historical_stats": 100,
+    "market_tide.cumulative": 450,
+    "premium_flow.historical_stats": 100,
+    "premium_flow.cumulative": 400,
+    "premium_flow.mock": 750,
+    "insights.congress_trades": 400,
+    "insights.earnings": 150,
+    "insights.insider_trading": 100,
+    "insights.premium_flow": 100,
+    "insights.greek_flow": 100,
+    "pagination.dataset": 400,
+    "render": 800
+}
+
+# Stages outside any request, such as prewarm jobs, are filed under this route
+BACKGROUND = "background"
+
+class Frame:
+    """One open stage: traced bytes when it started and the highest peak seen since"""
+
+    __slots__ = ("name", "route", "start", "peak", "rows")
+
+    def __init__(self, name: str, route: str, start: int, rows: Optional[int]):
+        self.name = name
+        self.route = route
+        self.start = start
+        self.peak = start
+        self.rows = rows
+
+_active = False
+_lock = threading.Lock()
+_open: Set[Frame] = set()
+_route: ContextVar[str] = ContextVar("memprofile_route", default=BACKGROUND)
+
+# Per route and stage: calls, rows, worst peak and retained bytes, budget overruns
+stats: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(dict)
+
+def start() -> None:
+    """Start tracing allocations and recording stages"""
+    global _active
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+    _active = True
+
+def stop() -> None:
+    """Stop recording stages and tracing allocations"""
+    global _active
+    _active = False
+    with _lock:
+        _open.clear()
+    tracemalloc.stop()
+
+def is_active() -> bool:
+    return _active
+
+def current_route() -> str:
+    return _route.get()
+
+def _fold() -> int:
+    """Credit the traced peak so far to every open frame; call with _lock held"""
+    current, peak = tracemalloc.get_traced_memory()
+    for frame in _open:
+        if peak > frame.peak:
+            frame.peak = peak
+    return current
+
+def over_budget(name: str, peak_bytes: int, rows: Optional[int]) -> bool:
+    """Check a stage's peak against its per-row budget, if it has one"""
+    budget = ROW_BUDGETS.get(name)
+    return budget is not None and bool(rows) and peak_bytes > budget * rows
+
+def record(frame: Frame, peak_bytes: int, retained_bytes: int) -> None:
+    entry = stats[frame.route].setdefault(frame.name, {
+        "calls": 0,
+        "rows": 0,
+        "peak_bytes": 0,
+        "retained_bytes": 0,
+        "peak_bytes_per_row": 0.0,
+        "over_budget": 0
+    })
+    entry["calls"] += 1
+    entry["peak_bytes"] = max(entry["peak_bytes"], peak_bytes)
+    entry["retained_bytes"] = max(entry["retained_bytes"], retained_bytes)
+    if frame.rows:
+        entry["rows"] += frame.rows
+        entry["peak_bytes_per_row"] = max(entry["peak_bytes_per_row"], round(peak_bytes / frame.rows, 1))
+    if over_budget(frame.name, peak_bytes, frame.rows):
+        entry["over_budget"] += 1
+        logger.warning(
+            "%s allocated %d bytes per row on %s, over its budget of %d",
+            frame.name, peak_bytes // frame.rows, frame.route, ROW_BUDGETS[frame.name]
+        )
+
+@contextmanager
+def stage(name: str, rows: Optional[int] = None) -> Iterator[Optional[Frame]]:
+    """Measure the peak and retained allocations of a block while profiling
+
+    Yields the frame, or None when profiling is off, so the block can set
+    frame.rows once it knows them. Tracing is process-wide: with several
+    requests in flight a stage's peak also counts the others' allocations,
+    so figures are exact for one request at a time and an upper bound
+    otherwise. Stages run in the process pool are measured in the worker
+    and merged back by executors.run_sync.
+    """
+    if not _active:
+        yield None
+        return
+    with _lock:
+        current = _fold()
+        frame = Frame(name, _route.get(), current, rows)
+        _open.add(frame)
+        tracemalloc.reset_peak()
+    try:
+        yield frame
+    finally:
+        with _lock:
+            current = _fold()
+            _open.discard(frame)
+        if _active:
+            record(frame, frame.peak - frame.start, current - frame.start)
+
+def _input_rows(args: tuple, kwargs: Dict, result: Any) -> Optional[int]:
+    """Rows of a stage whose first argument is its input list"""
+    return len(args[0]) if args and isinstance(args[0], list) else None
+
+def profiled(name: str, count_rows: Callable[[tuple, Dict, Any], Optional[int]] = _input_rows) -> Callable:
+    """Run a function as a stage
+
+    count_rows gets the call's arguments and result; by default the rows are
+    the length of the first argument.
+    """
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _active:
+                return func(*args, **kwargs)
+            with stage(name) as frame:
+                result = func(*args, **kwargs)
+                if frame is not None:
+                    frame.rows = count_rows(args, kwargs, result)
+                return result
+        return wrapper
+    return decorate
+
+def merge(figures: Dict[str, Dict[str, Dict[str, float]]]) -> None:
+    """Add stage figures measured in another process, as get_stats returned them"""
+    for route, stages in figures.items():
+        for name, theirs in stages.items():
+            entry = stats[route].get(name)
+            if entry is None:
+                stats[route][name] = dict(theirs)
+                continue
+            for key, value in theirs.items():
+                if key in ("calls", "rows", "over_budget"):
+                    entry[key] += value
+                else:
+                    entry[key] = max(entry[key], value)
+
+@contextmanager
+def session(route: str) -> Iterator[Dict[str, Dict[str, Dict[str, float]]]]:
+    """Profile a block in a process that is not profiling, such as a pool worker
+
+    Stages are filed under route, and the yielded dict holds their figures
+    once the block exits; tracing stops again afterwards.
+    """
+    figures: Dict[str, Dict[str, Dict[str, float]]] = {}
+    start()
+    token = _route.set(route)
+    try:
+        yield figures
+    finally:
+        _route.reset(token)
+        figures.update(get_stats())
+        stop()
+        reset()
+
+def get_stats() -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Get per-route, per-stage allocation figures; empty unless profiling"""
+    return {route: {name: dict(entry) for name, entry in stages.items()} for route, stages in stats.items()}
+
+def reset() -> None:
+    stats.clear()
+
+class MemoryProfileMiddleware:
+    """Record each request's peak and retained allocations under its route
+
+    The whole request is the "request" stage, and stages entered while
+    handling it are filed under the same route. A no-op unless profiling was
+    started, as it is on startup with MEMORY_PROFILING=true.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not _active or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _route.set(scope["path"])
+        try:
+            with stage("request"):
+                await self.app(scope, receive, send)
+        finally:
+            _route.reset(token)
@@ -1,6 +1,15 @@
 from typing import List, Dict
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 import random
+from app.services.planner import plan_dates, restrict, shift_date
+from app.services.tickers import MOCK_MARKET_CAPS, get_registry
+
+# Who mock congress trades are drawn from
+MOCK_CONGRESS_MEMBERS = ["John Smith", "Jane Doe", "Robert Johnson", "Mary Williams"]
+
+def mock_congress_tickers() -> List[str]:
+    """Get what mock congress trades are drawn from: the registry's large names in every sector"""
+    return get_registry().tickers_in(None, MOCK_MARKET_CAPS)
 
 def generate_mock_congress_trades(
     ticker: str = None,
@@ -9,33 +18,26 @@ def generate_mock_congress_trades(
     end_date: str = None
 ) -> List[Dict]:
     """Generate mock congress trade data for development"""
-    tickers = ["AAPL", "TSLA", "GOOGL", "MSFT", "AMZN"]
-    members = ["John Smith", "Jane Doe", "Robert Johnson", "Mary Williams"]
+    tickers = restrict(mock_congress_tickers(), ticker)
+    members = restrict(MOCK_CONGRESS_MEMBERS, congress_member)
     trade_types = ["Buy", "Sell"]
     
-    if ticker:
-        tickers = [ticker]
-    if congress_member:
-        members = [congress_member]
-        
-    base_date = datetime.now() - timedelta(days=30)
-    trades = []
+    # Only dates inside the requested range are ever drawn
+    base_date = date.today() - timedelta(days=30)
+    dates = plan_dates(base_date, base_date + timedelta(days=30), start_date, end_date)
+    if not dates:
+        return []
     
+    trades = []
     for _ in range(20):  # Generate 20 mock trades
-        trade_date = (base_date + timedelta(days=random.randint(0, 30))).strftime("%Y-%m-%d")
-        
-        if start_date and trade_date < start_date:
-            continue
-        if end_date and trade_date > end_date:
-            continue
-            
+        trade_date = random.choice(dates)
         trades.append({
             "ticker": random.choice(tickers),
             "congress_member": random.choice(members),
             "trade_type": random.choice(trade_types),
             "amount": random.randint(10000, 1000000),
             "trade_date": trade_date,
-            "disclosure_date": (datetime.strptime(trade_date, "%Y-%m-%d") + timedelta(days=random.randint(1, 10))).strftime("%Y-%m-%d")
+            "disclosure_date": shift_date(trade_date, random.randint(1, 10))
         })
     
     return sorted(trades, key=lambda x: x["trade_date"], reverse=True)
@@ -0,0 +1,143 @@
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+from bisect import bisect_left, bisect_right
+import base64
+import hashlib
+import json
+import uuid
+from app.responses import dumps
+from app.services.cache import TTLCache
+from app.services.amounts import parse_amount
+from app.services.memprofile import profiled
+from app.services.projection import project
+
+# Row fields holding each sort key, in the order they are tried; congress rows
+# come as transaction_date/amounts upstream and trade_date/amount from mocks
+SORT_FIELDS = {
+    "date": ("transaction_date", "trade_date", "date"),
+    "amount": ("amounts", "amount"),
+    "ticker": ("ticker",)
+}
+SORT_PATTERN = f"^({'|'.join(SORT_FIELDS)})$"
+ORDER_PATTERN = "^(asc|desc)$"
+
+MAX_PAGE_SIZE = 1000
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that is malformed or was issued for another sort"""
+
+def sort_value(row: Dict, sort: str) -> Tuple:
+    """Get a comparable sort value, with missing values ordered first"""
+    for field in SORT_FIELDS[sort]:
+        value = row.get(field)
+        if value is None:
+            continue
+        if sort == "amount":
+            return (1, parse_amount(value).mid)
+        return (1, str(value))
+    return (0, "")
+
+def row_id(row: Dict) -> str:
+    """Content hash used to break ties, so order is stable across versions"""
+    return hashlib.blake2b(dumps(row), digest_size=8).hexdigest()
+
+class Dataset:
+    """One version of a result set, with its sort orders and aggregates
+
+    Sort orders are built on first use and aggregates are computed once, so
+    every page of the same version reuses them.
+    """
+
+    def __init__(self, rows: List[Dict], version: str, build_aggregates: Callable[[List[Dict]], Dict]):
+        self.rows = rows
+        self.version = version
+        self.aggregates = build_aggregates(rows)
+        self._ids = [row_id(row) for row in rows]
+        # sort -> (ascending keys, row indexes in ascending order)
+        self._orders: Dict[str, Tuple[List[Tuple], List[int]]] = {}
+
+    def order(self, sort: str) -> Tuple[List[Tuple], List[int]]:
+        """Get ascending (key, row index) lists for a sort"""
+        if sort not in self._orders:
+            keyed = sorted(
+                ((sort_value(row, sort), self._ids[i]), i) for i, row in enumerate(self.rows)
+            )
+            self._orders[sort] = ([key for key, _ in keyed], [i for _, i in keyed])
+        return self._orders[sort]
+
+# Datasets by query key
+dataset_cache = TTLCache(None)
+
+@profiled("pagination.dataset", lambda args, kwargs, result: len(args[1]))
+def get_dataset(key: str, rows: List[Dict], build_aggregates: Callable[[List[Dict]], Dict]) -> Dataset:
+    """Get the Dataset for a query, rebuilding it only when the rows changed
+
+    The trade stores and the response cache hand back the same rows object
+    until their contents change, so rows are recognised by identity and the
+    version names the object rather than hashing every row on each page.
+    """
+    dataset = dataset_cache.get(key)
+    if dataset is None or dataset.rows is not rows:
+        dataset = Dataset(rows, uuid.uuid4().hex, build_aggregates)
+        dataset_cache.set(key, dataset)
+    return dataset
+
+def encode_cursor(sort: str, order: str, key: Tuple) -> str:
+    """Encode the position after a row as an opaque cursor"""
+    raw = json.dumps([sort, order, key], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple:
+    """Decode a cursor, checking it belongs to the requested sort"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, cursor_order, ((present, value), rid) = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise InvalidCursor("Cursor was issued for a different sort")
+    # Keys are compared against the dataset's, so they must have the same types
+    if present == 1:
+        expected = (int, float) if sort == "amount" else str
+        valid = isinstance(value, expected) and not isinstance(value, bool)
+    else:
+        valid = present == 0 and value == ""
+    if not valid or not isinstance(rid, str) or isinstance(present, bool):
+        raise InvalidCursor("Malformed cursor")
+    return ((present, value), rid)
+
+def paginate(
+    dataset: Dataset,
+    sort: str = "date",
+    order: str = "desc",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[FrozenSet[str]] = None
+) -> Dict[str, Any]:
+    """Get one page of a dataset after an optional cursor
+
+    Cursors hold the last row's (sort value, row id), not an offset, so rows
+    added between requests neither repeat nor get skipped.
+    """
+    keys, indexes = dataset.order(sort)
+    total = len(keys)
+    limit = total if limit is None else min(limit, MAX_PAGE_SIZE)
+
+    if order == "asc":
+        start = bisect_right(keys, decode_cursor(cursor, sort, order)) if cursor else 0
+        positions = range(start, min(start + limit, total))
+    else:
+        end = bisect_left(keys, decode_cursor(cursor, sort, order)) if cursor else total
+        positions = range(end - 1, max(end - limit, 0) - 1, -1)
+
+    page = [dataset.rows[indexes[p]] for p in positions]
+    next_cursor = None
+    if positions and (positions[-1] + 1 < total if order == "asc" else positions[-1] > 0):
+        next_cursor = encode_cursor(sort, order, keys[positions[-1]])
+
+    return {
+        "data": project(page, fields),
+        **dataset.aggregates,
+        "total": total,
+        "version": dataset.version,
+        "next_cursor": next_cursor
+    }
@@ -0,0 +1,367 @@
+from typing import Dict, List, Optional, Tuple, Iterable, AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import date as date_type, datetime
+import asyncio
+import hashlib
+import json
+import logging
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = get_settings().database_url
+POOL_SIZE = get_settings().database_pool_size
+
+# Every dataset table shares the same physical layout: a handful of typed,
+# indexed columns pulled out of the row plus the original row as jsonb, so
+# reads hand back exactly what the upstream API (or generator) produced.
+COLUMNS = ["date", "ts", "ticker", "sector", "member", "category", "row_hash", "payload"]
+
+# Source keys for each extracted column, first match wins. Upstream rows and
+# mock rows use different names for the same thing, so both are listed.
+DATASETS: Dict[str, Dict] = {
+    "congress_trades": {
+        "date": ("transaction_date", "trade_date"),
+        "ticker": ("ticker",),
+        "sector": ("sector",),
+        "member": ("reporter", "congress_member"),
+        "category": ("txn_type", "trade_type"),
+        "indexes": [("ticker", "date"), ("sector", "date"), ("member", "date")]
+    },
+    "insider_trades": {
+        "date": ("trade_date", "transaction_date"),
+        "ticker": ("ticker",),
+        "sector": ("sector",),
+        "member": ("insider_role",),
+        "category": ("trade_type",),
+        "indexes": [("ticker", "date"), ("sector", "date"), ("member", "date")]
+    },
+    "greek_flow": {
+        "date": ("date", "timestamp"),
+        "ts": ("timestamp",),
+        "ticker": ("ticker",),
+        "sector": ("sector",),
+        "indexes": [("ticker", "date"), ("sector", "date")]
+    },
+    "market_tide": {
+        "date": ("date", "timestamp"),
+        "ts": ("timestamp",),
+        "indexes": [("date", "ts")]
+    }
+}
+
+# Columns rows can be filtered on, in the order queries test them
+FILTERS = ("ticker", "sector", "member", "category")
+
+# One row per closed date span an ingest was fetched for, with the filters
+# the upstream request used (NULL for any value). Stored rows answer a
+# query only when one ingest covers all of it: rows fetched for one ticker
+# or one day say nothing about the rest of a broader range.
+COVERAGE_STATEMENTS = [
+    """CREATE TABLE IF NOT EXISTS ingest_coverage (
+        dataset text NOT NULL,
+        ticker text,
+        sector text,
+        member text,
+        category text,
+        start_date date NOT NULL,
+        end_date date NOT NULL,
+        ingested_at timestamptz NOT NULL DEFAULT now()
+    )""",
+    "CREATE INDEX IF NOT EXISTS ingest_coverage_dataset_idx ON ingest_coverage (dataset, start_date, end_date)"
+]
+
+def is_enabled() -> bool:
+    """Check whether a database has been configured"""
+    return bool(DATABASE_URL)
+
+def _first(row: Dict, keys: Iterable[str]) -> Optional[str]:
+    """Return the first non-empty value for any of the given keys"""
+    for key in keys:
+        value = row.get(key)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+def to_record(dataset: str, row: Dict, category: Optional[str] = None) -> Optional[Tuple]:
+    """Convert a row into a tuple matching COLUMNS, or None if it has no date"""
+    spec = DATASETS[dataset]
+    row_date = _first(row, spec["date"])
+    if not row_date:
+        return None
+    payload = json.dumps(row, sort_keys=True, default=str)
+    return (
+        row_date[:10],
+        _first(row, spec.get("ts", ())),
+        _first(row, spec.get("ticker", ())),
+        _first(row, spec.get("sector", ())),
+        _first(row, spec.get("member", ())),
+        category or _first(row, spec.get("category", ())),
+        hashlib.blake2b(payload.encode(), digest_size=16).hexdigest(),
+        payload
+    )
+
+def month_bounds(day: str) -> Tuple[str, str]:
+    """Get the [start, end) bounds of the monthly partition containing a date"""
+    year, month = int(day[:4]), int(day[5:7])
+    start = date_type(year, month, 1)
+    end = date_type(year + month // 12, month % 12 + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+def partition_name(dataset: str, day: str) -> str:
+    """Get the monthly partition table name for a dataset and date"""
+    return f"{dataset}_{day[:4]}_{day[5:7]}"
+
+def schema_statements(dataset: str) -> List[str]:
+    """Build the DDL for a dataset's partitioned parent table and its indexes"""
+    statements = [
+        f"""CREATE TABLE IF NOT EXISTS {dataset} (
+            date date NOT NULL,
+            ts timestamptz,
+            ticker text,
+            sector text,
+            member text,
+            category text,
+            row_hash text NOT NULL,
+            payload jsonb NOT NULL,
+            UNIQUE (row_hash, date)
+        ) PARTITION BY RANGE (date)"""
+    ]
+    for columns in DATASETS[dataset]["indexes"]:
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS {dataset}_{'_'.join(columns)}_idx "
+            f"ON {dataset} ({', '.join(columns)})"
+        )
+    return statements
+
+def partition_statement(dataset: str, day: str) -> str:
+    """Build the DDL for the monthly partition containing a date"""
+    start, end = month_bounds(day)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(dataset, day)} "
+        f"PARTITION OF {dataset} FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+
+class ConnectionPool:
+    """Minimal asyncio pool of psycopg async connections"""
+
+    def __init__(self, conninfo: str, size: int = POOL_SIZE):
+        self.conninfo = conninfo
+        self.size = size
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._opened = 0
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator:
+        """Borrow a connection, opening a new one while under the size limit"""
+        from psycopg import AsyncConnection
+
+        conn = None
+        async with self._lock:
+            if self._idle.empty() and self._opened < self.size:
+                self._opened += 1
+                try:
+                    conn = await AsyncConnection.connect(self.conninfo)
+                except Exception:
+                    self._opened -= 1
+                    raise
+        if conn is None:
+            conn = await self._idle.get()
+        try:
+            yield conn
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+        finally:
+            if conn.closed:
+                self._opened -= 1
+            else:
+                self._idle.put_nowait(conn)
+
+    async def close(self) -> None:
+        """Close every idle connection"""
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            await conn.close()
+            self._opened -= 1
+
+_pool: Optional[ConnectionPool] = None
+_ready_datasets: set = set()
+_ready_partitions: set = set()
+
+def get_pool() -> ConnectionPool:
+    """Get the shared connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(DATABASE_URL)
+    return _pool
+
+async def close_pool() -> None:
+    """Close the shared connection pool"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+async def _ensure_schema(conn, dataset: str, days: Iterable[str]) -> None:
+    """Create the dataset table and any missing monthly partitions"""
+    if dataset not in _ready_datasets:
+        for statement in COVERAGE_STATEMENTS + schema_statements(dataset):
+            await conn.execute(statement)
+        _ready_datasets.add(dataset)
+    for day in sorted(set(days)):
+        name = partition_name(dataset, day)
+        if name not in _ready_partitions:
+            await conn.execute(partition_statement(dataset, day))
+            _ready_partitions.add(name)
+
+def coverage_record(dataset: str, coverage: Optional[Dict]) -> Optional[Tuple]:
+    """Convert the filters and dates rows were fetched for into an ingest_coverage row
+
+    Only closed spans are recorded: a range still open or without a start
+    may gain rows after this ingest.
+    """
+    if not coverage:
+        return None
+    start_date, end_date = coverage.get("start_date"), coverage.get("end_date")
+    if not start_date or not is_historical(end_date):
+        return None
+    return (dataset, *(coverage.get(column) or None for column in FILTERS), start_date, end_date)
+
+async def ingest(
+    dataset: str,
+    rows: List[Dict],
+    category: Optional[str] = None,
+    coverage: Optional[Dict] = None
+) -> int:
+    """Bulk load rows with COPY, skipping rows that are already stored
+
+    coverage holds the filters and start_date/end_date of the request the
+    rows answer, recorded so later reads of that span can trust them.
+    """
+    if not is_enabled() or not rows:
+        return 0
+    records = [
+        record for record in (to_record(dataset, row, category) for row in rows)
+        if record
+    ]
+    if not records:
+        return 0
+
+    async with get_pool().connection() as conn:
+        await _ensure_schema(conn, dataset, (record[0] for record in records))
+        # COPY cannot upsert, so stage into a temp table and merge from there
+        await conn.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS _stage_{dataset} "
+            f"(LIKE {dataset} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        async with conn.cursor() as cur:
+            async with cur.copy(
+                f"COPY _stage_{dataset} ({', '.join(COLUMNS)}) FROM STDIN"
+            ) as copy:
+                for record in records:
+                    await copy.write_row(record)
+            await cur.execute(
+                f"INSERT INTO {dataset} ({', '.join(COLUMNS)}) "
+                f"SELECT {', '.join(COLUMNS)} FROM _stage_{dataset} "
+                f"ON CONFLICT DO NOTHING"
+            )
+            inserted = cur.rowcount
+        covered = coverage_record(dataset, coverage)
+        if covered:
+            await conn.execute(
+                f"INSERT INTO ingest_coverage (dataset, {', '.join(FILTERS)}, start_date, end_date) "
+                f"VALUES ({', '.join(['%s'] * len(covered))})",
+                covered
+            )
+        return inserted
+
+def build_query(
+    dataset: str,
+    ticker: Optional[str] = None,
+    sector: Optional[str] = None,
+    member: Optional[str] = None,
+    category: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Tuple[str, List]:
+    """Build the SELECT for stored rows matching the given filters"""
+    clauses = []
+    params: List = []
+    for column, value in zip(FILTERS, (ticker, sector, member, category)):
+        if value:
+            clauses.append(f"{column} = %s")
+            params.append(value)
+    if start_date:
+        clauses.append("date >= %s")
+        params.append(start_date)
+    if end_date:
+        clauses.append("date <= %s")
+        params.append(end_date)
+
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return f"SELECT payload FROM {dataset}{where} ORDER BY date, ts NULLS FIRST", params
+
+def build_coverage_query(
+    dataset: str,
+    ticker: Optional[str] = None,
+    sector: Optional[str] = None,
+    member: Optional[str] = None,
+    category: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Optional[Tuple[str, List]]:
+    """Build the check for an ingest covering a query, or None if no ingest can
+
+    An ingest covers a query when its span holds the query's and each of
+    its filters is unset or equal to the query's.
+    """
+    if not start_date or not end_date:
+        return None
+    clauses = ["dataset = %s", "start_date <= %s", "end_date >= %s"]
+    params: List = [dataset, start_date, end_date]
+    for column, value in zip(FILTERS, (ticker, sector, member, category)):
+        if value:
+            clauses.append(f"({column} IS NULL OR {column} = %s)")
+            params.append(value)
+        else:
+            clauses.append(f"{column} IS NULL")
+    return f"SELECT EXISTS (SELECT 1 FROM ingest_coverage WHERE {' AND '.join(clauses)})", params
+
+async def fetch_rows(dataset: str, **filters) -> List[Dict]:
+    """Read stored rows for a dataset, or an empty list if no ingest covers the query"""
+    if not is_enabled():
+        return []
+    covering = build_coverage_query(dataset, **filters)
+    if covering is None:
+        return []
+    query, params = build_query(dataset, **filters)
+    try:
+        async with get_pool().connection() as conn:
+            await _ensure_schema(conn, dataset, ())
+            cursor = await conn.execute(*covering)
+            if not (await cursor.fetchone())[0]:
+                return []
+            cursor = await conn.execute(query, params)
+            return [row[0] for row in await cursor.fetchall()]
+    except Exception as e:
+        logger.warning("Reading %s from the database failed: %s", dataset, e)
+        return []
+
+async def store_rows(
+    dataset: str,
+    rows: List[Dict],
+    category: Optional[str] = None,
+    coverage: Optional[Dict] = None
+) -> None:
+    """Persist rows fetched upstream without ever failing the caller"""
+    try:
+        await ingest(dataset, rows, category, coverage)
+    except Exception as e:
+        logger.warning("Storing %s in the database failed: %s", dataset, e)
+
+def is_historical(end_date: Optional[str]) -> bool:
+    """Check whether a date range is closed, so stored rows can answer it"""
+    return bool(end_date) and end_date < datetime.now().strftime("%Y-%m-%d")
@@ -0,0 +1,46 @@
+from typing import List, Optional, Sequence, Tuple
+from datetime import date, timedelta
+from functools import lru_cache
+
+# Bounds the mock earnings surprise is drawn from, per surprise_type filter
+SURPRISE_BOUNDS = {
+    None: (-0.5, 0.5),
+    "positive": (0.0, 0.5),
+    "negative": (-0.5, 0.0)
+}
+
+def plan_dates(first: date, last: date, start_date: Optional[str], end_date: Optional[str]) -> List[str]:
+    """Get the dates in [first, last] that also fall in the requested range
+
+    Mock generators draw from this list instead of generating a date and
+    discarding it, so every row they build is kept. Bounds that are not
+    ISO dates are compared as strings, as rows were filtered before.
+    """
+    low = high = None
+    if start_date:
+        try:
+            first = max(first, date.fromisoformat(start_date))
+        except ValueError:
+            low = start_date
+    if end_date:
+        try:
+            last = min(last, date.fromisoformat(end_date))
+        except ValueError:
+            high = end_date
+    days = [(first + timedelta(days=day)).isoformat() for day in range((last - first).days + 1)]
+    if low is not None or high is not None:
+        days = [day for day in days if (low is None or day >= low) and (high is None or day <= high)]
+    return days
+
+@lru_cache(maxsize=4096)
+def shift_date(day: str, days: int) -> str:
+    """Add days to a YYYY-MM-DD date string"""
+    return (date.fromisoformat(day) + timedelta(days=days)).isoformat()
+
+def surprise_bounds(surprise_type: Optional[str]) -> Tuple[float, float]:
+    """Get the earnings surprise range that satisfies a surprise_type filter"""
+    return SURPRISE_BOUNDS.get(surprise_type, SURPRISE_BOUNDS[None])
+
+def restrict(choices: Sequence[str], requested: Optional[str]) -> List[str]:
+    """Narrow a categorical column to the requested value, if any"""
+    return [requested] if requested else list(choices)
@@ -1,8 +1,16 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from datetime import datetime, timedelta
 import random
-import pytz
+from app.services import deadlines
+from app.services.market_calendar import get_market_tz, market_time_label
+from app.services.projection import wants
+from app.services.planner import plan_dates, restrict
+from app.services.executors import cpu_bound, run_sync
+from app.services.memprofile import profiled
+from app.services.records import FlowPoint
+from app.services.tickers import get_registry
 
+@profiled("premium_flow.historical_stats")
 def get_historical_stats(data: List[Dict], lookback_days: int = 30) -> Dict:
     """Calculate historical statistics for premium flow data"""
     # Convert lookback_days to date threshold
@@ -36,22 +44,25 @@ def get_historical_stats(data: List[Dict], lookback_days: int = 30) -> Dict:
     
     return stats
 
+@cpu_bound
+@profiled("premium_flow.mock", lambda args, kwargs, result: len(result[0]))
 def generate_mock_premium_flow(
     option_type: Optional[str] = None,
     sector: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     lookback_days: int = 30,
-    is_intraday: bool = False
+    is_intraday: bool = False,
+    fields: Optional[FrozenSet[str]] = None
 ) -> Tuple[List[Dict], Dict]:
     """Generate mock premium flow data for development"""
-    sectors = ["tech", "healthcare", "energy", "finance", "consumer", "industrial"]
-    option_types = ["call", "put"]
-    
-    if sector:
-        sectors = [sector]
-    if option_type:
-        option_types = [option_type]
+    with_strike = wants(fields, "avg_strike")
+    with_expiry = wants(fields, "avg_expiry_days")
+    with_time = wants(fields, "market_time")
+    market_tz = get_market_tz() if with_time and is_intraday else None
+
+    sectors = restrict(get_registry().sectors, sector)
+    option_types = restrict(["call", "put"], option_type)
         
     # Set base date based on input parameters or default to 30 days ago
     if start_date:
@@ -61,76 +72,85 @@ def generate_mock_premium_flow(
     
     data_points = []
     
+    if is_intraday:
+        # Every minute falls on base_date, so the range filter is checked once,
+        # and the minute labels are shared by every sector and option type
+        minutes = []
+        if plan_dates(base_date.date(), base_date.date(), start_date, end_date):
+            for minute in range(0, 390, 1):  # Trading day minutes (6.5 hours)
+                timestamp = base_date.replace(hour=9, minute=30) + timedelta(minutes=minute)
+                # Add some intraday patterns (higher volume at open/close)
+                time_factor = 1.0
+                if minute < 30:  # First 30 minutes
+                    time_factor = 1.5
+                elif minute > 360:  # Last 30 minutes
+                    time_factor = 1.3
+                # Convert to NY timezone for market time
+                market_time = timestamp.astimezone(market_tz).strftime("%Y-%m-%d %H:%M:%S ET") if with_time else None
+                minutes.append((timestamp.strftime("%Y-%m-%d"), timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"), time_factor, market_time))
+    else:
+        # Only the days of the 30-day window inside the requested range
+        dates = plan_dates(base_date.date(), base_date.date() + timedelta(days=29), start_date, end_date)
+    
     # Generate historical data for each sector
     for current_sector in sectors:
         base_premium = random.randint(1000000, 5000000)  # Base premium for the sector
         
         if is_intraday:
             # Generate minute-by-minute data for trading day
-            for minute in range(0, 390, 1):  # Trading day minutes (6.5 hours)
-                timestamp = base_date.replace(hour=9, minute=30) + timedelta(minutes=minute)
-                date = timestamp.strftime("%Y-%m-%d")
-                
-                # Filter dates based on range
-                if start_date and date < start_date:
-                    continue
-                if end_date and date > end_date:
-                    continue
-                
+            for date, timestamp, time_factor, market_time in minutes:
                 # Add some randomness to premiums with intraday patterns
                 for current_type in option_types:
-                    # Add some intraday patterns (higher volume at open/close)
-                    time_factor = 1.0
-                    if minute < 30:  # First 30 minutes
-                        time_factor = 1.5
-                    elif minute > 360:  # Last 30 minutes
-                        time_factor = 1.3
-                    
                     premium = base_premium * time_factor * (1 + random.uniform(-0.2, 0.2))
                     volume = int(random.randint(1000, 10000) * time_factor)
                     
-                    # Convert to NY timezone for market time
-                    market_time = timestamp.astimezone(pytz.timezone("America/New_York"))
-                    data_points.append({
-                        "sector": current_sector,
-                        "option_type": current_type,
-                        "premium": premium,
-                        "volume": volume,
-                        "date": date,
-                        "timestamp": timestamp.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                        "market_time": market_time.strftime("%Y-%m-%d %H:%M:%S ET"),
-                        "avg_strike": random.randint(50, 500),
-                        "avg_expiry_days": random.randint(7, 90)
-                    })
+                    point = FlowPoint(current_sector, current_type, premium, volume, date, timestamp)
+                    if with_time:
+                        point.market_time = market_time
+                    if with_strike:
+                        point.avg_strike = random.randint(50, 500)
+                    if with_expiry:
+                        point.avg_expiry_days = random.randint(7, 90)
+                    data_points.append(point)
         else:
             # Generate daily data
-            for day in range(30):  # 30 days of data
-                date = (base_date + timedelta(days=day)).strftime("%Y-%m-%d")
-                
-                # Filter dates based on range
-                if start_date and date < start_date:
-                    continue
-                if end_date and date > end_date:
-                    continue
-                    
+            for date in dates:
                 # Add some randomness to premiums
                 for current_type in option_types:
                     premium = base_premium * (1 + random.uniform(-0.2, 0.2))  # ±20% variation
                     volume = random.randint(1000, 10000)
                     
-                    data_points.append({
-                        "sector": current_sector,
-                        "option_type": current_type,
-                        "premium": premium,
-                        "volume": volume,
-                        "date": date,
-                        "avg_strike": random.randint(50, 500),
-                        "avg_expiry_days": random.randint(7, 90)
-                    })
+                    point = FlowPoint(current_sector, current_type, premium, volume, date)
+                    if with_strike:
+                        point.avg_strike = random.randint(50, 500)
+                    if with_expiry:
+                        point.avg_expiry_days = random.randint(7, 90)
+                    data_points.append(point)
             
             # Randomly adjust base premium for next day
             base_premium *= (1 + random.uniform(-0.05, 0.05))  # ±5% daily change
     
+    return add_cumulative_flow(data_points, lookback_days, fields)
+
+@cpu_bound
+@profiled("premium_flow.cumulative")
+def add_cumulative_flow(
+    data_points: List[Dict],
+    lookback_days: int = 30,
+    fields: Optional[FrozenSet[str]] = None
+) -> Tuple[List[FlowPoint], Dict]:
+    """Sort premium flow rows and add cumulative premium and net metrics
+
+    Derived fields left out of fields are never built, which also skips the
+    per-row timezone conversion when market_time is not requested. Rows come
+    back as FlowPoint records, which read like dicts and serialize as them.
+    """
+    with_call = wants(fields, "cumulative_call_premium")
+    with_put = wants(fields, "cumulative_put_premium")
+    with_net_premium = wants(fields, "net_premium")
+    with_net_volume = wants(fields, "net_volume")
+    with_time = wants(fields, "market_time")
+
     # Sort data points by date and time if available
     sorted_data = sorted(data_points, key=lambda x: (x["date"], x.get("time", "00:00:00")))
     
@@ -141,41 +161,61 @@ def generate_mock_premium_flow(
     cumulative_data = []
     call_sum = 0
     put_sum = 0
+    # Every sector and option type shares each minute, so each market time
+    # is converted once and its string shared by those rows
+    market_times: Dict[Tuple, str] = {}
     
-    for point in sorted_data:
-        if point["option_type"] == "call":
-            call_sum += point["premium"]
+    for i, point in enumerate(sorted_data):
+        if i % deadlines.CHECKPOINT_ROWS == 0:
+            deadlines.check()
+        row = point.copy() if isinstance(point, FlowPoint) else FlowPoint.from_dict(point)
+        if row.option_type == "call":
+            call_sum += row.premium
             cumulative_call = call_sum
             cumulative_put = put_sum
         else:
-            put_sum += point["premium"]
+            put_sum += row.premium
             cumulative_call = call_sum
             cumulative_put = put_sum
-            
-        # Create market_time based on whether data is intraday
-        if "time" in point:
-            market_time = datetime.strptime(f"{point['date']} {point['time']}", "%Y-%m-%d %H:%M:%S")
-        else:
-            market_time = datetime.strptime(point["date"], "%Y-%m-%d")
-        
-        # Convert to NY timezone
-        market_time = market_time.replace(tzinfo=pytz.UTC).astimezone(pytz.timezone("America/New_York"))
-        
+
+        if with_call:
+            row.cumulative_call_premium = cumulative_call
+        if with_put:
+            row.cumulative_put_premium = cumulative_put
         # Calculate net premium and volume metrics
-        net_premium = cumulative_call - cumulative_put
-        net_volume = point["volume"] if point["option_type"] == "call" else -point["volume"]
-        
-        cumulative_data.append({
-            **point,
-            "cumulative_call_premium": cumulative_call,
-            "cumulative_put_premium": cumulative_put,
-            "net_premium": net_premium,
-            "net_volume": net_volume,
-            "market_time": market_time.strftime("%Y-%m-%d %H:%M:%S ET")
-        })
+        if with_net_premium:
+            row.net_premium = cumulative_call - cumulative_put
+        if with_net_volume:
+            row.net_volume = row.volume if row.option_type == "call" else -row.volume
+        if with_time:
+            moment = (row.date, row.time)
+            label = market_times.get(moment)
+            if label is None:
+                # Intraday rows carry a time; daily ones are labelled at midnight
+                label = market_times[moment] = market_time_label(row.date, row.time) if "time" in row else market_time_label(row.date)
+            row.market_time = label
+        cumulative_data.append(row)
     
     return cumulative_data, historical_stats
 
+async def get_premium_flow(
+    option_type: Optional[str] = None,
+    sector: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    lookback_days: int = 30,
+    is_intraday: bool = False,
+    fields: Optional[FrozenSet[str]] = None
+) -> Tuple[List[Dict], Dict]:
+    """Get premium flow, which has no upstream source yet, from mock data
+
+    Only the derived fields in fields are built; the insight reads the raw ones.
+    """
+    return await run_sync(
+        generate_mock_premium_flow,
+        option_type, sector, start_date, end_date, lookback_days, is_intraday, fields
+    )
+
 def get_sector_descriptions() -> Dict[str, str]:
     """Get descriptions of sectors for tooltips"""
     return {
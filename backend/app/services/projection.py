@@ -0,0 +1,22 @@
+from typing import Dict, FrozenSet, List, Optional
+from app.services.records import Record
+
+def parse_fields(fields: Optional[str]) -> Optional[FrozenSet[str]]:
+    """Parse a comma-separated fields= parameter; None means every field"""
+    if not fields:
+        return None
+    parsed = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    return parsed or None
+
+def wants(fields: Optional[FrozenSet[str]], name: str) -> bool:
+    """Check whether a field should be built"""
+    return fields is None or name in fields
+
+def project(rows: List[Dict], fields: Optional[FrozenSet[str]]) -> List[Dict]:
+    """Keep only the requested fields of each row"""
+    if fields is None:
+        return rows
+    return [
+        row.select(fields) if isinstance(row, Record) else {name: value for name, value in row.items() if name in fields}
+        for row in rows
+    ]
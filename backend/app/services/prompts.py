@@ -3,6 +3,7 @@ CONGRESS_TRADES_PROMPT = """Analyze Congress member trading activity with specia
 
 1. Million-Dollar Transactions:
    - Identify and quantify all trades >$1M with exact amounts
+   - Amounts are band midpoints; min_amount/max_amount and disclosed_range give the disclosed bounds
    - Track member-specific large position changes
    - Note timing of major transactions relative to market events
    - Calculate net position changes for top traders
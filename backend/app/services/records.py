@@ -0,0 +1,208 @@
+from typing import Any, Dict, FrozenSet, Iterator, Optional, Tuple
+from collections.abc import Mapping
+from operator import attrgetter
+
+class _Missing:
+    """Marks a slot whose field the row does not have"""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self) -> str:
+        # Unpickles as the module's singleton, which `is` checks rely on
+        return "MISSING"
+
+MISSING = _Missing()
+
+class Record(Mapping):
+    """Compact row with a fixed set of fields in __slots__
+
+    Reads like the dict it replaces (row["premium"], row.get(...), "time"
+    in row, iteration over the fields it has), so insights, projection and
+    columnar output take either. Fields the row lacks hold MISSING and are
+    skipped; keys outside FIELDS go to a small overflow dict. Rows become
+    real dicts only when serialized, through to_dict().
+    """
+
+    __slots__ = ("_extra",)
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+        cls._values = attrgetter(*cls.FIELDS)
+
+    @classmethod
+    def from_dict(cls, row: Mapping) -> "Record":
+        """Build a record from a dict row, keeping unknown keys"""
+        try:
+            return cls(**row)
+        except TypeError:
+            pass
+        record = cls.__new__(cls)
+        for name in cls.FIELDS:
+            setattr(record, name, row.get(name, MISSING))
+        extra = {key: value for key, value in row.items() if key not in cls._field_set}
+        record._extra = extra or None
+        return record
+
+    def copy(self) -> "Record":
+        record = self.__class__.__new__(self.__class__)
+        for name, value in zip(self.FIELDS, self._values(self)):
+            setattr(record, name, value)
+        record._extra = dict(self._extra) if self._extra else None
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        row = {name: value for name, value in zip(self.FIELDS, self._values(self)) if value is not MISSING}
+        if self._extra:
+            row.update(self._extra)
+        return row
+
+    def select(self, fields: FrozenSet[str]) -> Dict[str, Any]:
+        """to_dict() limited to fields, read straight from the slots"""
+        row = {
+            name: value for name, value in zip(self.FIELDS, self._values(self))
+            if value is not MISSING and name in fields
+        }
+        if self._extra:
+            row.update((key, value) for key, value in self._extra.items() if key in fields)
+        return row
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            value = getattr(self, key)
+            if value is not MISSING:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._field_set:
+            value = getattr(self, key)
+            return default if value is MISSING else value
+        if self._extra:
+            return self._extra.get(key, default)
+        return default
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._field_set:
+            return getattr(self, key) is not MISSING
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for name, value in zip(self.FIELDS, self._values(self)):
+            if value is not MISSING:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(value is not MISSING for value in self._values(self)) + len(self._extra or ())
+
+    def __repr__(self) -> str:
+        # The dict repr, so prompts and keys built with str() are unchanged
+        return repr(self.to_dict())
+
+    def __getstate__(self) -> Tuple:
+        return self._values(self), self._extra
+
+    def __setstate__(self, state: Tuple) -> None:
+        values, extra = state
+        for name, value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+        self._extra = extra
+
+class TidePoint(Record):
+    """One market tide point with its cumulative premiums"""
+
+    FIELDS = (
+        "date", "net_call_premium", "net_put_premium", "net_volume", "timestamp",
+        "cumulative_call_premium", "cumulative_put_premium", "net_premium", "market_time"
+    )
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        date: Any = MISSING,
+        net_call_premium: Any = MISSING,
+        net_put_premium: Any = MISSING,
+        net_volume: Any = MISSING,
+        timestamp: Any = MISSING,
+        cumulative_call_premium: Any = MISSING,
+        cumulative_put_premium: Any = MISSING,
+        net_premium: Any = MISSING,
+        market_time: Any = MISSING,
+        _extra: Optional[Dict[str, Any]] = None
+    ):
+        self.date = date
+        self.net_call_premium = net_call_premium
+        self.net_put_premium = net_put_premium
+        self.net_volume = net_volume
+        self.timestamp = timestamp
+        self.cumulative_call_premium = cumulative_call_premium
+        self.cumulative_put_premium = cumulative_put_premium
+        self.net_premium = net_premium
+        self.market_time = market_time
+        self._extra = _extra
+
+class FlowPoint(Record):
+    """One premium flow row, daily or intraday, with its cumulative metrics"""
+
+    FIELDS = (
+        "sector", "option_type", "premium", "volume", "date", "timestamp", "time",
+        "avg_strike", "avg_expiry_days",
+        "cumulative_call_premium", "cumulative_put_premium", "net_premium", "net_volume", "market_time"
+    )
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        sector: Any = MISSING,
+        option_type: Any = MISSING,
+        premium: Any = MISSING,
+        volume: Any = MISSING,
+        date: Any = MISSING,
+        timestamp: Any = MISSING,
+        time: Any = MISSING,
+        avg_strike: Any = MISSING,
+        avg_expiry_days: Any = MISSING,
+        cumulative_call_premium: Any = MISSING,
+        cumulative_put_premium: Any = MISSING,
+        net_premium: Any = MISSING,
+        net_volume: Any = MISSING,
+        market_time: Any = MISSING,
+        _extra: Optional[Dict[str, Any]] = None
+    ):
+        self.sector = sector
+        self.option_type = option_type
+        self.premium = premium
+        self.volume = volume
+        self.date = date
+        self.timestamp = timestamp
+        self.time = time
+        self.avg_strike = avg_strike
+        self.avg_expiry_days = avg_expiry_days
+        self.cumulative_call_premium = cumulative_call_premium
+        self.cumulative_put_premium = cumulative_put_premium
+        self.net_premium = net_premium
+        self.net_volume = net_volume
+        self.market_time = market_time
+        self._extra = _extra
+
+def to_plain(value: Any) -> Any:
+    """Serializer fallback: records become dicts, anything else a string"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    return str(value)
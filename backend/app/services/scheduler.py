@@ -0,0 +1,117 @@
+from typing import Awaitable, Callable, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import logging
+from app.services import market_calendar
+from app.services.cache import refreshing
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+PREWARM_ENABLED = get_settings().prewarm_enabled
+PREWARM_WATCHLIST = get_settings().prewarm_watchlist
+MARKET_TIDE_INTERVAL = get_settings().prewarm_market_tide_interval
+CONGRESS_TRADES_INTERVAL = get_settings().prewarm_congress_trades_interval
+GREEK_FLOW_INTERVAL = get_settings().prewarm_greek_flow_interval
+
+# Longest sleep while the market is closed, so clock changes are picked up
+MAX_IDLE_SLEEP = 900
+
+class Job:
+    """A coroutine polled at a fixed cadence during market hours"""
+
+    def __init__(self, name: str, interval: float, run: Callable[[], Awaitable]):
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.last_run: Optional[datetime] = None
+        self.failures = 0
+
+class PrewarmScheduler:
+    """Polls upstream data during market hours to keep the caches warm"""
+
+    def __init__(self, jobs: List[Job], clock: Callable[[], datetime] = market_calendar.market_now):
+        self.jobs = jobs
+        self.clock = clock
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start one polling task per job"""
+        for job in self.jobs:
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"prewarm:{job.name}"))
+
+    async def stop(self) -> None:
+        """Cancel every polling task and wait for them to finish"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_once(self, job: Job) -> None:
+        """Run a job with cache reads bypassed so its results replace stale ones"""
+        try:
+            with refreshing():
+                await job.run()
+            job.last_run = self.clock()
+        except Exception as e:
+            job.failures += 1
+            logger.warning("Prewarm job %s failed: %s", job.name, e)
+
+    def seconds_until_next_run(self, job: Job) -> float:
+        """Get how long to wait before a job should run again"""
+        now = self.clock()
+        if not market_calendar.is_market_open(now):
+            wait = (market_calendar.next_open(now) - now).total_seconds()
+            return min(max(wait, 1.0), MAX_IDLE_SLEEP)
+        if job.last_run is None:
+            return 0.0
+        return max(job.interval - (now - job.last_run).total_seconds(), 0.0)
+
+    async def _loop(self, job: Job) -> None:
+        """Poll a job forever, sleeping through closed market hours"""
+        while True:
+            wait = self.seconds_until_next_run(job)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            await self.run_once(job)
+
+    def get_status(self) -> List[Dict]:
+        """Get last-run and failure counts for every job"""
+        return [
+            {
+                "name": job.name,
+                "interval": job.interval,
+                "last_run": job.last_run.isoformat() if job.last_run else None,
+                "failures": job.failures
+            }
+            for job in self.jobs
+        ]
+
+def build_default_jobs(watchlist: List[str] = PREWARM_WATCHLIST) -> List[Job]:
+    """Build prewarm jobs for the default views the panels request"""
+    from app.services.greek_flow import get_greek_flow
+    from app.services.market_tide import get_market_tide
+    from app.services.unusual_whales import get_congress_trades
+
+    jobs = [
+        Job("market_tide", MARKET_TIDE_INTERVAL, lambda: get_market_tide()),
+        Job("congress_trades", CONGRESS_TRADES_INTERVAL, lambda: get_congress_trades())
+    ]
+    for ticker in watchlist:
+        jobs.append(Job(
+            f"greek_flow:{ticker}",
+            GREEK_FLOW_INTERVAL,
+            lambda ticker=ticker: get_greek_flow(ticker)
+        ))
+    return jobs
+
+def create_scheduler() -> Optional[PrewarmScheduler]:
+    """Create the prewarm scheduler, or None if it should not run"""
+    from app.services.unusual_whales import API_KEY
+
+    # Without an upstream key every service falls back to random mock data,
+    # which is neither worth caching nor worth spending insight calls on
+    if not PREWARM_ENABLED or not API_KEY:
+        return None
+    return PrewarmScheduler(build_default_jobs())
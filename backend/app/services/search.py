@@ -0,0 +1,186 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from array import array
+from collections import Counter
+import heapq
+from app.services.persistence import DATASETS
+from app.services.tickers import get_registry
+
+KINDS = ("member", "ticker")
+MAX_RESULTS = 50
+# Typeahead repeats the same few prefixes; results are kept until the index changes
+RESULT_CACHE_SIZE = 4096
+
+# Share of the query's trigrams an entry must contain to count as a fuzzy match
+MIN_SIMILARITY = 0.5
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+def trigrams(text: str, partial: bool = False) -> List[str]:
+    """Trigrams of each word padded with two leading and one trailing space
+
+    With partial, the last word is taken as still being typed and gets no
+    trailing space, so "rob" matches "robert" as well as "rob".
+    """
+    words = text.split()
+    grams = []
+    for i, word in enumerate(words):
+        padded = f"  {word}" if partial and i == len(words) - 1 else f"  {word} "
+        grams.extend(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+class Entry:
+    """One member or ticker, with the normalized terms it is found by"""
+
+    __slots__ = ("kind", "value", "name", "terms", "trades")
+
+    def __init__(self, kind: str, value: str, name: Optional[str], terms: Tuple[str, ...]):
+        self.kind = kind
+        self.value = value
+        self.name = name
+        self.terms = terms
+        self.trades = 0
+
+    def to_dict(self) -> Dict:
+        result = {"kind": self.kind, "value": self.value, "trades": self.trades}
+        if self.name:
+            result["name"] = self.name
+        return result
+
+class SearchIndex:
+    """Typeahead over congress members and tickers seen in ingested trades
+
+    Every entry's terms are split into padded trigrams, each mapped to the
+    entries holding it. A query counts shared trigrams over those posting
+    lists only, so it never scans the entries: exact and prefix matches
+    rank first, then typos sharing at least MIN_SIMILARITY of the query's
+    trigrams, and the most traded names first within each. Trades are
+    added as they arrive, growing the lists and activity counts in place.
+    """
+
+    def __init__(self):
+        self.entries: List[Entry] = []
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._postings: Dict[str, array] = {}
+        self._results: Dict[Tuple[str, int, Optional[str]], List[Dict]] = {}
+        self.queries = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _entry(self, kind: str, value: str, info: Optional[Dict] = None) -> Entry:
+        key = (kind, normalize(value))
+        entry_id = self._ids.get(key)
+        if entry_id is not None:
+            return self.entries[entry_id]
+        # Tickers are also found by company name
+        if info is None and kind == "ticker":
+            info = get_registry().lookup(value)
+        name = info["name"] if info else None
+        terms = tuple(dict.fromkeys(normalize(term) for term in (value, name) if term))
+        entry = Entry(kind, value.strip(), name, terms)
+        entry_id = self._ids[key] = len(self.entries)
+        self.entries.append(entry)
+        for gram in set(gram for term in terms for gram in trigrams(term)):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("I")
+            postings.append(entry_id)
+        return entry
+
+    def add(self, kind: str, value: str, trades: int = 1, info: Optional[Dict] = None) -> None:
+        """Count trades for a member or ticker, indexing it the first time it is seen
+
+        info is a ticker's registry metadata when the caller already has it.
+        """
+        if value and value.strip():
+            self._entry(kind, value, info).trades += trades
+            self._results.clear()
+
+    def seed(self, kind: str, values: Iterable[str]) -> None:
+        """Index names known before any of their trades arrive, with no activity"""
+        for value in values:
+            if value and value.strip() and (kind, normalize(value)) not in self._ids:
+                self._entry(kind, value)
+                self._results.clear()
+
+    def add_trades(self, rows: Iterable[Dict]) -> None:
+        """Count each row's member and ticker"""
+        spec = DATASETS["congress_trades"]
+        members: Counter = Counter()
+        tickers: Counter = Counter()
+        for row in rows:
+            for key in spec["member"]:
+                if row.get(key):
+                    members[row[key]] += 1
+                    break
+            if row.get("ticker"):
+                tickers[row["ticker"]] += 1
+        for value, trades in members.items():
+            self.add("member", value, trades)
+        known = get_registry().lookup_many(tickers)
+        for value, trades in tickers.items():
+            self.add("ticker", value, trades, known.get(value))
+
+    def _tier(self, entry: Entry, query: str, words: List[str]) -> int:
+        """3 exact, 2 prefix of a term, 1 every query word starts a word, 0 fuzzy"""
+        tier = 0
+        for term in entry.terms:
+            if term == query:
+                return 3
+            if term.startswith(query):
+                tier = 2
+            elif tier < 1:
+                term_words = term.split()
+                if all(any(word.startswith(typed) for word in term_words) for typed in words):
+                    tier = 1
+        return tier
+
+    def search(self, text: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict]:
+        """Get up to limit entries matching text, best first"""
+        self.queries += 1
+        query = normalize(text)
+        if not query:
+            return []
+        key = (query, limit, kind)
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached
+        grams = trigrams(query, partial=True)
+        shared: Counter = Counter()
+        postings = self._postings
+        for gram in grams:
+            entries = postings.get(gram)
+            if entries is not None:
+                shared.update(entries)
+
+        words = query.split()
+        needed = MIN_SIMILARITY * len(grams)
+        # An entry every query word starts a word of misses at most the
+        # trailing trigram of each word but the last; below that it is fuzzy
+        strong = len(grams) - len(words) + 1
+        entries = self.entries
+        ranked = []
+        for entry_id, count in shared.items():
+            if count < needed:
+                continue
+            entry = entries[entry_id]
+            if kind is not None and entry.kind != kind:
+                continue
+            tier = self._tier(entry, query, words) if count >= strong else 0
+            ranked.append((-tier, -count, -entry.trades, entry.value, entry_id))
+        results = [entries[item[-1]].to_dict() for item in heapq.nsmallest(limit, ranked)]
+        if len(self._results) >= RESULT_CACHE_SIZE:
+            self._results.clear()
+        self._results[key] = results
+        return results
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **{f"{kind}s": sum(entry.kind == kind for entry in self.entries) for kind in KINDS},
+            "trigrams": len(self._postings),
+            "queries": self.queries
+        }
+
+# Members and tickers of every congress trade the backend has seen
+congress_search = SearchIndex()
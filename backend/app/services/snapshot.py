@@ -0,0 +1,178 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from app.services.cache import CACHES, TTLCache
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = get_settings().cache_snapshot_path
+SNAPSHOT_INTERVAL = get_settings().cache_snapshot_interval
+# Snapshots older than this are ignored entirely on startup
+SNAPSHOT_MAX_AGE = get_settings().cache_snapshot_max_age
+
+# File layout: MAGIC, a little-endian u32 header length, a JSON header
+# mapping cache name -> key -> [offset, length, expires_at], then the
+# zlib-compressed JSON value blobs back to back. Offsets are relative to the
+# end of the header so the header can be built after the blobs.
+MAGIC = b"LKZSNAP1"
+_HEADER_LEN = struct.Struct("<I")
+
+def encode_value(value) -> bytes:
+    """Compress a JSON-serializable cache value"""
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode(), 6)
+
+def decode_value(blob: bytes):
+    """Decompress a cache value written by encode_value"""
+    return json.loads(zlib.decompress(blob))
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file
+
+    Only the header is parsed up front; each value is decompressed the first
+    time its key is looked up.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a cache snapshot")
+        start = len(MAGIC)
+        (header_len,) = _HEADER_LEN.unpack_from(self._mmap, start)
+        start += _HEADER_LEN.size
+        header = json.loads(self._mmap[start:start + header_len])
+        self.created_at: float = header["created_at"]
+        self._index: Dict[str, Dict[str, List]] = header["caches"]
+        self._data_start = start + header_len
+
+    def _blob(self, offset: int, length: int) -> bytes:
+        start = self._data_start + offset
+        return self._mmap[start:start + length]
+
+    def lookup(self, cache_name: str, key: str) -> Optional[Tuple[Optional[float], object]]:
+        """Get (expires_at, value) for a key if it is present and still fresh"""
+        entry = self._index.get(cache_name, {}).get(key)
+        if entry is None or self._mmap.closed:
+            return None
+        offset, length, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return expires_at, decode_value(self._blob(offset, length))
+
+    def loader(self, cache_name: str):
+        """Build a TTLCache fallback that reads one cache from this snapshot"""
+        return lambda key: self.lookup(cache_name, key)
+
+    def raw_entries(self, cache_name: str) -> Iterator[Tuple[str, Optional[float], bytes]]:
+        """Iterate over fresh (key, expires_at, compressed blob) without decoding"""
+        now = time.time()
+        for key, (offset, length, expires_at) in self._index.get(cache_name, {}).items():
+            if expires_at is None or expires_at > now:
+                yield key, expires_at, self._blob(offset, length)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._index.values())
+
+    def close(self) -> None:
+        self._mmap.close()
+
+class _Encoded(bytes):
+    """A value blob carried over from a snapshot still compressed"""
+
+_restored: Optional[Snapshot] = None
+
+def collect_entries(
+    caches: Dict[str, TTLCache] = CACHES
+) -> Dict[str, List[Tuple[str, Optional[float], object]]]:
+    """Gather live entries from memory and the restored snapshot
+
+    Entries restored but not yet touched are carried over still compressed,
+    so a snapshot taken soon after boot does not lose them; entries deleted
+    or cleared since are not.
+    """
+    entries: Dict[str, List] = {}
+    for name, cache in caches.items():
+        in_memory = {key: (expires_at, value) for key, expires_at, value in cache.items()}
+        cache_entries = [(key, expires_at, value) for key, (expires_at, value) in in_memory.items()]
+        if _restored is not None:
+            cache_entries.extend(
+                (key, expires_at, _Encoded(blob))
+                for key, expires_at, blob in _restored.raw_entries(name)
+                if key not in in_memory and cache.from_fallback(key)
+            )
+        entries[name] = cache_entries
+    return entries
+
+def write_snapshot(entries: Dict[str, List[Tuple[str, Optional[float], object]]], path: str = SNAPSHOT_PATH) -> int:
+    """Atomically write collected entries to a snapshot file, returning the count"""
+    index: Dict[str, Dict[str, List]] = {}
+    blobs: List[bytes] = []
+    offset = 0
+    for name, cache_entries in entries.items():
+        index[name] = {}
+        for key, expires_at, value in cache_entries:
+            try:
+                blob = value if isinstance(value, _Encoded) else encode_value(value)
+            except (TypeError, ValueError):
+                continue
+            index[name][key] = [offset, len(blob), expires_at]
+            blobs.append(blob)
+            offset += len(blob)
+
+    header = json.dumps(
+        {"created_at": time.time(), "caches": index}, separators=(",", ":")
+    ).encode()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return len(blobs)
+
+def restore(path: str = SNAPSHOT_PATH, caches: Dict[str, TTLCache] = CACHES) -> Optional[Snapshot]:
+    """Attach a snapshot to the caches as a lazy fallback, if it is fresh enough"""
+    global _restored
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Ignoring unreadable cache snapshot %s: %s", path, e)
+        return None
+    if time.time() - snapshot.created_at > SNAPSHOT_MAX_AGE:
+        snapshot.close()
+        return None
+
+    for name, cache in caches.items():
+        cache.attach_fallback(snapshot.loader(name))
+    _restored = snapshot
+    return snapshot
+
+async def save(path: str = SNAPSHOT_PATH) -> int:
+    """Snapshot the shared caches without blocking the event loop on I/O"""
+    entries = collect_entries()
+    return await asyncio.to_thread(write_snapshot, entries, path)
+
+async def run_periodic(interval: float = SNAPSHOT_INTERVAL, path: str = SNAPSHOT_PATH) -> None:
+    """Snapshot the shared caches every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await save(path)
+        except Exception as e:
+            logger.warning("Cache snapshot failed: %s", e)
@@ -0,0 +1,430 @@
+"""Seeded synthetic data engine for benchmarks and load tests
+
+Generates any number of rows shaped like each upstream or mock dataset, as a
+stream of chunks so millions of rows never have to be held at once.
+
+Rows are produced in fixed-size blocks, each with its own Random seeded from
+(seed, dataset, block index), and every column of a block is drawn in one
+pass (random.choices with k=, comprehensions over bound methods) rather than
+row by row. Date and timestamp strings come from per-session lookup tables
+instead of per-row strftime. The same seed always yields the same rows,
+whatever chunk_size is used to read them.
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from bisect import bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+import math
+import random
+from app.services.market_calendar import session_bounds, trading_days
+from app.services.tickers import get_registry
+
+# Rows per seeded block; chunks are regrouped from blocks
+BLOCK_ROWS = 4096
+DEFAULT_CHUNK_ROWS = 10_000
+
+OPTION_TYPES = ["call", "put"]
+INSIDER_ROLES = ["CEO", "CFO", "CTO", "Director", "VP"]
+FIRST_NAMES = ["John", "Jane", "Robert", "Mary", "Michael", "Patricia", "David", "Linda", "James", "Susan",
+               "William", "Karen", "Richard", "Nancy", "Thomas", "Lisa", "Daniel", "Betty", "Mark", "Sandra"]
+LAST_NAMES = ["Smith", "Doe", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Wilson",
+              "Moore", "Taylor", "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin", "Clark", "Lewis"]
+
+# Disclosure bands congress filings report amounts in, as (low, label)
+AMOUNT_BANDS = [
+    (1_001, "$1,001 - $15,000"),
+    (15_001, "$15,001 - $50,000"),
+    (50_001, "$50,001 - $100,000"),
+    (100_001, "$100,001 - $250,000"),
+    (250_001, "$250,001 - $500,000"),
+    (500_001, "$500,001 - $1,000,000"),
+    (1_000_001, "$1,000,001 - $5,000,000"),
+    (5_000_001, "$5,000,001 - $25,000,000"),
+    (25_000_001, "$25,000,001 - $50,000,000"),
+    (50_000_001, "Over $50,000,000")
+]
+_BAND_LOWS = [low for low, _ in AMOUNT_BANDS]
+
+# Heavier tails for lower alpha; premiums in real flow span several decades
+PREMIUM_TAIL_ALPHA = 1.6
+AMOUNT_TAIL_ALPHA = 1.3
+
+class Universe:
+    """Tickers ranked by trading activity, with their sectors
+
+    Activity follows a Zipf law over the ranking, so a few names account for
+    most of the flow as in real markets. Drawing with cum_weights keeps each
+    pick a bisect rather than a scan.
+    """
+
+    def __init__(self, ranked: List[Tuple[str, str]], zipf: float = 1.1):
+        self.tickers = [ticker for ticker, _ in ranked]
+        self.sector_of = dict(ranked)
+        self.sectors: Dict[str, List[str]] = {}
+        for ticker, sector in ranked:
+            self.sectors.setdefault(sector, []).append(ticker)
+        self.cum_weights = list(accumulate(1 / (rank + 1) ** zipf for rank in range(len(ranked))))
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+def build_universe(size: int = 500, seed: int = 0, sectors: Optional[Dict[str, List[str]]] = None) -> Universe:
+    """Build a universe of size tickers: the known names first, then synthetic symbols
+
+    Known names are the ticker registry's, each sector's in file order, which
+    puts the largest companies first.
+    """
+    if not sectors:
+        registry = get_registry()
+        sectors = {sector: registry.tickers_in(sector) for sector in registry.sectors}
+    names = list(sectors)
+    # Round-robin over sectors so the most active names are not all in one
+    ranked = [
+        (tickers[i], sector)
+        for i in range(max(len(tickers) for tickers in sectors.values()))
+        for sector, tickers in sectors.items() if i < len(tickers)
+    ][:size]
+    taken = {ticker for ticker, _ in ranked}
+    rng = random.Random(f"{seed}:universe")
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    while len(ranked) < size:
+        symbol = "".join(rng.choices(letters, k=rng.choice((3, 4))))
+        if symbol not in taken:
+            taken.add(symbol)
+            ranked.append((symbol, names[len(ranked) % len(names)]))
+    return Universe(ranked)
+
+def intraday_curve(minutes: int) -> List[float]:
+    """U-shaped per-minute volume weights with mean 1, heavy at the open and close"""
+    raw = [
+        1 + 2.0 * math.exp(-minute / 20) + 1.2 * math.exp(-(minutes - 1 - minute) / 30)
+        for minute in range(minutes)
+    ]
+    mean = sum(raw) / minutes
+    return [weight / mean for weight in raw]
+
+def uniform_ints(rng: random.Random, low: int, high: int, count: int) -> List[int]:
+    """Draw count integers in [low, high]; much cheaper than count randint calls"""
+    draw = rng.random
+    span = high - low + 1
+    return [low + int(draw() * span) for _ in range(count)]
+
+def fat_tailed(rng: random.Random, scale: float, alpha: float, count: int) -> List[float]:
+    """Draw count Pareto values with minimum scale; lower alpha gives heavier tails"""
+    pareto = rng.paretovariate
+    return [scale * pareto(alpha) for _ in range(count)]
+
+def signed_fat_tailed(rng: random.Random, scale: float, alpha: float, count: int) -> List[float]:
+    """Draw count symmetric fat-tailed values centred on zero"""
+    pareto = rng.paretovariate
+    sign = rng.getrandbits(count) if count else 0
+    return [scale * (pareto(alpha) - 1) * (1 if sign >> i & 1 else -1) for i in range(count)]
+
+class Sessions:
+    """The trading sessions up to end_date that hold the requested number of slots
+
+    Holds each session's date string and its minute timestamps, built once
+    per session rather than once per row.
+    """
+
+    def __init__(self, slots: int, end_date: date, per_session: Optional[int] = None):
+        self.days: List[date] = []
+        self.minutes: List[int] = []
+        self._opens: List[Tuple[int, int]] = []  # (utc hour, utc minute) of the open
+        total = 0
+        end = end_date
+        while total < slots:
+            # About 5 sessions a week; overshoot a little so one pass usually does
+            sessions_left = -(-(slots - total) // (per_session or 390))
+            start = end - timedelta(days=sessions_left * 7 // 5 + 10)
+            for day in reversed(trading_days(start, end)):
+                if per_session is None:
+                    open_, close = session_bounds(day)
+                    minutes = int((close - open_).total_seconds() // 60)
+                    utc_open = open_.utctimetuple()
+                    self._opens.append((utc_open.tm_hour, utc_open.tm_min))
+                else:
+                    minutes = per_session
+                self.days.append(day)
+                self.minutes.append(minutes)
+                total += minutes
+                if total >= slots:
+                    break
+            end = start - timedelta(days=1)
+        # Slots fill the sessions from the end, so the last row is at the close
+        self.skip = total - slots
+        self.days.reverse()
+        self.minutes.reverse()
+        self._opens.reverse()
+        self.dates = [day.isoformat() for day in self.days]
+        self.offsets = [0, *accumulate(self.minutes)]
+        self._timestamps: Dict[int, List[str]] = {}
+
+    def locate(self, slot: int) -> Tuple[int, int]:
+        """Get (session index, minute within session) for a slot"""
+        slot += self.skip
+        session = bisect_right(self.offsets, slot) - 1
+        return session, slot - self.offsets[session]
+
+    def timestamps(self, session: int) -> List[str]:
+        """Get the UTC timestamp of every minute in a session"""
+        if session not in self._timestamps:
+            if len(self._timestamps) > 64:
+                self._timestamps.clear()
+            hour, minute = self._opens[session]
+            prefix = self.dates[session]
+            start = hour * 60 + minute
+            self._timestamps[session] = [
+                f"{prefix}T{(start + m) // 60:02d}:{(start + m) % 60:02d}:00Z" for m in range(self.minutes[session])
+            ]
+        return self._timestamps[session]
+
+class Context:
+    """Everything a dataset's blocks share: universe, sessions and carried state"""
+
+    def __init__(self, dataset: str, rows: int, seed: int, universe: Universe, end_date: date, days: int):
+        self.dataset = dataset
+        self.rows = rows
+        self.seed = seed
+        self.universe = universe
+        self.end_date = end_date
+        self.days = days
+        self.sectors = list(universe.sectors)
+        self.state: Dict[str, Any] = {}
+        self.sessions: Optional[Sessions] = None
+        self.curves: Dict[int, List[float]] = {}
+
+    def curve(self, minutes: int) -> List[float]:
+        if minutes not in self.curves:
+            self.curves[minutes] = intraday_curve(minutes)
+        return self.curves[minutes]
+
+def _event_days(ctx: Context, start: int, count: int) -> List[int]:
+    """Spread event rows evenly, oldest first, over the last ctx.days sessions"""
+    if ctx.sessions is None:
+        ctx.sessions = Sessions(ctx.days, ctx.end_date, per_session=1)
+    days = len(ctx.sessions.dates)
+    return [(start + i) * days // ctx.rows for i in range(count)]
+
+def _congress_block(rng: random.Random, ctx: Context, start: int, count: int) -> List[Dict]:
+    if "members" not in ctx.state:
+        members = [f"{first} {last}" for last in LAST_NAMES for first in FIRST_NAMES]
+        random.Random(f"{ctx.seed}:members").shuffle(members)
+        ctx.state["members"] = members
+        ctx.state["member_weights"] = list(accumulate(1 / (rank + 1) for rank in range(len(members))))
+    members = rng.choices(ctx.state["members"], cum_weights=ctx.state["member_weights"], k=count)
+    tickers = rng.choices(ctx.universe.tickers, cum_weights=ctx.universe.cum_weights, k=count)
+    trade_types = rng.choices(("Buy", "Sell"), k=count)
+    amounts = fat_tailed(rng, 15000, AMOUNT_TAIL_ALPHA, count)
+    days = _event_days(ctx, start, count)
+    dates = [ctx.sessions.dates[day] for day in days]
+    # Disclosures are due within 45 days; lag strings are memoized per (day, lag)
+    disclosures = ctx.state.setdefault("disclosures", {})
+    disclose = []
+    for day in days:
+        lag = min(1 + int(rng.expovariate(1 / 20)), 45)
+        if (day, lag) not in disclosures:
+            disclosures[day, lag] = (ctx.sessions.days[day] + timedelta(days=lag)).isoformat()
+        disclose.append(disclosures[day, lag])
+    return [
+        {
+            "ticker": ticker,
+            "congress_member": member,
+            "trade_type": trade_type,
+            "amount": min(int(amount), 50_000_000),
+            "trade_date": day,
+            "disclosure_date": disclosed
+        }
+        for ticker, member, trade_type, amount, day, disclosed
+        in zip(tickers, members, trade_types, amounts, dates, disclose)
+    ]
+
+def _congress_upstream_block(rng: random.Random, ctx: Context, start: int, count: int) -> List[Dict]:
+    # The congress/recent-trades shape: banded amounts, reporter and txn_type
+    chambers = rng.choices(("house", "senate"), weights=(435, 100), k=count)
+    return [
+        {
+            "ticker": row["ticker"],
+            "reporter": row["congress_member"],
+            "member_type": chamber,
+            "txn_type": row["trade_type"],
+            "amounts": AMOUNT_BANDS[max(bisect_right(_BAND_LOWS, row["amount"]) - 1, 0)][1],
+            "transaction_date": row["trade_date"],
+            "filed_at_date": row["disclosure_date"]
+        }
+        for row, chamber in zip(_congress_block(rng, ctx, start, count), chambers)
+    ]
+
+def _earnings_block(rng: random.Random, ctx: Context, start: int, count: int) -> List[Dict]:
+    sector_of = ctx.universe.sector_of
+    tickers = rng.choices(ctx.universe.tickers, cum_weights=ctx.universe.cum_weights, k=count)
+    gauss = rng.gauss
+    # Most reports land near consensus; a Student-t like mix gives the outliers
+    surprises = [
+        max(-0.5, min(0.5, gauss(0.02, 0.05) / math.sqrt(rng.gammavariate(2, 0.5))))
+        for _ in range(count)
+    ]
+    moves = [max(-0.15, min(0.15, 0.2 * surprise + gauss(0, 0.03))) for surprise in surprises]
+    caps = [min(max(int(rng.lognormvariate(23.5, 1.4)), 1_000_000_000), 3_000_000_000_000) for _ in range(count)]
+    dates = [ctx.sessions.dates[day] for day in _event_days(ctx, start, count)]
+    return [
+        {
+            "ticker": ticker,
+            "sector": sector_of[ticker],
+            "earnings_surprise": round(surprise, 2),
+            "price_movement": round(move, 2),
+            "report_date": day,
+            "market_cap": cap
+        }
+        for ticker, surprise, move, day, cap in zip(tickers, surprises, moves, dates, caps)
+    ]
+
+def _insider_block(rng: random.Random, ctx: Context, start: int, count: int) -> List[Dict]:
+    sector_of = ctx.universe.sector_of
+    tickers = rng.choices(ctx.universe.tickers, cum_weights=ctx.universe.cum_weights, k=count)
+    roles = rng.choices(INSIDER_ROLES, weights=(1, 1, 1, 4, 3), k=count)
+    # Insiders sell far more often than they buy
+    trade_types = rng.choices(("buy", "sell"), weights=(1, 3), k=count)
+    amounts = fat_tailed(rng, 100_000, AMOUNT_TAIL_ALPHA, count)
+    dates = [ctx.sessions.dates[day] for day in _event_days(ctx, start, count)]
+    volumes = ctx.state.setdefault("sector_volume", {})
+    rows = []
+    for ticker, role, trade_type, amount, day in zip(tickers, roles, trade_types, amounts, dates):
+        sector = sector_of[ticker]
+        amount = min(int(amount), 100_000_000)
+        volumes[sector] = volume = volumes.get(sector, 0) + amount
+        rows.append({
+            "sector": sector,
+            "ticker": ticker,
+            "insider_role": role,
+            "trade_type": trade_type,
+            "amount": amount,
+            "trade_date": day,
+            "sector_volume": volume
+        })
+    return rows
+
+def _minute_sessions(ctx: Context, per_slot: int) -> Sessions:
+    """Get the sessions holding ctx.rows rows of per_slot rows a minute"""
+    if ctx.sessions is None:
+        ctx.sessions = Sessions(-(-ctx.rows // per_slot), ctx.end_date)
+    return ctx.sessions
+
+def _minute_slots(ctx: Context, start: int, count: int, per_slot: int) -> Iterator[Tuple[int, int, int]]:
+    """Yield (session, minute, group) for each row of a block of per-slot rows"""
+    session, minute = ctx.sessions.locate(start // per_slot)
+    group = start % per_slot
+    minutes = ctx.sessions.minutes
+    for _ in range(count):
+        yield session, minute, group
+        group += 1
+        if group == per_slot:
+            group = 0
+            minute += 1
+            if minute == minutes[session]:
+                session, minute = session + 1, 0
+
+def _premium_flow_block(rng: random.Random, ctx: Context, start: int, count: int) -> List[Dict]:
+    groups = [(sector, option_type) for sector in ctx.sectors for option_type in OPTION_TYPES]
+    premiums = fat_tailed(rng, 250_000, PREMIUM_TAIL_ALPHA, count)
+    volumes = uniform_ints(rng, 1000, 10000, count)
+    sessions = _minute_sessions(ctx, len(groups))
+    rows = []
+    for (session, minute, group), premium, volume in zip(_minute_slots(ctx, start, count, len(groups)), premiums, volumes):
+        weight = ctx.curve(sessions.minutes[session])[minute]
+        sector, option_type = groups[group]
+        rows.append({
+            "sector": sector,
+            "option_type": option_type,
+            "premium": premium * weight,
+            "volume": int(volume * weight),
+            "date": sessions.dates[session],
+            "timestamp": sessions.timestamps(session)[minute]
+        })
+    return rows
+
+def _market_tide_block(rng: random.Random, ctx: Context, start: int, count: int) -> List[Dict]:
+    calls = signed_fat_tailed(rng, 200_000, PREMIUM_TAIL_ALPHA, count)
+    puts = signed_fat_tailed(rng, 200_000, PREMIUM_TAIL_ALPHA, count)
+    volumes = uniform_ints(rng, -10000, 10000, count)
+    sessions = _minute_sessions(ctx, 1)
+    rows = []
+    for (session, minute, _), call, put, volume in zip(_minute_slots(ctx, start, count, 1), calls, puts, volumes):
+        weight = ctx.curve(sessions.minutes[session])[minute]
+        rows.append({
+            "date": sessions.dates[session],
+            "net_call_premium": str(call * weight),
+            "net_put_premium": str(put * weight),
+            "net_volume": str(int(volume * weight)),
+            "timestamp": sessions.timestamps(session)[minute]
+        })
+    return rows
+
+def _greek_flow_block(rng: random.Random, ctx: Context, start: int, count: int) -> List[Dict]:
+    tickers = ctx.universe.tickers
+    per_day = len(tickers)
+    if ctx.sessions is None:
+        ctx.sessions = Sessions(-(-ctx.rows // per_day), ctx.end_date, per_session=1)
+    dates = ctx.sessions.dates
+    delta = signed_fat_tailed(rng, 20_000, PREMIUM_TAIL_ALPHA, count)
+    vega = signed_fat_tailed(rng, 10_000, PREMIUM_TAIL_ALPHA, count)
+    otm_share = [rng.uniform(0.3, 0.9) for _ in range(count)]
+    volumes = uniform_ints(rng, 1000, 10000, count)
+    return [
+        {
+            "ticker": tickers[(start + i) % per_day],
+            "date": dates[(start + i) // per_day],
+            "dir_delta_flow": str(d),
+            "dir_vega_flow": str(v),
+            "otm_dir_delta_flow": str(d * share),
+            "otm_dir_vega_flow": str(v * share),
+            "volume": volume
+        }
+        for i, (d, v, share, volume) in enumerate(zip(delta, vega, otm_share, volumes))
+    ]
+
+# Block builders by dataset name
+DATASETS: Dict[str, Callable[[random.Random, Context, int, int], List[Dict]]] = {
+    "congress": _congress_block,
+    "congress_recent_trades": _congress_upstream_block,
+    "earnings": _earnings_block,
+    "insider": _insider_block,
+    "premium_flow": _premium_flow_block,
+    "market_tide": _market_tide_block,
+    "greek_flow": _greek_flow_block
+}
+
+def stream(
+    dataset: str,
+    rows: int,
+    seed: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_ROWS,
+    universe: Optional[Universe] = None,
+    end_date: Optional[date] = None,
+    days: int = 250
+) -> Iterator[List[Dict]]:
+    """Stream rows of a dataset, oldest first, in chunks of chunk_size
+
+    Event datasets (congress, congress_recent_trades, earnings, insider) spread rows over the last
+    `days` sessions; time series (premium_flow, market_tide, greek_flow)
+    reach back as many sessions as the row count needs.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    build = DATASETS[dataset]
+    ctx = Context(dataset, rows, seed, universe or build_universe(seed=seed), end_date or date.today(), days)
+    buffer: List[Dict] = []
+    for block, start in enumerate(range(0, rows, BLOCK_ROWS)):
+        rng = random.Random(f"{seed}:{dataset}:{block}")
+        buffer.extend(build(rng, ctx, start, min(BLOCK_ROWS, rows - start)))
+        if len(buffer) >= chunk_size:
+            full = len(buffer) - len(buffer) % chunk_size
+            for offset in range(0, full, chunk_size):
+                yield buffer[offset:offset + chunk_size]
+            buffer = buffer[full:]
+    if buffer:
+        yield buffer
+
+def generate(dataset: str, rows: int, seed: int = 0, **options) -> List[Dict]:
+    """Generate every row of a dataset at once; use stream() for large counts"""
+    return [row for chunk in stream(dataset, rows, seed, **options) for row in chunk]
@@ -0,0 +1,218 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from array import array
+import csv
+import logging
+import os
+import sys
+import threading
+import time
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+TICKER_METADATA_PATH = get_settings().ticker_metadata_path
+RELOAD_INTERVAL = get_settings().ticker_metadata_reload_interval
+
+# Sector of tickers the registry does not know; insights leave it out of sector totals
+UNKNOWN_SECTOR = "other"
+# Mock datasets draw from the names that dominate real disclosures
+MOCK_MARKET_CAPS = ("mega", "large")
+
+def normalize(ticker: str) -> str:
+    return ticker.strip().upper()
+
+class TickerRegistry:
+    """Sector, industry and market-cap bucket for every known ticker
+
+    Built once from the metadata file and never changed after, so lookups
+    need no lock. Tickers and names are interned, and each column is an
+    array of small codes into a table of its distinct values: thousands of
+    symbols share a handful of sector, industry and bucket strings instead
+    of holding one dict per symbol. Reloading builds a new registry and
+    swaps it in whole.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, str]], source: Optional[str] = None, mtime: Optional[float] = None):
+        self.source = source
+        self.mtime = mtime
+        self.loaded_at = time.time()
+        self.tickers: List[str] = []
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._values: Tuple[List[str], List[str], List[str]] = ([], [], [])
+        self._codes: Tuple[Dict[str, int], Dict[str, int], Dict[str, int]] = ({}, {}, {})
+        self._columns = (array("H"), array("H"), array("H"))
+
+        for row in rows:
+            ticker = normalize(row.get("ticker") or "")
+            if not ticker:
+                continue
+            fields = (
+                (row.get("sector") or UNKNOWN_SECTOR).strip().lower(),
+                (row.get("industry") or "").strip(),
+                (row.get("market_cap") or "").strip().lower()
+            )
+            codes = [self._code(column, value) for column, value in enumerate(fields)]
+            position = self._index.get(ticker)
+            if position is None:
+                self._index[sys.intern(ticker)] = len(self.tickers)
+                self.tickers.append(ticker)
+                self.names.append(sys.intern((row.get("name") or "").strip()))
+                for column, code in zip(self._columns, codes):
+                    column.append(code)
+            else:
+                # Later rows for a ticker replace earlier ones
+                self.names[position] = sys.intern((row.get("name") or "").strip())
+                for column, code in zip(self._columns, codes):
+                    column[position] = code
+
+        # Tickers of each sector, and of all of them under None, whole, per cap
+        # bucket and within MOCK_MARKET_CAPS, so tickers_in never writes
+        self._by_sector: Dict[Tuple[Optional[str], Tuple[str, ...]], List[str]] = {}
+        for ticker, sector_code, cap_code in zip(self.tickers, self._columns[0], self._columns[2]):
+            cap = self._values[2][cap_code]
+            for sector in (self._values[0][sector_code], None):
+                keys = [(sector, ()), (sector, (cap,))]
+                if cap in MOCK_MARKET_CAPS:
+                    keys.append((sector, MOCK_MARKET_CAPS))
+                for key in keys:
+                    self._by_sector.setdefault(key, []).append(ticker)
+
+    def _code(self, column: int, value: str) -> int:
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._values[column])
+            self._values[column].append(sys.intern(value))
+        return code
+
+    def _position(self, ticker: str) -> Optional[int]:
+        position = self._index.get(ticker)
+        if position is None and ticker:
+            position = self._index.get(normalize(ticker))
+        return position
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return self._position(ticker) is not None
+
+    def _value(self, column: int, ticker: str) -> Optional[str]:
+        position = self._position(ticker)
+        if position is None:
+            return None
+        return self._values[column][self._columns[column][position]] or None
+
+    def sector(self, ticker: str, default: str = UNKNOWN_SECTOR) -> str:
+        return self._value(0, ticker) or default
+
+    def industry(self, ticker: str) -> Optional[str]:
+        return self._value(1, ticker)
+
+    def market_cap(self, ticker: str) -> Optional[str]:
+        return self._value(2, ticker)
+
+    def lookup(self, ticker: str) -> Optional[Dict[str, Optional[str]]]:
+        """Get a ticker's full metadata, or None if it is unknown"""
+        position = self._position(ticker)
+        if position is None:
+            return None
+        sector, industry, market_cap = (
+            values[column[position]] or None for values, column in zip(self._values, self._columns)
+        )
+        return {
+            "ticker": self.tickers[position],
+            "name": self.names[position] or None,
+            "sector": sector,
+            "industry": industry,
+            "market_cap": market_cap
+        }
+
+    def lookup_many(self, tickers: Iterable[str]) -> Dict[str, Dict[str, Optional[str]]]:
+        """Get metadata for each known ticker among tickers, keyed as given"""
+        found = {}
+        for ticker in tickers:
+            if ticker not in found:
+                info = self.lookup(ticker)
+                if info is not None:
+                    found[ticker] = info
+        return found
+
+    def sectors_of(self, tickers: Iterable[str], default: str = UNKNOWN_SECTOR) -> List[str]:
+        """Get the sector of each ticker, in order"""
+        index = self._index
+        sectors = self._values[0]
+        codes = self._columns[0]
+        result = []
+        for ticker in tickers:
+            position = index.get(ticker)
+            if position is None:
+                position = self._position(ticker)
+            result.append(default if position is None else sectors[codes[position]])
+        return result
+
+    @property
+    def sectors(self) -> List[str]:
+        return [sector for sector in self._values[0] if sector != UNKNOWN_SECTOR]
+
+    def tickers_in(self, sector: Optional[str], market_caps: Sequence[str] = ()) -> List[str]:
+        """Get a sector's tickers in file order, every sector's with None, optionally only those in the given cap buckets
+
+        The list returned is shared and must not be changed. Bucket
+        combinations other than the precomputed ones are filtered per call.
+        """
+        found = self._by_sector.get((sector, tuple(market_caps)))
+        if found is not None:
+            return found
+        allowed = {self._codes[2][cap] for cap in market_caps if cap in self._codes[2]}
+        caps = self._columns[2]
+        return [ticker for ticker in self._by_sector.get((sector, ()), []) if caps[self._index[ticker]] in allowed]
+
+def read(path: str) -> TickerRegistry:
+    """Build a registry from a metadata CSV"""
+    mtime = os.stat(path).st_mtime
+    with open(path, newline="", encoding="utf-8") as f:
+        return TickerRegistry(csv.DictReader(f), source=path, mtime=mtime)
+
+_registry: Optional[TickerRegistry] = None
+_lock = threading.Lock()
+_next_check = 0.0
+
+def reload(path: Optional[str] = None) -> TickerRegistry:
+    """Read the metadata file again and swap the new registry in
+
+    A file that is missing or fails to parse keeps the registry already
+    loaded; with none loaded yet, every ticker is unknown until it appears.
+    """
+    global _registry, _next_check
+    path = path or TICKER_METADATA_PATH
+    with _lock:
+        try:
+            _registry = read(path)
+            logger.info("Loaded %d tickers from %s", len(_registry), path)
+        except (OSError, csv.Error, UnicodeDecodeError, ValueError) as e:
+            logger.warning("Could not load ticker metadata from %s: %s", path, e)
+            if _registry is None:
+                _registry = TickerRegistry((), source=path)
+        _next_check = time.monotonic() + RELOAD_INTERVAL
+        return _registry
+
+def _changed(registry: TickerRegistry) -> bool:
+    try:
+        return os.stat(registry.source or TICKER_METADATA_PATH).st_mtime != registry.mtime
+    except OSError:
+        # A file removed mid-deploy keeps the registry already loaded
+        return False
+
+def get_registry() -> TickerRegistry:
+    """Get the loaded registry, reading the file on first use and again once it changes"""
+    global _next_check
+    registry = _registry
+    if registry is None:
+        return reload()
+    if RELOAD_INTERVAL > 0 and time.monotonic() >= _next_check:
+        _next_check = time.monotonic() + RELOAD_INTERVAL
+        if _changed(registry):
+            return reload(registry.source)
+    return registry
@@ -0,0 +1,291 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+import sys
+import time
+from app.services.pagination import row_id
+from app.services.persistence import DATASETS
+from app.services.tickers import get_registry
+from app.settings import get_settings
+
+TRADE_STORE_MAX_AGE = get_settings().trade_store_max_age
+TRADE_STORE_MAX_ROWS = get_settings().trade_store_max_rows
+
+# Indexed columns; the source keys for each come from the persistence layout
+FACETS = ("ticker", "member", "sector", "category")
+
+# Query results kept per store while its rows are unchanged
+MAX_QUERY_RESULTS = 256
+
+def facet_key(value: object) -> str:
+    """Filter values match case-insensitively and ignoring surrounding spaces"""
+    return sys.intern(str(value).strip().casefold())
+
+class TradeStore:
+    """Trades already fetched, with inverted indexes for filtered reads
+
+    Each row gets a position when added. Every facet maps its values to
+    codes, keeps one code per row in an array and a posting list of
+    positions per code. Posting lists, and the index of all positions,
+    are kept in date order, so a date range is a bisect within any of
+    them. A query starts from the shortest list it touches and checks the
+    remaining filters against the code arrays: its cost follows the
+    matching rows rather than the size of the store.
+
+    Rows are added incrementally and deduplicated by content. A store
+    covers the dates from the oldest row of its unbroken run of complete
+    (unfiltered) refreshes while the last one is younger than max_age;
+    covered queries need no upstream call.
+
+    Query results are kept until rows are next added, so repeating a query
+    returns the same list and callers can tell unchanged results by identity.
+    """
+
+    def __init__(
+        self,
+        dataset: str,
+        max_age: float = TRADE_STORE_MAX_AGE,
+        max_rows: int = TRADE_STORE_MAX_ROWS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.dataset = dataset
+        self.spec = DATASETS[dataset]
+        self.max_age = max_age
+        self.max_rows = max_rows
+        self.clock = clock
+        self.covered_from: Optional[str] = None
+        self.refreshed_at: Optional[float] = None
+        self.queries = 0
+        self.clear()
+
+    def clear(self) -> None:
+        self.rows: List[Dict] = []
+        self._ids: set = set()
+        self._dates: List[str] = []
+        self._codes: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self._columns: Dict[str, array] = {facet: array("I") for facet in FACETS}
+        # Row positions per facet value, and all of them, each ordered by date then arrival
+        self._postings: Dict[str, List[array]] = {facet: [] for facet in FACETS}
+        self._order = array("I")
+        self._results: Dict[Tuple, List[Dict]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _field(self, row: Dict, facet: str) -> Optional[object]:
+        for key in self.spec.get(facet, ()):
+            value = row.get(key)
+            if value not in (None, ""):
+                return value
+        return None
+
+    def _code(self, facet: str, value: object) -> int:
+        codes = self._codes[facet]
+        key = facet_key(value)
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(codes)
+            self._postings[facet].append(array("I"))
+        return code
+
+    def add(self, rows: Iterable[Dict], complete: bool = False) -> List[Dict]:
+        """Index the rows not seen before and return them
+
+        complete marks an unfiltered refresh, which renews and extends the
+        dates the store covers.
+        """
+        batch: List[Tuple[str, Dict]] = []
+        oldest = None
+        for row in rows:
+            day = self._field(row, "date")
+            if day is None:
+                continue
+            day = sys.intern(str(day)[:10])
+            if oldest is None or day < oldest:
+                oldest = day
+            identity = row_id(row)
+            if identity not in self._ids:
+                self._ids.add(identity)
+                batch.append((day, row))
+        # Upstream lists newest first; indexing oldest first keeps most rows appends
+        batch.sort(key=itemgetter(0))
+        self._index(batch)
+
+        if len(self.rows) > self.max_rows:
+            self._compact()
+        if complete:
+            now = self.clock()
+            if oldest is not None:
+                continuous = self.is_fresh(now) and self.covered_from is not None
+                self.covered_from = min(oldest, self.covered_from) if continuous else oldest
+                if self._order and self.covered_from < self._dates[self._order[0]]:
+                    self.covered_from = self._dates[self._order[0]]
+            self.refreshed_at = now
+        return [row for _, row in batch]
+
+    def _index(self, batch: List[Tuple[str, Dict]]) -> None:
+        if batch:
+            self._results.clear()
+        registry = get_registry()
+        dates = self._dates
+        first = len(self.rows)
+        late = 0
+        latest = dates[self._order[-1]] if self._order else ""
+        for day, row in batch:
+            position = len(self.rows)
+            self.rows.append(row)
+            dates.append(day)
+            codes = []
+            for facet in FACETS:
+                value = self._field(row, facet)
+                if value is None and facet == "sector":
+                    # Congress rows carry no sector; the ticker's is used
+                    value = registry.sector(str(self._field(row, "ticker") or ""))
+                code = self._code(facet, "" if value is None else value)
+                self._columns[facet].append(code)
+                codes.append(code)
+            if day >= latest:
+                latest = day
+                self._order.append(position)
+                for facet, code in zip(FACETS, codes):
+                    self._postings[facet][code].append(position)
+            else:
+                late += 1
+        if late:
+            # The batch is in date order, so its late rows are the first ones
+            self._place(range(first, first + late))
+
+    def _place(self, positions: range) -> None:
+        """Index rows dated before the newest already indexed"""
+        key = self._dates.__getitem__
+        if len(positions) * 20 > len(self.rows):
+            # Many late rows: one stable sort and a rebuild of every list
+            self._order = array("I", sorted(range(len(self.rows)), key=key))
+            for facet in FACETS:
+                column = self._columns[facet]
+                postings = [array("I") for _ in self._postings[facet]]
+                for position in self._order:
+                    postings[column[position]].append(position)
+                self._postings[facet] = postings
+            return
+        # A few late rows, typically disclosures filed weeks after the trade
+        for position in positions:
+            insort(self._order, position, key=key)
+            for facet in FACETS:
+                insort(self._postings[facet][self._columns[facet][position]], position, key=key)
+
+    def replace(self, rows: Iterable[Dict]) -> List[Dict]:
+        """Swap the whole contents for a complete new set of rows"""
+        self.clear()
+        self.covered_from = None
+        return self.add(rows, complete=True)
+
+    def _compact(self) -> None:
+        """Keep the newest rows, reindexed, with room for several more refreshes"""
+        batch = [(self._dates[position], self.rows[position]) for position in self._order[-(self.max_rows * 9 // 10):]]
+        ids = {row_id(row) for _, row in batch}
+        self.clear()
+        self._ids = ids
+        self._index(batch)
+        # The dates dropped are no longer covered
+        if self.covered_from is not None and self._order:
+            self.covered_from = max(self.covered_from, self._dates[self._order[0]])
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        if self.refreshed_at is None:
+            return False
+        return (self.clock() if now is None else now) - self.refreshed_at <= self.max_age
+
+    def covers(self, start_date: Optional[str] = None) -> bool:
+        """Check whether queries from start_date on can be answered from the store
+
+        Without a start date a query means the recent trades, which is what
+        complete refreshes hold.
+        """
+        if self.covered_from is None or not self.is_fresh():
+            return False
+        return start_date is None or start_date >= self.covered_from
+
+    def _span(self, positions: array, start_date: Optional[str], end_date: Optional[str]) -> Tuple[int, int]:
+        """Bounds of the date range within a date-ordered position list"""
+        key = self._dates.__getitem__
+        low = bisect_left(positions, start_date, key=key) if start_date else 0
+        high = bisect_right(positions, end_date, key=key) if end_date else len(positions)
+        return low, high
+
+    def query(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        **filters: Optional[str]
+    ) -> List[Dict]:
+        """Get the rows matching every given filter, newest first
+
+        filters are facet=value pairs; None means any value. Dates are
+        inclusive YYYY-MM-DD bounds.
+        """
+        self.queries += 1
+        key = (start_date, end_date, tuple(
+            (facet, facet_key(value)) for facet, value in sorted(filters.items()) if value is not None
+        ))
+        result = self._results.get(key)
+        if result is None:
+            if len(self._results) >= MAX_QUERY_RESULTS:
+                self._results.clear()
+            result = self._results[key] = self._query(start_date, end_date, filters)
+        return result
+
+    def _query(self, start_date: Optional[str], end_date: Optional[str], filters: Dict[str, Optional[str]]) -> List[Dict]:
+        candidates = self._order
+        low, high = self._span(candidates, start_date, end_date)
+        checks: List[Tuple[array, int]] = []
+        for facet, value in filters.items():
+            if value is None:
+                continue
+            code = self._codes[facet].get(facet_key(value))
+            if code is None:
+                return []
+            postings = self._postings[facet][code]
+            posting_low, posting_high = self._span(postings, start_date, end_date)
+            # The shortest list in range drives; the other filters are checked per row
+            if posting_high - posting_low < high - low:
+                if candidates is not self._order:
+                    checks.append((self._columns[driving], driving_code))
+                candidates, low, high = postings, posting_low, posting_high
+                driving, driving_code = facet, code
+            else:
+                checks.append((self._columns[facet], code))
+
+        positions = candidates[low:high]
+        if len(checks) == 1:
+            column, code = checks[0]
+            positions = [position for position in positions if column[position] == code]
+        elif checks:
+            positions = [position for position in positions if all(column[position] == code for column, code in checks)]
+        rows = self.rows
+        return [rows[position] for position in reversed(positions)]
+
+    def counts(self, facet: str) -> Dict[str, int]:
+        """Get the number of rows for each value of a facet"""
+        return {key: len(self._postings[facet][code]) for key, code in self._codes[facet].items()}
+
+    def get_stats(self) -> Dict:
+        return {
+            "rows": len(self.rows),
+            "covered_from": self.covered_from,
+            "fresh": self.is_fresh(),
+            "queries": self.queries,
+            **{f"{facet}_values": len(self._codes[facet]) for facet in FACETS}
+        }
+
+# Congress trades from upstream and the database, refreshed by each unfiltered fetch
+congress_store = TradeStore("congress_trades")
+
+# Insider trades, replaced by a new complete set once stale
+insider_store = TradeStore("insider_trades")
+
+STORES = {"congress_trades": congress_store, "insider_trades": insider_store}
+
+def get_stats() -> Dict[str, Dict]:
+    return {name: store.get_stats() for name, store in STORES.items()}
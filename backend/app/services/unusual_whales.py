@@ -1,45 +1,130 @@
 from typing import Dict, List, Optional
-import httpx
+import asyncio
 from fastapi import HTTPException
-import os
-from dotenv import load_dotenv
-from app.services.mock_data import generate_mock_congress_trades
+from app.services.mock_data import MOCK_CONGRESS_MEMBERS, generate_mock_congress_trades, mock_congress_tickers
 from app.services.insights import generate_congress_trades_insight
+from app.services import persistence, deadlines, admission
+from app.services.cache import LOCK_TTL, response_cache, make_key, is_refreshing, single_flight
+from app.services.search import congress_search
+from app.services.tickers import get_registry
+from app.services.trade_store import congress_store, facet_key
+from app.settings import get_settings
 
-load_dotenv()
+API_KEY = get_settings().unusual_whales_api_key
+BASE_URL = get_settings().unusual_whales_base_url
+# httpx's own default, capped by the request's remaining deadline budget
+REQUEST_TIMEOUT = 5.0
 
-API_KEY = os.getenv("UNUSUAL_WHALES_API_KEY")
-BASE_URL = "https://api.unusualwhales.com/api"
+# Shared client, built on first request; tied to the loop that created it
+_http_client = None
+_http_client_loop = None
+
+def _get_http_client():
+    """Get the shared httpx client, importing httpx on first use"""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client_loop is not loop or _http_client.is_closed:
+        import httpx
+
+        _http_client = httpx.AsyncClient()
+        _http_client_loop = loop
+    return _http_client
+
+async def close_http_client() -> None:
+    """Close the shared httpx client if one was built"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 async def make_api_request(endpoint: str, params: Dict = None) -> Dict:
     """Make a request to the Unusual Whales API"""
     if not API_KEY:
         raise HTTPException(status_code=500, detail="API key not configured")
     
+    key = make_key(endpoint, params or {})
+    if not is_refreshing():
+        cached = await response_cache.get_async(key)
+        if cached is not None:
+            return cached
+    
     headers = {
         'Accept': 'application/json, text/plain',
         'Authorization': f"Bearer {API_KEY}"
     }
     
-    async with httpx.AsyncClient() as client:
+    import httpx
+
+    deadlines.check()
+    admission.require_capacity()
+    # One worker fetches a key while the others wait for it to land in cache
+    async with single_flight(response_cache, key, deadlines.timeout(LOCK_TTL)):
+        if not is_refreshing():
+            cached = await response_cache.get_async(key)
+            if cached is not None:
+                return cached
+        client = _get_http_client()
         try:
             response = await client.get(
                 f"{BASE_URL}/{endpoint}",
                 headers=headers,
-                params=params or {}
+                params=params or {},
+                timeout=deadlines.timeout(REQUEST_TIMEOUT)
             )
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+            await response_cache.set_async(key, data)
+            return data
         except httpx.HTTPError as e:
             raise HTTPException(status_code=500, detail=f"API request failed: {str(e)}")
 
-async def get_congress_trades(
+async def get_congress_rows(
     ticker: Optional[str] = None,
     congress_member: Optional[str] = None,
     start_date: Optional[str] = None,
-    end_date: Optional[str] = None
-) -> Dict:
-    """Fetch congress trades from Unusual Whales API with optional filters"""
+    end_date: Optional[str] = None,
+    sector: Optional[str] = None
+) -> List[Dict]:
+    """Fetch congress trade rows from the trade store, database, upstream or mock data"""
+    filtered = any((ticker, congress_member, start_date, end_date, sector))
+    # Filters over trades an unfiltered fetch already brought in need no request
+    if filtered and congress_store.covers(start_date):
+        return congress_store.query(
+            start_date, end_date, ticker=ticker, member=congress_member, sector=sector
+        )
+
+    complete = not (ticker or congress_member or start_date or end_date)
+    data = await _fetch_congress_rows(ticker, congress_member, start_date, end_date, complete)
+    if sector:
+        # Neither upstream nor the database knows congress trades' sectors.
+        # They are matched like the store's index, so both paths agree on "Tech"
+        registry = get_registry()
+        wanted = facet_key(sector)
+        data = [row for row in data if facet_key(registry.sector(row.get("ticker") or "")) == wanted]
+    return data
+
+async def _fetch_congress_rows(
+    ticker: Optional[str],
+    congress_member: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    complete: bool
+) -> List[Dict]:
+    """Read rows from the database or upstream, adding what arrives to the trade store"""
+    # Closed historical ranges are answered from the database when an earlier
+    # fetch covered them
+    if persistence.is_historical(end_date):
+        stored = await persistence.fetch_rows(
+            "congress_trades",
+            ticker=ticker,
+            member=congress_member,
+            start_date=start_date,
+            end_date=end_date
+        )
+        if stored:
+            congress_search.add_trades(congress_store.add(stored))
+            return stored
+
     try:
         params = {
             **({"ticker": ticker} if ticker else {}),
@@ -48,14 +133,28 @@ async def get_congress_trades(
             **({"end_date": end_date} if end_date else {})
         }
         response = await make_api_request("congress/recent-trades", params)
-        return {
-            "data": response.get('data', []),
-            "insight": generate_congress_trades_insight(response.get('data', []))
-        }
+        data = response.get('data', [])
+        await persistence.store_rows("congress_trades", data, coverage={
+            "ticker": ticker, "member": congress_member, "start_date": start_date, "end_date": end_date
+        })
+        congress_search.add_trades(congress_store.add(data, complete=complete))
+        return data
     except Exception:
-        # Fallback to mock data
-        mock_data = generate_mock_congress_trades(ticker, congress_member, start_date, end_date)
-        return {
-            "data": mock_data,
-            "insight": generate_congress_trades_insight(mock_data)
-        }
+        # Fallback to mock data. Its rows echo the caller's filters and are
+        # random on every call, so only the fixed roster is made searchable
+        congress_search.seed("member", MOCK_CONGRESS_MEMBERS)
+        congress_search.seed("ticker", mock_congress_tickers())
+        return generate_mock_congress_trades(ticker, congress_member, start_date, end_date)
+
+async def get_congress_trades(
+    ticker: Optional[str] = None,
+    congress_member: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Dict:
+    """Fetch congress trades from Unusual Whales API with optional filters"""
+    data = await get_congress_rows(ticker, congress_member, start_date, end_date)
+    return {
+        "data": data,
+        "insight": generate_congress_trades_insight(data)
+    }
@@ -0,0 +1,113 @@
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+import os
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() == "true"
+
+def _env_map(name: str) -> Dict[str, float]:
+    """Parse NAME=key=value,key=value into a dict of floats"""
+    pairs = [item.split("=", 1) for item in os.getenv(name, "").split(",") if "=" in item]
+    return {key.strip(): float(value) for key, value in pairs}
+
+def _env_list(name: str, default: str) -> List[str]:
+    return [item.strip().upper() for item in os.getenv(name, default).split(",") if item.strip()]
+
+@dataclass(frozen=True)
+class Settings:
+    """Process-wide configuration, read from the environment once"""
+
+    # Upstream APIs
+    unusual_whales_api_key: Optional[str] = field(default_factory=lambda: os.getenv("UNUSUAL_WHALES_API_KEY"))
+    openai_api_key: Optional[str] = field(default_factory=lambda: os.getenv("OPENAI_API_KEY"))
+    # Point these at local stand-ins (benchmarks/fake_upstream.py) for load tests
+    unusual_whales_base_url: str = field(
+        default_factory=lambda: os.getenv("UNUSUAL_WHALES_BASE_URL", "https://api.unusualwhales.com/api").rstrip("/")
+    )
+    openai_base_url: Optional[str] = field(default_factory=lambda: os.getenv("OPENAI_BASE_URL"))
+
+    # Persistence
+    database_url: Optional[str] = field(default_factory=lambda: os.getenv("DATABASE_URL"))
+    database_pool_size: int = field(default_factory=lambda: _env_int("DATABASE_POOL_SIZE", 5))
+
+    # Caches
+    response_cache_ttl: float = field(default_factory=lambda: _env_float("RESPONSE_CACHE_TTL", 60))
+    insight_cache_ttl: float = field(default_factory=lambda: _env_float("INSIGHT_CACHE_TTL", 900))
+    cache_max_entries: int = field(default_factory=lambda: _env_int("CACHE_MAX_ENTRIES", 1024))
+    partition_cache_max_entries: int = field(default_factory=lambda: _env_int("PARTITION_CACHE_MAX_ENTRIES", 4096))
+    # Shared cache backend for upstream responses and insights: memory, sqlite or network
+    cache_backend: str = field(default_factory=lambda: os.getenv("CACHE_BACKEND", "memory").lower())
+    cache_path: str = field(default_factory=lambda: os.getenv("CACHE_PATH", "/tmp/lukz-cache.sqlite3"))
+    # Dotted path to a factory returning a network cache client, e.g. "app.cache_client:build"
+    cache_network_client: Optional[str] = field(default_factory=lambda: os.getenv("CACHE_NETWORK_CLIENT"))
+    cache_local_ttl: float = field(default_factory=lambda: _env_float("CACHE_LOCAL_TTL", 5))
+    cache_lock_ttl: float = field(default_factory=lambda: _env_float("CACHE_LOCK_TTL", 30))
+    cache_snapshot_path: str = field(default_factory=lambda: os.getenv("CACHE_SNAPSHOT_PATH", "/tmp/lukz-cache.snapshot"))
+    cache_snapshot_interval: float = field(default_factory=lambda: _env_float("CACHE_SNAPSHOT_INTERVAL", 300))
+    cache_snapshot_max_age: float = field(default_factory=lambda: _env_float("CACHE_SNAPSHOT_MAX_AGE", 86400))
+
+    # Response compression
+    compression_minimum_size: int = field(default_factory=lambda: _env_int("COMPRESSION_MINIMUM_SIZE", 1024))
+    gzip_level: int = field(default_factory=lambda: _env_int("GZIP_LEVEL", 6))
+    brotli_quality: int = field(default_factory=lambda: _env_int("BROTLI_QUALITY", 4))
+
+    # Greek flow range requests
+    greek_flow_max_range_days: int = field(default_factory=lambda: _env_int("GREEK_FLOW_MAX_RANGE_DAYS", 31))
+    greek_flow_fetch_concurrency: int = field(default_factory=lambda: _env_int("GREEK_FLOW_FETCH_CONCURRENCY", 4))
+
+    # Executors for synchronous service code; mode is auto, thread or inline
+    executor_mode: str = field(default_factory=lambda: os.getenv("EXECUTOR_MODE", "auto").lower())
+    executor_thread_workers: int = field(default_factory=lambda: _env_int("EXECUTOR_THREAD_WORKERS", 8))
+    executor_process_workers: int = field(default_factory=lambda: _env_int("EXECUTOR_PROCESS_WORKERS", 2))
+
+    # Request deadlines in seconds; ROUTE_DEADLINES=/api/path=seconds,... overrides per route
+    request_deadline: float = field(default_factory=lambda: _env_float("REQUEST_DEADLINE", 20))
+    route_deadlines: Dict[str, float] = field(default_factory=lambda: _env_map("ROUTE_DEADLINES"))
+
+    # Admission control; ROUTE_CONCURRENCY=/api/path=limit,... overrides per route
+    admission_concurrency: int = field(default_factory=lambda: _env_int("ADMISSION_CONCURRENCY", 32))
+    route_concurrency: Dict[str, float] = field(default_factory=lambda: _env_map("ROUTE_CONCURRENCY"))
+    admission_target_delay: float = field(default_factory=lambda: _env_float("ADMISSION_TARGET_DELAY", 0.1))
+    admission_interval: float = field(default_factory=lambda: _env_float("ADMISSION_INTERVAL", 1.0))
+    admission_max_queue_time: float = field(default_factory=lambda: _env_float("ADMISSION_MAX_QUEUE_TIME", 2.0))
+
+    # Live push streams
+    live_poll_interval: float = field(default_factory=lambda: _env_float("LIVE_POLL_INTERVAL", 60))
+    live_heartbeat_interval: float = field(default_factory=lambda: _env_float("LIVE_HEARTBEAT_INTERVAL", 15))
+    live_queue_size: int = field(default_factory=lambda: _env_int("LIVE_QUEUE_SIZE", 16))
+
+    # tracemalloc-based allocation figures per route and stage in /api/metrics; slows every allocation
+    memory_profiling: bool = field(default_factory=lambda: _env_bool("MEMORY_PROFILING", False))
+    memory_profiling_frames: int = field(default_factory=lambda: _env_int("MEMORY_PROFILING_FRAMES", 1))
+
+    # Ticker reference data: CSV of ticker,name,sector,industry,market_cap; rechecked for changes this often
+    ticker_metadata_path: str = field(
+        default_factory=lambda: os.getenv("TICKER_METADATA_PATH", os.path.join(os.path.dirname(__file__), "data", "tickers.csv"))
+    )
+    ticker_metadata_reload_interval: float = field(default_factory=lambda: _env_float("TICKER_METADATA_RELOAD_INTERVAL", 60))
+
+    # In-memory trade stores answering filtered congress and insider queries
+    trade_store_max_age: float = field(default_factory=lambda: _env_float("TRADE_STORE_MAX_AGE", 900))
+    trade_store_max_rows: int = field(default_factory=lambda: _env_int("TRADE_STORE_MAX_ROWS", 200_000))
+
+    # Prewarm scheduler
+    prewarm_enabled: bool = field(default_factory=lambda: _env_bool("PREWARM_ENABLED", True))
+    prewarm_watchlist: List[str] = field(default_factory=lambda: _env_list("PREWARM_WATCHLIST", "AAPL,TSLA,GOOGL,MSFT,AMZN"))
+    prewarm_market_tide_interval: float = field(default_factory=lambda: _env_float("PREWARM_MARKET_TIDE_INTERVAL", 60))
+    prewarm_congress_trades_interval: float = field(default_factory=lambda: _env_float("PREWARM_CONGRESS_TRADES_INTERVAL", 900))
+    prewarm_greek_flow_interval: float = field(default_factory=lambda: _env_float("PREWARM_GREEK_FLOW_INTERVAL", 300))
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load .env and build the settings on first use"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Settings()
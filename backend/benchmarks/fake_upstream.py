@@ -0,0 +1,275 @@
+"""Local stand-in for the Unusual Whales and OpenAI APIs.
+
+Usage (from backend/):
+    python -m benchmarks.fake_upstream --port 8765
+    python -m benchmarks.fake_upstream --uw-latency 80,600 --uw-429-rate 0.02 --openai-latency 900,4000
+
+Then run the backend against it:
+    UNUSUAL_WHALES_BASE_URL=http://127.0.0.1:8765/api UNUSUAL_WHALES_API_KEY=fake \\
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+
+Serves congress/recent-trades, stock/{ticker}/greek-flow and
+market/market-tide from seeded synthetic data, and POST
+/v1/chat/completions with or without stream=true. Each service has its own
+latency distribution (lognormal, from a median and p99 in milliseconds),
+error and 429 injection rates, and a per-minute request budget reported in
+the rate-limit headers each API really sends.
+"""
+from typing import Dict, List, Optional, Tuple
+from datetime import date
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+import zlib
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from app.services import synthetic
+
+class FaultProfile:
+    """Latency, injected failures and rate limiting for one fake service"""
+
+    def __init__(
+        self,
+        median_ms: float = 50,
+        p99_ms: float = 250,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        per_minute: int = 0,
+        seed: int = 0
+    ):
+        self.median = median_ms / 1000
+        # Lognormal with the given median and 99th percentile (z = 2.326)
+        self.sigma = math.log(max(p99_ms, median_ms) / median_ms) / 2.326 if median_ms > 0 else 0.0
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.per_minute = per_minute
+        self.rng = random.Random(seed)
+        self.window_start = time.time()
+        self.window_count = 0
+        self.daily_count = 0
+
+    def latency(self) -> float:
+        """Draw one response delay in seconds"""
+        if self.median <= 0:
+            return 0.0
+        return self.median * math.exp(self.rng.gauss(0, self.sigma))
+
+    def admit(self) -> Tuple[Optional[int], float]:
+        """Count a request; returns (failure status or None, seconds to window reset)"""
+        now = time.time()
+        if now - self.window_start >= 60:
+            self.window_start, self.window_count = now, 0
+        reset = 60 - (now - self.window_start)
+        self.window_count += 1
+        self.daily_count += 1
+        if self.per_minute and self.window_count > self.per_minute:
+            return 429, reset
+        roll = self.rng.random()
+        if roll < self.throttle_rate:
+            return 429, reset
+        if roll < self.throttle_rate + self.error_rate:
+            return 500, reset
+        return None, reset
+
+    def remaining(self) -> int:
+        return max(self.per_minute - self.window_count, 0) if self.per_minute else 1_000_000
+
+def parse_latency(value: str) -> Tuple[float, float]:
+    """Parse "median" or "median,p99" milliseconds"""
+    parts = [float(part) for part in value.split(",")]
+    return parts[0], parts[1] if len(parts) > 1 else parts[0]
+
+class FakeUpstream:
+    """The fake services' state: fault profiles and generated datasets"""
+
+    def __init__(self, uw: FaultProfile, openai: FaultProfile, congress_rows: int, seed: int, tokens_per_sec: float):
+        self.uw = uw
+        self.openai = openai
+        self.seed = seed
+        self.tokens_per_sec = tokens_per_sec
+        self.congress = synthetic.generate("congress_recent_trades", congress_rows, seed=seed)
+        self._tide: Dict[Tuple[str, bool], List[Dict]] = {}
+        self._greek: Dict[Tuple[str, str], List[Dict]] = {}
+
+    def tide(self, day: str, interval_5m: bool) -> List[Dict]:
+        if (day, interval_5m) not in self._tide:
+            rows = synthetic.generate("market_tide", 390, seed=self.seed, end_date=date.fromisoformat(day))
+            self._tide[day, interval_5m] = rows[::5] if interval_5m else rows
+        return self._tide[day, interval_5m]
+
+    def greek(self, ticker: str, day: str) -> List[Dict]:
+        if (ticker, day) not in self._greek:
+            # Minute rows for one ticker and day, seeded by both
+            seed = self.seed + zlib.crc32(ticker.encode())
+            tide = synthetic.generate("market_tide", 390, seed=seed, end_date=date.fromisoformat(day))
+            self._greek[ticker, day] = [
+                {
+                    "ticker": ticker,
+                    "date": row["date"],
+                    "timestamp": row["timestamp"],
+                    "dir_delta_flow": row["net_call_premium"],
+                    "dir_vega_flow": row["net_put_premium"],
+                    "otm_dir_delta_flow": str(float(row["net_call_premium"]) * 0.6),
+                    "otm_dir_vega_flow": str(float(row["net_put_premium"]) * 0.6),
+                    "volume": abs(int(row["net_volume"]))
+                }
+                for row in tide
+            ]
+        return self._greek[ticker, day]
+
+def uw_headers(profile: FaultProfile, reset: float) -> Dict[str, str]:
+    return {
+        "x-uw-daily-req-count": str(profile.daily_count),
+        "x-uw-token-req-limit": str(profile.per_minute * 60 * 24 if profile.per_minute else 0),
+        "x-uw-minute-req-counter": str(profile.window_count),
+        "x-uw-req-per-minute-remaining": str(profile.remaining())
+    }
+
+def openai_headers(profile: FaultProfile, reset: float) -> Dict[str, str]:
+    return {
+        "x-ratelimit-limit-requests": str(profile.per_minute or 1_000_000),
+        "x-ratelimit-remaining-requests": str(profile.remaining()),
+        "x-ratelimit-reset-requests": f"{reset:.0f}s"
+    }
+
+async def admit(profile: FaultProfile, headers) -> Tuple[Optional[Response], Dict[str, str]]:
+    """Wait out the drawn latency; returns an injected failure if one is due, and the rate-limit headers"""
+    status, reset = profile.admit()
+    await asyncio.sleep(profile.latency())
+    extra = headers(profile, reset)
+    if status == 429:
+        return JSONResponse(
+            {"error": {"message": "Rate limit exceeded", "type": "rate_limit"}},
+            status_code=429,
+            headers={**extra, "retry-after": str(max(1, math.ceil(reset)))}
+        ), extra
+    if status is not None:
+        return JSONResponse({"error": {"message": "Injected failure"}}, status_code=status, headers=extra), extra
+    return None, extra
+
+def latest_day(value: Optional[str]) -> str:
+    return value or date.today().isoformat()
+
+def build_app(fake: FakeUpstream) -> Starlette:
+    """Build the ASGI app serving both fake APIs"""
+
+    async def congress(request: Request) -> Response:
+        failure, headers = await admit(fake.uw, uw_headers)
+        if failure is not None:
+            return failure
+        params = request.query_params
+        rows = fake.congress
+        if params.get("ticker"):
+            rows = [row for row in rows if row["ticker"] == params["ticker"]]
+        if params.get("start_date"):
+            rows = [row for row in rows if row["transaction_date"] >= params["start_date"]]
+        if params.get("end_date"):
+            rows = [row for row in rows if row["transaction_date"] <= params["end_date"]]
+        return JSONResponse({"data": rows[-int(params.get("limit", 1000)):]}, headers=headers)
+
+    async def greek_flow(request: Request) -> Response:
+        failure, headers = await admit(fake.uw, uw_headers)
+        if failure is not None:
+            return failure
+        rows = fake.greek(request.path_params["ticker"].upper(), latest_day(request.query_params.get("date")))
+        return JSONResponse({"data": rows}, headers=headers)
+
+    async def market_tide(request: Request) -> Response:
+        failure, headers = await admit(fake.uw, uw_headers)
+        if failure is not None:
+            return failure
+        params = request.query_params
+        rows = fake.tide(latest_day(params.get("date")), params.get("interval_5m") == "true")
+        return JSONResponse({"data": rows}, headers=headers)
+
+    async def chat_completions(request: Request) -> Response:
+        body = await request.json()
+        failure, headers = await admit(fake.openai, openai_headers)
+        if failure is not None:
+            return failure
+        content = "30-day High: $1.0M. As of 15:59 ET: fake insight from the local OpenAI stand-in."
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "gpt-4")
+
+        if not body.get("stream"):
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(content.split()), "total_tokens": len(content.split())}
+            }, headers=headers)
+
+        async def events():
+            def chunk(delta: Dict, finish_reason: Optional[str] = None) -> bytes:
+                event = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+                }
+                return f"data: {json.dumps(event)}\n\n".encode()
+
+            yield chunk({"role": "assistant", "content": ""})
+            for word in content.split(" "):
+                await asyncio.sleep(1 / fake.tokens_per_sec if fake.tokens_per_sec > 0 else 0)
+                yield chunk({"content": word + " "})
+            yield chunk({}, "stop")
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+    return Starlette(routes=[
+        Route("/api/congress/recent-trades", congress),
+        Route("/api/stock/{ticker}/greek-flow", greek_flow),
+        Route("/api/market/market-tide", market_tide),
+        Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/healthz", lambda request: JSONResponse({"status": "ok"}))
+    ])
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Fault and data options, shared with the load harness"""
+    for service, latency in (("uw", "50,250"), ("openai", "800,3000")):
+        parser.add_argument(f"--{service}-latency", type=parse_latency, default=parse_latency(latency),
+                            help="median[,p99] milliseconds")
+        parser.add_argument(f"--{service}-error-rate", type=float, default=0.0)
+        parser.add_argument(f"--{service}-429-rate", type=float, default=0.0)
+        parser.add_argument(f"--{service}-rpm", type=int, default=0, help="requests per minute; 0 is unlimited")
+    parser.add_argument("--congress-rows", type=int, default=5000)
+    parser.add_argument("--tokens-per-sec", type=float, default=40, help="streamed completion speed")
+    parser.add_argument("--seed", type=int, default=0)
+
+def build_from_args(args: argparse.Namespace) -> Starlette:
+    def profile(service: str, offset: int) -> FaultProfile:
+        median, p99 = getattr(args, f"{service}_latency")
+        return FaultProfile(
+            median, p99,
+            getattr(args, f"{service}_error_rate"),
+            getattr(args, f"{service}_429_rate"),
+            getattr(args, f"{service}_rpm"),
+            seed=args.seed + offset
+        )
+
+    return build_app(FakeUpstream(profile("uw", 0), profile("openai", 1), args.congress_rows, args.seed, args.tokens_per_sec))
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(build_from_args(args), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Hot-path benchmark: throughput and peak memory of the services' row loops.
+
+Usage (from backend/):
+    python -m benchmarks.hotpaths                         # compare up to 100k rows
+    python -m benchmarks.hotpaths --max-rows 1000000      # the full range, slow
+    python -m benchmarks.hotpaths --max-rows 10000        # quick run on small sizes
+    python -m benchmarks.hotpaths --only insights. --only route:
+    python -m benchmarks.hotpaths --update-baseline       # record a new baseline
+
+Each case runs on seeded synthetic data at sizes from 100 to 1M rows:
+get_historical_stats in premium_flow and market_tide, the cumulative loops
+behind get_market_tide and generate_mock_premium_flow, every
+generate_*_insight with the LLM client stubbed, amount parsing, and
+whole requests through the ASGI app with the upstream API stubbed. Caches
+are cleared before every run so each measures the cold path.
+
+Exits non-zero when a case's throughput drops, or its peak traced memory
+grows, by more than the tolerance against benchmarks/baselines/hotpaths.json.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime
+from types import SimpleNamespace
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(BACKEND_DIR, "benchmarks", "baselines", "hotpaths.json")
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+# Throughput may drop, or peak memory grow, by this fraction before failing
+TOLERANCE = 0.25
+# Memory differences below this are noise at small sizes
+MEMORY_FLOOR = 256 * 1024
+SEED = 20240101
+
+class Case:
+    """One benchmarked function: how to build its input and how to call it"""
+
+    def __init__(
+        self,
+        name: str,
+        dataset: str,
+        run: Callable[..., Any],
+        prepare: Callable[[List[Dict]], Tuple] = lambda rows: (rows,),
+        max_rows: int = SIZES[-1]
+    ):
+        self.name = name
+        self.dataset = dataset
+        self.run = run
+        self.prepare = prepare
+        self.max_rows = max_rows
+
+def stub_llm() -> None:
+    """Answer every chat completion instantly so only our preprocessing is timed"""
+    from app.services import chatgpt
+
+    message = SimpleNamespace(content="30-day High: $1.0M. Stubbed insight.")
+    completions = SimpleNamespace(create=lambda **kwargs: SimpleNamespace(choices=[SimpleNamespace(message=message)]))
+    chatgpt.get_client = lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+def stub_upstream(responses: Dict[str, List[Dict]]) -> None:
+    """Serve Unusual Whales endpoints from in-memory rows"""
+    from app.services import market_tide, unusual_whales
+
+    async def make_api_request(endpoint: str, params: Dict = None) -> Dict:
+        return {"data": list(responses.get(endpoint, []))}
+
+    unusual_whales.make_api_request = make_api_request
+    market_tide.make_api_request = make_api_request
+
+def clear_caches() -> None:
+    from app import responses
+    from app.services import cache, pagination
+
+    for shared in cache.CACHES.values():
+        shared.clear()
+    responses.rendered_cache.clear()
+    pagination.dataset_cache.clear()
+
+def lookback(rows: List[Dict]) -> int:
+    """Lookback in days that covers every row, so no row is filtered out"""
+    return (date.today() - date.fromisoformat(rows[0]["date"])).days + 1
+
+def build_cases() -> List[Case]:
+    from app.services import amounts, greek_flow, insights, market_tide, premium_flow
+    from app.services.premium_flow import add_cumulative_flow
+
+    def cumulative_flow(rows):
+        data, stats = add_cumulative_flow(rows, lookback(rows))
+        return data, stats, True
+
+    def route(path: str, endpoint: str) -> Callable[[List[Dict]], Tuple]:
+        def prepare(rows):
+            from fastapi.testclient import TestClient
+            from app.main import app
+            from app.services import deadlines
+
+            # Large sizes run past the production budget, more so under tracemalloc
+            deadlines.REQUEST_DEADLINE = 3600
+            stub_upstream({endpoint: rows})
+            return TestClient(app), path
+        return prepare
+
+    def request(client, path):
+        response = client.get(path)
+        assert response.status_code == 200, response.text
+
+    return [
+        Case("premium_flow.get_historical_stats", "premium_flow",
+             premium_flow.get_historical_stats, lambda rows: (rows, lookback(rows))),
+        Case("market_tide.get_historical_stats", "market_tide",
+             market_tide.get_historical_stats, lambda rows: (rows, lookback(rows))),
+        Case("market_tide.add_cumulative_tide", "market_tide", market_tide.add_cumulative_tide),
+        Case("premium_flow.add_cumulative_flow", "premium_flow",
+             add_cumulative_flow, lambda rows: (rows, lookback(rows))),
+        Case("insights.parse_amount_range", "congress_recent_trades",
+             lambda amounts: [insights.parse_amount_range(amount) for amount in amounts],
+             lambda rows: ([row["amounts"] for row in rows],)),
+        Case("amounts.parse_amounts", "congress_recent_trades",
+             amounts.parse_amounts, lambda rows: ([row["amounts"] for row in rows],)),
+        Case("insights.generate_congress_trades_insight", "congress_recent_trades",
+             insights.generate_congress_trades_insight),
+        Case("insights.generate_earnings_insight", "earnings", insights.generate_earnings_insight),
+        Case("insights.generate_insider_trading_insight", "insider", insights.generate_insider_trading_insight),
+        Case("insights.generate_premium_flow_insight", "premium_flow",
+             insights.generate_premium_flow_insight, cumulative_flow),
+        Case("insights.generate_greek_flow_insight", "greek_flow", insights.generate_greek_flow_insight),
+        # These two send every row to the LLM in the prompt, which caps their size
+        Case("greek_flow.generate_greek_flow_insight", "greek_flow",
+             greek_flow.generate_greek_flow_insight, max_rows=100_000),
+        Case("market_tide.generate_market_tide_insight", "market_tide",
+             market_tide.generate_market_tide_insight,
+             lambda rows: (market_tide.add_cumulative_tide(rows),), max_rows=100_000),
+        Case("route:/api/market-tide/data", "market_tide",
+             request, route("/api/market-tide/data", "market/market-tide"), max_rows=100_000),
+        Case("route:/api/congress/trades", "congress_recent_trades",
+             request, route("/api/congress/trades", "congress/recent-trades"), max_rows=100_000)
+    ]
+
+def repeats(size: int) -> int:
+    """More repeats for small sizes, where single runs are noisy"""
+    return max(3, min(50, 200_000 // size))
+
+def measure(case: Case, rows: List[Dict]) -> Dict[str, float]:
+    """Median rows/s over several runs, then peak traced memory of one run"""
+    # Debug prints in the services still cost their formatting, but not the terminal
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return _measure(case, rows)
+
+def _measure(case: Case, rows: List[Dict]) -> Dict[str, float]:
+    args = case.prepare(rows)
+    samples = []
+    for _ in range(repeats(len(rows))):
+        clear_caches()
+        start = time.perf_counter()
+        case.run(*args)
+        samples.append(time.perf_counter() - start)
+    clear_caches()
+    tracemalloc.start()
+    try:
+        case.run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "rows_per_sec": round(len(rows) / statistics.median(samples), 1),
+        "peak_bytes": peak,
+        "peak_bytes_per_row": round(peak / len(rows), 1)
+    }
+
+def run_all(sizes: List[int], only: List[str]) -> Dict[str, Dict[str, float]]:
+    from app.services import synthetic
+
+    stub_llm()
+    end_date = date.today()
+    results = {}
+    cases = [case for case in build_cases() if not only or any(case.name.startswith(prefix) for prefix in only)]
+    for size in sizes:
+        datasets: Dict[str, List[Dict]] = {}
+        for case in cases:
+            if size > case.max_rows:
+                continue
+            if case.dataset not in datasets:
+                datasets[case.dataset] = synthetic.generate(case.dataset, size, seed=SEED, end_date=end_date)
+            key = f"{case.name}@{size}"
+            results[key] = measure(case, datasets[case.dataset])
+            print(
+                f"{key:<58} {results[key]['rows_per_sec']:>14,.0f} rows/s"
+                f" {results[key]['peak_bytes'] / 1e6:>10.2f} MB peak",
+                flush=True
+            )
+    return results
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Describe every case that regressed against the baseline"""
+    failures = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if current["rows_per_sec"] < previous["rows_per_sec"] * (1 - tolerance):
+            failures.append(
+                f"{key}: {current['rows_per_sec']:,.0f} rows/s vs baseline {previous['rows_per_sec']:,.0f}"
+            )
+        grown = current["peak_bytes"] - previous["peak_bytes"]
+        if grown > MEMORY_FLOOR and current["peak_bytes"] > previous["peak_bytes"] * (1 + tolerance):
+            failures.append(
+                f"{key}: {current['peak_bytes'] / 1e6:.2f} MB peak vs baseline {previous['peak_bytes'] / 1e6:.2f} MB"
+            )
+    return failures
+
+def load_baseline() -> Optional[Dict]:
+    if not os.path.exists(BASELINE_PATH):
+        return None
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-rows", type=int, default=100_000)
+    parser.add_argument("--only", action="append", default=[], help="run cases whose name starts with this")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    results = run_all([size for size in SIZES if size <= args.max_rows], args.only)
+
+    if args.update_baseline:
+        # Merge so a partial run only replaces the cases it measured
+        baseline = load_baseline() or {"cases": {}}
+        baseline["cases"].update(results)
+        baseline["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+        baseline["python"] = sys.version.split()[0]
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return
+
+    baseline = load_baseline()
+    if baseline is None:
+        print("No baseline recorded; run with --update-baseline")
+        return
+    failures = compare(results, baseline["cases"], args.tolerance)
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Load generator reporting latency percentiles and throughput per route.
+
+Usage (from backend/):
+    python -m benchmarks.load --spawn                      # fakes + backend, all default routes
+    python -m benchmarks.load --spawn --workers 4 --uw-429-rate 0.05
+    python -m benchmarks.load --target http://127.0.0.1:8000 --route /api/market-tide/data
+
+With --spawn, starts benchmarks.fake_upstream and the backend (uvicorn
+app.main:app) on free local ports, with the backend's Unusual Whales and
+OpenAI base URLs pointed at the fakes; the fake options below shape the
+upstream. Otherwise it drives an already running --target.
+
+Keeps --concurrency requests in flight for --duration seconds, cycling
+through the routes, then prints count, status codes, throughput and
+p50/p95/p99 latency for each route. --json writes the same as JSON.
+"""
+from typing import Dict, List, Optional
+from collections import Counter
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from benchmarks.fake_upstream import add_arguments
+from benchmarks.startup import BACKEND_DIR, _free_port
+
+DEFAULT_ROUTES = [
+    "/api/market-tide/data",
+    "/api/greek-flow/data?ticker=AAPL",
+    "/api/congress/trades?limit=100",
+    "/api/premium-flow/data",
+    "/api/earnings/data",
+    "/api/insider-trading/data"
+]
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, math.ceil(pct / 100 * len(samples)) - 1))]
+
+def summarize(latencies: Dict[str, List[float]], statuses: Dict[str, Counter], elapsed: float) -> Dict[str, Dict]:
+    """Per-route count, status codes, requests/s and latency percentiles in milliseconds"""
+    report = {}
+    for route, samples in latencies.items():
+        samples = sorted(samples)
+        report[route] = {
+            "requests": len(samples),
+            "statuses": dict(statuses[route]),
+            "throughput_rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 95) * 1000, 1),
+            "p99_ms": round(percentile(samples, 99) * 1000, 1)
+        }
+    return report
+
+async def run_load(target: str, routes: List[str], concurrency: int, duration: float, timeout: float) -> Dict[str, Dict]:
+    import httpx
+
+    latencies: Dict[str, List[float]] = {route: [] for route in routes}
+    statuses: Dict[str, Counter] = {route: Counter() for route in routes}
+    next_route = itertools.cycle(routes).__next__
+    stop_at = time.perf_counter() + duration
+
+    async def worker(client) -> None:
+        while time.perf_counter() < stop_at:
+            route = next_route()
+            started = time.perf_counter()
+            try:
+                response = await client.get(route)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies[route].append(time.perf_counter() - started)
+            statuses[route][status] += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=target, limits=limits, timeout=timeout) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, statuses, elapsed)
+
+def wait_until_healthy(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"{url} did not answer in time")
+
+def fake_argv(args: argparse.Namespace) -> List[str]:
+    """Turn the parsed fake options back into a command line for the spawned fake"""
+    options = argparse.ArgumentParser(add_help=False)
+    add_arguments(options)
+    argv = []
+    for action in options._actions:
+        value = getattr(args, action.dest)
+        if isinstance(value, tuple):
+            value = ",".join(str(part) for part in value)
+        argv += [action.option_strings[0], str(value)]
+    return argv
+
+@contextlib.contextmanager
+def spawned(args: argparse.Namespace, fake_args: List[str]):
+    """Run the fakes and the backend pointed at them; yields the backend URL"""
+    fake_port, backend_port = _free_port(), _free_port()
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    env = {
+        **os.environ,
+        "UNUSUAL_WHALES_BASE_URL": f"{fake_url}/api",
+        "UNUSUAL_WHALES_API_KEY": "fake",
+        "OPENAI_BASE_URL": f"{fake_url}/v1",
+        "OPENAI_API_KEY": "fake",
+        "PREWARM_ENABLED": "false"
+    }
+    procs = [subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_upstream", "--port", str(fake_port), *fake_args],
+        cwd=BACKEND_DIR
+    )]
+    try:
+        wait_until_healthy(f"{fake_url}/healthz")
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(backend_port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            # The services' debug prints would drown the report
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL
+        ))
+        backend_url = f"http://127.0.0.1:{backend_port}"
+        wait_until_healthy(f"{backend_url}/healthz")
+        yield backend_url
+    finally:
+        for proc in reversed(procs):
+            proc.terminate()
+            proc.wait()
+
+def print_report(report: Dict[str, Dict]) -> None:
+    print(f"{'route':<40} {'reqs':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for route, stats in report.items():
+        print(
+            f"{route:<40} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>9.1f}"
+            f" {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}  {stats['statuses']}"
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", help="backend base URL; omit with --spawn")
+    parser.add_argument("--spawn", action="store_true", help="start the fakes and the backend locally")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when spawning")
+    parser.add_argument("--route", action="append", dest="routes", help="path to request; repeatable")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", dest="json_path", help="also write the report here")
+    add_arguments(parser)
+    args = parser.parse_args()
+    if not args.spawn and not args.target:
+        parser.error("pass --target or --spawn")
+
+    with contextlib.ExitStack() as stack:
+        target: Optional[str] = args.target
+        if args.spawn:
+            target = stack.enter_context(spawned(args, fake_argv(args)))
+        report = asyncio.run(run_load(target, args.routes or DEFAULT_ROUTES, args.concurrency, args.duration, args.timeout))
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+if __name__ == "__main__":
+    main()
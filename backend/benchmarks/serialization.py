@@ -0,0 +1,67 @@
+"""Serialization and compression benchmark for a large flow payload.
+
+Usage (from backend/):
+    python -m benchmarks.serialization [--repeat N]
+
+Compares FastAPI's default path (jsonable_encoder + JSONResponse) with
+app.responses.dumps on an intraday /api/premium-flow/data payload, compares
+row and columnar payload sizes, then reports bytes on the wire and
+compression time for gzip/brotli levels.
+"""
+from typing import Callable, Dict
+import argparse
+import statistics
+import time
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+from app import responses
+from app.services.premium_flow import generate_mock_premium_flow
+
+def timed(fn: Callable, repeat: int) -> float:
+    """Median wall time of fn in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def build_payload() -> Dict:
+    data, historical_stats = generate_mock_premium_flow(is_intraday=True)
+    return {"data": data, "historical_stats": historical_stats, "insight": "30-day High: $5.0M."}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    payload = build_payload()
+    print(f"payload rows: {len(payload['data'])}")
+    print(f"json backend: {'orjson' if responses.orjson else 'stdlib json'}\n")
+
+    default_ms = timed(lambda: JSONResponse(jsonable_encoder(payload)), args.repeat)
+    fast_ms = timed(lambda: responses.FastJSONResponse(payload), args.repeat)
+    print(f"{'serializer':<32} {'ms':>8}")
+    print(f"{'jsonable_encoder + JSONResponse':<32} {default_ms:>8.1f}")
+    print(f"{'FastJSONResponse':<32} {fast_ms:>8.1f}  ({default_ms / fast_ms:.1f}x)")
+
+    columnar_ms = timed(lambda: responses.render_payload(payload, "columnar"), args.repeat)
+    print(f"{'columnar FastJSONResponse':<32} {columnar_ms:>8.1f}\n")
+
+    body = responses.dumps(payload)
+    columnar_body = responses.render_payload(payload, "columnar").body
+    print(f"row JSON: {len(body)} bytes, columnar JSON: {len(columnar_body)} bytes "
+          f"({len(body) / len(columnar_body):.1f}x smaller)\n")
+    print(f"{'encoding':<16} {'bytes':>10} {'ratio':>7} {'ms':>8}")
+    print(f"{'identity':<16} {len(body):>10} {1:>7.1f} {0:>8.1f}")
+    variants = [("gzip", level) for level in (1, 6, 9)]
+    if responses.brotli is not None:
+        variants += [("br", quality) for quality in (1, 4, 8)]
+    for encoding, level in variants:
+        compressed = responses.compress(body, encoding, level, level)
+        ms = timed(lambda: responses.compress(body, encoding, level, level), args.repeat)
+        label = f"{encoding}-{level}"
+        print(f"{label:<16} {len(compressed):>10} {len(body) / len(compressed):>7.1f} {ms:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Startup benchmark: per-module import time and time to first /healthz.
+
+Usage (from backend/):
+    python -m benchmarks.startup                    # compare against baseline
+    python -m benchmarks.startup --update-baseline  # record a new baseline
+
+Exits non-zero when a heavy dependency is imported eagerly again, or when
+app.main's import time or time-to-first-/healthz regresses past the
+baseline by more than the tolerance.
+"""
+from typing import Dict, List, Optional
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(BACKEND_DIR, "benchmarks", "baselines", "startup.json")
+
+# Dependencies that must only be imported on first use, never by app.main
+LAZY_MODULES = ["openai", "httpx", "pytz", "psycopg"]
+
+def measure_imports() -> Dict[str, int]:
+    """Import app.main in a fresh interpreter; return cumulative microseconds per module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative.strip())
+    return times
+
+def eagerly_imported() -> List[str]:
+    """List the lazy dependencies that importing app.main pulls in"""
+    check = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", check], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return [m for m in result.stdout.strip().split(",") if m]
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_first_healthz(timeout: float = 30.0) -> float:
+    """Start uvicorn and return seconds until /healthz first answers 200"""
+    port = _free_port()
+    env = {**os.environ, "PREWARM_ENABLED": "false"}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("/healthz did not answer in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def run(repeat: int) -> Dict:
+    """Collect median import and first-/healthz timings over several runs"""
+    runs = [measure_imports() for _ in range(repeat)]
+    modules = sorted({name for times in runs for name in times if name.startswith("app")})
+    return {
+        "app.main_import_ms": statistics.median(t.get("app.main", 0) for t in runs) / 1000,
+        "modules_ms": {
+            name: statistics.median(t.get(name, 0) for t in runs) / 1000 for name in modules
+        },
+        "first_healthz_ms": statistics.median(measure_first_healthz() for _ in range(repeat)) * 1000
+    }
+
+def compare(result: Dict, baseline: Optional[Dict], tolerance: float) -> List[str]:
+    """Describe every metric that regressed past the baseline"""
+    if not baseline:
+        return []
+    failures = []
+    for metric in ("app.main_import_ms", "first_healthz_ms"):
+        limit = baseline[metric] * (1 + tolerance)
+        if result[metric] > limit:
+            failures.append(f"{metric}: {result[metric]:.1f}ms > {limit:.1f}ms allowed")
+    return failures
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed fractional slowdown")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    eager = eagerly_imported()
+    result = run(args.repeat)
+
+    print(f"{'module':<40} {'import ms':>10}")
+    for name, ms in sorted(result["modules_ms"].items(), key=lambda x: -x[1]):
+        print(f"{name:<40} {ms:>10.1f}")
+    print(f"\napp.main import:      {result['app.main_import_ms']:.1f}ms")
+    print(f"first /healthz:       {result['first_healthz_ms']:.1f}ms")
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    baseline = None
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+    failures = compare(result, baseline, args.tolerance)
+    if eager:
+        failures.append(f"eagerly imported by app.main: {', '.join(eager)}")
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
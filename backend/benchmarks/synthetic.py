@@ -0,0 +1,61 @@
+"""Synthetic dataset generator for load tests and benchmarks.
+
+Usage (from backend/):
+    python -m benchmarks.synthetic market_tide --rows 1000000
+    python -m benchmarks.synthetic congress --rows 5000000 --seed 7 --out trades.ndjson
+
+Streams rows from app.services.synthetic in chunks, optionally writing them
+as newline-delimited JSON, and reports rows per second. The same seed and
+options always produce the same file.
+"""
+import argparse
+import sys
+import time
+from datetime import date
+from app.responses import dumps
+from app.services import synthetic
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dataset", choices=sorted(synthetic.DATASETS))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tickers", type=int, default=500, help="ticker universe size")
+    parser.add_argument("--days", type=int, default=250, help="sessions spanned by event datasets")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--chunk-size", type=int, default=synthetic.DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--out", help="write NDJSON here; '-' for stdout")
+    args = parser.parse_args()
+
+    out = None
+    if args.out == "-":
+        out = sys.stdout.buffer
+    elif args.out:
+        out = open(args.out, "wb")
+
+    started = time.perf_counter()
+    written = 0
+    try:
+        for chunk in synthetic.stream(
+            args.dataset,
+            args.rows,
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+            universe=synthetic.build_universe(args.tickers, args.seed),
+            end_date=args.end_date,
+            days=args.days
+        ):
+            if out is not None:
+                out.write(b"\n".join(dumps(row) for row in chunk) + b"\n")
+            written += len(chunk)
+    finally:
+        if out is not None and out is not sys.stdout.buffer:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{args.dataset}: {written:,} rows in {elapsed:.2f}s ({written / elapsed:,.0f} rows/s)",
+        file=sys.stderr
+    )
+
+if __name__ == "__main__":
+    main()
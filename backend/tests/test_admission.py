@@ -0,0 +1,106 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.services import admission
+from app.services.admission import AdmissionMiddleware, RouteLimiter
+
+def test_limiter_queues_then_sheds():
+    async def run():
+        limiter = RouteLimiter(1, target_delay=0.01, interval=10, max_queue_time=0.05)
+        assert await limiter.acquire()
+        # A waiter gets the slot once it is released
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        limiter.release()
+        assert await waiter
+        # With the slot held, the next request waits max_queue_time and is shed
+        assert not await limiter.acquire()
+        limiter.release()
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.active == 0 and limiter.shed == 1
+
+def test_standing_queue_sheds_early():
+    async def run():
+        limiter = RouteLimiter(1, target_delay=0.01, interval=0.0, max_queue_time=0.05)
+        await limiter.acquire()
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.overloaded
+        started = asyncio.get_running_loop().time()
+        assert not await limiter.acquire()
+        return asyncio.get_running_loop().time() - started
+
+    # Overloaded limiters give up after target_delay instead of max_queue_time
+    assert asyncio.run(run()) < 0.04
+
+def make_app(release: asyncio.Event):
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware)
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.get("/api/slow")
+    async def slow():
+        await release.wait()
+        return {"degraded": admission.is_degraded()}
+
+    @app.get("/api/market-tide/data")
+    async def tide():
+        if not admission.is_degraded():
+            await release.wait()
+        return {"degraded": admission.is_degraded()}
+
+    @app.get("/api/uncached")
+    async def uncached():
+        admission.require_capacity()
+        await release.wait()
+        return {}
+
+    return app
+
+def test_shed_requests_get_503_or_degraded_responses(monkeypatch):
+    monkeypatch.setattr(admission, "limiters", {})
+    monkeypatch.setattr(admission, "ADMISSION_CONCURRENCY", 1)
+    monkeypatch.setattr(admission, "MAX_QUEUE_TIME", 0.05)
+    monkeypatch.setattr(admission, "DEGRADABLE_PATHS", {"/api/market-tide/data", "/api/uncached"})
+
+    async def run():
+        import httpx
+
+        release = asyncio.Event()
+        transport = httpx.ASGITransport(app=make_app(release))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            paths = ("/api/slow", "/api/market-tide/data", "/api/uncached")
+            held = [asyncio.create_task(client.get(path)) for path in paths]
+            await asyncio.sleep(0.01)
+            shed = await client.get("/api/slow")
+            degraded = await client.get("/api/market-tide/data")
+            needs_upstream = await client.get("/api/uncached")
+            health = await client.get("/healthz")
+            release.set()
+            await asyncio.gather(*held)
+        return shed, degraded, needs_upstream, health
+
+    shed, degraded, needs_upstream, health = asyncio.run(run())
+    assert shed.status_code == 503 and shed.headers["retry-after"] == "1"
+    assert degraded.status_code == 200 and degraded.json() == {"degraded": True}
+    assert degraded.headers["x-degraded"] == "1"
+    # Degraded requests that would need upstream or LLM work are shed after all
+    assert needs_upstream.status_code == 503
+    assert health.status_code == 200
+    assert admission.get_stats()["/api/slow"]["shed"] == 1
+
+def test_degraded_requests_use_the_local_insight():
+    from app.services.market_tide import generate_market_tide_insight
+
+    data = [{"net_call_premium": "2000000", "net_put_premium": "500000"}]
+    token = admission._degraded.set(True)
+    try:
+        insight = generate_market_tide_insight(data)
+    finally:
+        admission._degraded.reset(token)
+    assert insight.startswith("Bullish sentiment")
@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from datetime import date
+from app.services import deadlines, executors, synthetic
+from app.services.deadlines import Budget, DeadlineExceeded, DeadlineMiddleware, RequestCancelled
+from app.services.premium_flow import add_cumulative_flow
+
+def make_app(events):
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware)
+
+    @app.get("/slow")
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        return {"status": "done"}
+
+    @app.get("/budget")
+    async def budget():
+        return {"remaining": deadlines.remaining()}
+
+    return app
+
+def test_budget_checkpoints():
+    assert Budget(None).remaining() is None
+    Budget(10).check()
+    with pytest.raises(DeadlineExceeded):
+        Budget(0).check()
+    budget = Budget(10)
+    budget.cancelled = True
+    with pytest.raises(RequestCancelled):
+        budget.check()
+    # Outside a request there is no budget to enforce
+    deadlines.check()
+    assert deadlines.timeout(5.0) == 5.0
+
+def test_transforms_stop_at_their_checkpoints():
+    rows = [{"sector": "tech", "option_type": "call", "premium": 1.0, "volume": 1, "date": "2024-03-01"}]
+    token = deadlines._budget.set(Budget(0))
+    try:
+        with pytest.raises(DeadlineExceeded):
+            add_cumulative_flow(rows)
+    finally:
+        deadlines._budget.reset(token)
+    assert len(add_cumulative_flow(rows)[0]) == 1
+
+def test_process_pool_work_stops_at_the_deadline():
+    rows = synthetic.generate("premium_flow", 20_000, seed=5, end_date=date(2024, 3, 15))
+    assert executors.get_pool_kind(add_cumulative_flow) == "process"
+
+    async def run(seconds):
+        token = deadlines._budget.set(Budget(seconds))
+        try:
+            return await executors.run_sync(add_cumulative_flow, rows)
+        finally:
+            deadlines._budget.reset(token)
+
+    try:
+        asyncio.run(executors.run_sync(add_cumulative_flow, rows[:10]))
+        # Dispatch is still in budget, but it runs out while the rows are
+        # pickled over, so only the worker's own checkpoints can stop it
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(run(0.005))
+        # An already expired budget is never dispatched
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(run(0))
+        # The aborted call leaves the worker usable
+        assert len(asyncio.run(run(60))[0]) == len(rows)
+    finally:
+        executors.shutdown()
+
+def test_slow_route_gets_504_and_its_work_is_cancelled(monkeypatch):
+    monkeypatch.setitem(deadlines.ROUTE_DEADLINES, "/slow", 0.05)
+    monkeypatch.setattr(deadlines, "stats", {"deadline_exceeded": deadlines.Counter(), "cancelled": deadlines.Counter()})
+    events = []
+    response = TestClient(make_app(events)).get("/slow")
+    assert response.status_code == 504
+    assert events == ["cancelled"]
+    assert deadlines.get_stats()["deadline_exceeded"] == {"/slow": 1}
+
+def test_route_sees_its_budget(monkeypatch):
+    monkeypatch.setitem(deadlines.ROUTE_DEADLINES, "/budget", 3)
+    remaining = TestClient(make_app([])).get("/budget").json()["remaining"]
+    assert 0 < remaining <= 3
+
+def test_client_disconnect_cancels_route(monkeypatch):
+    monkeypatch.setattr(deadlines, "stats", {"deadline_exceeded": deadlines.Counter(), "cancelled": deadlines.Counter()})
+    events = []
+    app = make_app(events)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/slow", "raw_path": b"/slow", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("test", 1), "server": ("test", 80)
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}, {"type": "http.disconnect"}]
+    sent = []
+
+    async def receive():
+        message = messages.pop(0)
+        if message["type"] == "http.disconnect":
+            await asyncio.sleep(0.05)
+        return message
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    assert events == ["cancelled"]
+    assert sent == []
+    assert deadlines.get_stats()["cancelled"] == {"/slow": 1}
+
+def test_healthz_is_exempt():
+    assert deadlines.get_budget_seconds("/healthz") is None
+    assert deadlines.get_budget_seconds("/api/market-tide/stream") is None
+    assert deadlines.get_budget_seconds("/api/market-tide/data") == deadlines.REQUEST_DEADLINE
@@ -0,0 +1,150 @@
+import json
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.responses import StreamingResponse
+from app import responses
+from app.services.columnar import to_rows
+from app.responses import (
+    CompressionMiddleware,
+    FastJSONResponse,
+    conditional_response,
+    etag_matches,
+    negotiate_encoding
+)
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, gzip_level=6, brotli_quality=4)
+
+    @app.get("/big")
+    async def big():
+        return FastJSONResponse({"data": [{"sector": "tech", "option_type": "call"}] * 100})
+
+    @app.get("/small")
+    async def small():
+        return FastJSONResponse({"status": "ok"})
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            yield b"data: 1\n\n" * 50
+            yield b"data: 2\n\n" * 50
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return TestClient(app)
+
+def test_negotiate_encoding_respects_quality():
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("") is None
+
+def test_large_json_is_gzipped():
+    response = make_client().get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()["data"]) == 100
+
+def test_brotli_is_preferred_when_accepted():
+    pytest.importorskip("brotli")
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    response = make_client().get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert len(response.json()["data"]) == 100
+
+def test_small_and_streaming_responses_pass_through():
+    client = make_client()
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"status": "ok"}
+    stream = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in stream.headers
+    assert stream.text.startswith("data: 1")
+
+def test_fast_json_matches_stdlib_json():
+    payload = {"data": [{"premium": 1.5, "date": "2024-01-02"}], "insight": "30-day High: $1.0M"}
+    assert json.loads(FastJSONResponse(payload).body) == payload
+
+def test_etag_matches_weak_and_encoded_variants():
+    etag = '"abc123"'
+    assert etag_matches('"abc123"', etag)
+    assert etag_matches('W/"abc123", "other"', etag)
+    assert etag_matches('"abc123-gzip"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abc"', etag)
+    assert not etag_matches(None, etag)
+
+def test_conditional_response_reuses_body_while_source_is_unchanged(monkeypatch):
+    monkeypatch.setattr(responses, "rendered_cache", responses.TTLCache(None))
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, gzip_level=6, brotli_quality=4)
+    source = {"rows": [{"ticker": "AAPL"}] * 50}
+    builds = []
+
+    @app.get("/trades")
+    async def trades(request: Request):
+        def build():
+            builds.append(1)
+            return FastJSONResponse(source["rows"])
+        return conditional_response(request, build, "public, max-age=60", key="trades", source=source["rows"])
+
+    client = TestClient(app)
+    first = client.get("/trades", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["cache-control"] == "public, max-age=60"
+    assert first.headers["etag"].endswith('-gzip"')
+
+    revalidated = client.get("/trades", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert len(builds) == 1
+
+    # A new cache entry means new content and a new ETag
+    source["rows"] = [{"ticker": "TSLA"}] * 50
+    changed = client.get("/trades", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+    assert changed.status_code == 200
+    assert changed.json()[0]["ticker"] == "TSLA"
+    assert len(builds) == 2
+
+def test_msgpack_payload_round_trips_to_rows():
+    msgpack = pytest.importorskip("msgpack")
+    rows = [{"date": "2024-01-02", "option_type": "call", "premium": 1.5}] * 3
+    response = responses.render_payload({"data": rows, "insight": "ok"}, "msgpack")
+    assert response.media_type == "application/x-msgpack"
+    payload = msgpack.unpackb(response.body)
+    assert payload["insight"] == "ok" and to_rows(payload["data"]) == rows
+
+def test_chart_routes_revalidate_without_rendering(monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(responses, "rendered_cache", responses.TTLCache(None))
+    monkeypatch.setattr(main, "payload_cache", responses.TTLCache(60))
+    builds, renders = [], []
+
+    async def fake_market_tide(*args):
+        builds.append(args)
+        return {"data": [{"timestamp": "2024-03-01T14:30:00Z", "net_volume": 1}] * 50, "insight": "ok"}
+
+    def counting_render(payload, format="row"):
+        renders.append(format)
+        return responses.render_payload(payload, format)
+
+    monkeypatch.setattr(main, "get_market_tide", fake_market_tide)
+    monkeypatch.setattr(main, "render_payload", counting_render)
+    client = TestClient(main.app)
+    first = client.get("/api/market-tide/data", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["etag"].endswith('-gzip"')
+
+    revalidated = client.get(
+        "/api/market-tide/data",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+    # The 304 names the same gzip representation the 200 did
+    assert revalidated.headers["etag"] == first.headers["etag"]
+    assert "Accept-Encoding" in revalidated.headers["vary"]
+    assert len(builds) == 1 and renders == ["row"]
+
+    # Another format is rendered from the same payload
+    assert client.get("/api/market-tide/data?format=columnar").json()["data"]["length"] == 50
+    assert len(builds) == 1 and renders == ["row", "columnar"]
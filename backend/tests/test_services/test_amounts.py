@@ -0,0 +1,24 @@
+from app.services import synthetic
+from app.services.amounts import BANDS, UNKNOWN, AmountRange, parse_amount, parse_amounts, total_range
+
+def test_table_covers_the_bands_synthetic_disclosures_use():
+    for _, label in synthetic.AMOUNT_BANDS:
+        assert label in BANDS
+    assert parse_amount("$1,001 - $15,000") == AmountRange(1001.0, 15000.0, 8000.5)
+    # Open-ended bands count at their floor instead of as zero
+    assert parse_amount("Over $50,000,000") == AmountRange(50_000_001.0, None, 50_000_001.0)
+
+def test_nonstandard_strings_fall_back_to_the_memoized_parser():
+    assert parse_amount("$1,001 -$15,000") == BANDS["$1,001 - $15,000"]
+    assert parse_amount("$250,000") == AmountRange(250000.0, 250000.0, 250000.0)
+    assert parse_amount("$1,000,000 +") == AmountRange(1_000_000.0, None, 1_000_000.0)
+    assert parse_amount(12500) == AmountRange(12500.0, 12500.0, 12500.0)
+    assert parse_amount("Undisclosed") is UNKNOWN
+    assert parse_amount(None) is UNKNOWN
+
+def test_column_parsing_and_bounds():
+    values = ["$15,001 - $50,000", "$1,001 - $15,000", "odd", 100]
+    ranges = parse_amounts(values)
+    assert ranges == [parse_amount(value) for value in values]
+    assert total_range(ranges) == {"min": 16102.0, "max": 65100.0}
+    assert total_range(ranges + [BANDS["Over $50,000,000"]])["max"] is None
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from app.services import cache
+from app.services.cache import SharedCache, TTLCache, single_flight, single_flight_sync
+from app.services.cache_backends import LocalNetworkClient, NetworkBackend, SQLiteBackend
+
+def test_sqlite_entries_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    # Two caches on the same file stand in for two worker processes
+    first = SharedCache(SQLiteBackend(path, "responses"), 60)
+    second = SharedCache(SQLiteBackend(path, "responses"), 60)
+    other = SharedCache(SQLiteBackend(path, "insights"), 60)
+
+    first.set("tide", {"data": [{"net_volume": "10"}]})
+    assert second.get("tide") == {"data": [{"net_volume": "10"}]}
+    assert other.get("tide") is None
+
+    first.set("stale", [1], ttl=-1)
+    assert second.get("stale") is None
+
+    first.delete("tide")
+    second.clear()
+    assert first.get("tide") is None
+
+def test_local_copies_expire_so_other_workers_writes_are_seen(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = SharedCache(SQLiteBackend(path, "responses"), 60, local_ttl=0.05)
+    second = SharedCache(SQLiteBackend(path, "responses"), 60, local_ttl=0.05)
+    first.set("key", "old")
+    value = first.get("key")
+    assert first.get("key") is value  # same object while held locally
+    second.set("key", "new")
+    time.sleep(0.06)
+    assert first.get("key") == "new"
+
+def test_sqlite_lock_is_exclusive_until_released_or_expired(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = SQLiteBackend(path, "responses")
+    second = SQLiteBackend(path, "responses")
+
+    token = first.try_lock("flight:key", 30)
+    assert token is not None
+    assert second.try_lock("flight:key", 30) is None
+    second.unlock("flight:key", "not-the-token")
+    assert second.try_lock("flight:key", 30) is None
+    first.unlock("flight:key", token)
+    assert second.try_lock("flight:key", 0.01) is not None
+    time.sleep(0.02)
+    assert first.try_lock("flight:key", 30) is not None
+
+def test_network_backend_with_local_stand_in():
+    client = LocalNetworkClient()
+    first = SharedCache(NetworkBackend(client, "insights"), None)
+    second = SharedCache(NetworkBackend(client, "insights"), None)
+
+    first.set("insight", "30-day High: $1.0M.")
+    assert second.get("insight") == "30-day High: $1.0M."
+
+    token = first.try_lock("flight:insight", 30)
+    assert token is not None and second.try_lock("flight:insight", 30) is None
+    first.unlock("flight:insight", token)
+    assert second.try_lock("flight:insight", 30) is not None
+
+    second.clear()
+    assert first.backend.get("insight") is None
+
+def test_single_flight_runs_one_fill_at_a_time(tmp_path):
+    shared = SharedCache(SQLiteBackend(str(tmp_path / "cache.sqlite3"), "insights"), 60)
+    fills = []
+
+    def fill():
+        with single_flight_sync(shared, "key", wait=5):
+            if shared.get("key") is None:
+                fills.append(threading.current_thread().name)
+                time.sleep(0.05)
+                shared.set("key", "insight")
+
+    threads = [threading.Thread(target=fill) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(fills) == 1
+
+def test_async_single_flight_gives_up_waiting_after_wait():
+    memory = TTLCache(60)
+    token = memory.try_lock("flight:key", 30)
+
+    async def run():
+        async with single_flight(memory, "key", wait=0.05) as locked:
+            return locked
+
+    assert asyncio.run(run()) is False
+    memory.unlock("flight:key", token)
+    assert asyncio.run(run()) is True
+
+def test_shared_cache_waits_on_its_backend_off_the_event_loop(tmp_path):
+    shared = SharedCache(SQLiteBackend(str(tmp_path / "cache.sqlite3"), "responses"), 60)
+
+    class SlowBackend:
+        def __init__(self, backend):
+            self.backend = backend
+
+        def __getattr__(self, name):
+            def call(*args):
+                time.sleep(0.2)
+                return getattr(self.backend, name)(*args)
+            return call
+
+    shared.backend = SlowBackend(shared.backend)
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def run():
+        ticker = asyncio.create_task(tick())
+        async with single_flight(shared, "key", wait=1) as locked:
+            missed = await shared.get_async("key")
+            await shared.set_async("key", {"data": 1})
+        ticker.cancel()
+        return locked, missed, await shared.get_async("key")
+
+    assert asyncio.run(run()) == (True, None, {"data": 1})
+    # The loop kept running while each backend call blocked for 0.2s
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1
+
+def test_memory_backend_is_the_default(monkeypatch):
+    assert type(cache.build_cache("responses", 60)) is TTLCache
+    monkeypatch.setattr(cache, "CACHE_BACKEND", "sqlite")
+    assert isinstance(cache.build_cache("responses", 60), SharedCache)
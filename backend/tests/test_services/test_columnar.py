@@ -0,0 +1,20 @@
+from app.services.columnar import to_columnar, to_rows
+
+def test_columnar_round_trip():
+    rows = [
+        {"date": "2024-01-02", "option_type": "calls", "premium": 1.5},
+        {"date": "2024-01-02", "option_type": "puts", "premium": 2.0},
+        {"date": "2024-01-03", "option_type": "calls", "premium": 0.5, "sector": "tech"}
+    ]
+    table = to_columnar(rows)
+    assert table["length"] == 3
+    assert table["columns"]["premium"] == [1.5, 2.0, 0.5]
+    assert to_rows(table) == rows
+
+def test_categorical_fields_are_dictionary_encoded():
+    rows = [{"ticker": "AAPL"}, {"ticker": "TSLA"}, {"ticker": "AAPL"}]
+    column = to_columnar(rows)["columns"]["ticker"]
+    assert column == {"dictionary": ["AAPL", "TSLA"], "codes": [0, 1, 0]}
+
+def test_empty_rows():
+    assert to_columnar([]) == {"format": "columnar", "length": 0, "columns": {}}
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.services import deadlines, executors
+from app.services.cache import is_refreshing, refreshing
+from app.services.earnings import generate_mock_earnings_data
+from app.services.insights import generate_earnings_insight
+
+def current_thread_name() -> str:
+    return threading.current_thread().name
+
+def test_functions_are_routed_to_their_pool(monkeypatch):
+    assert executors.get_pool_kind(generate_mock_earnings_data) == "process"
+    assert executors.get_pool_kind(generate_earnings_insight) == "thread"
+    assert executors.get_pool_kind(current_thread_name) == "thread"
+    monkeypatch.setattr(executors, "EXECUTOR_MODE", "thread")
+    assert executors.get_pool_kind(generate_mock_earnings_data) == "thread"
+    monkeypatch.setattr(executors, "EXECUTOR_MODE", "inline")
+    assert executors.get_pool_kind(generate_earnings_insight) == "inline"
+
+def test_thread_work_runs_off_the_loop_with_caller_context():
+    async def run():
+        with refreshing():
+            flag = await executors.run_sync(is_refreshing)
+        return flag, await executors.run_sync(current_thread_name)
+
+    flag, name = asyncio.run(run())
+    assert flag is True
+    assert name.startswith("service")
+
+def test_cpu_bound_work_runs_in_process_pool():
+    async def run():
+        return await executors.run_sync(generate_mock_earnings_data, "tech", None, None, None)
+
+    try:
+        data = asyncio.run(run())
+    finally:
+        executors.shutdown()
+    assert data and all(row["sector"] == "tech" for row in data)
+
+def test_worker_calls_run_under_the_callers_deadline():
+    # The worker rebuilds the budget from its expiry on the shared monotonic clock
+    assert executors._run_in_worker(deadlines.remaining, None, None) == (None, None)
+    left, figures = executors._run_in_worker(deadlines.remaining, time.monotonic() + 60, None)
+    assert 59 < left <= 60 and figures is None
+    with pytest.raises(deadlines.DeadlineExceeded):
+        executors._run_in_worker(deadlines.check, time.monotonic() - 1, None)
+    assert deadlines.remaining() is None
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from datetime import datetime
+from app.services import greek_flow, market_calendar
+from app.services.cache import TTLCache
+
+def fake_upstream(monkeypatch):
+    calls = []
+
+    async def fake_request(endpoint, params):
+        calls.append(params["date"])
+        return {"data": [{"ticker": "AAPL", "date": params["date"], "dir_delta_flow": "1.0"}]}
+
+    monkeypatch.setattr(greek_flow, "make_api_request", fake_request)
+    monkeypatch.setattr(greek_flow, "generate_greek_flow_insight", lambda data: "")
+    monkeypatch.setattr(greek_flow, "partition_cache", TTLCache(None))
+    return calls
+
+def test_range_days_skip_closed_market_days(monkeypatch):
+    monkeypatch.setattr(market_calendar, "market_now", lambda: market_calendar.get_market_tz().localize(datetime(2024, 1, 10, 12)))
+    assert greek_flow.get_range_days("2024-01-05", "2024-01-08") == ["2024-01-05", "2024-01-08"]
+    # A start date alone is that one day, as an end date alone is
+    assert greek_flow.get_range_days("2024-01-09") == ["2024-01-09"]
+    assert greek_flow.get_range_days(None, "2024-01-09") == ["2024-01-09"]
+    assert greek_flow.get_range_days() == ["2024-01-10"]
+
+def test_ranges_over_the_limit_are_rejected(monkeypatch):
+    calls = fake_upstream(monkeypatch)
+    monkeypatch.setattr(market_calendar, "market_now", lambda: market_calendar.get_market_tz().localize(datetime(2024, 3, 1, 12)))
+    monkeypatch.setattr(greek_flow, "MAX_RANGE_DAYS", 5)
+    assert len(greek_flow.get_range_days("2024-01-02", "2024-01-08")) == 5
+    # Dropping the oldest days would silently answer a different question
+    with pytest.raises(greek_flow.RangeTooLong):
+        greek_flow.get_range_days("2024-01-02", "2024-01-09")
+    with pytest.raises(greek_flow.RangeTooLong):
+        asyncio.run(greek_flow.get_greek_flow("AAPL", "2024-01-02", "2024-01-31"))
+    assert calls == []
+
+def test_overlapping_ranges_share_closed_partitions(monkeypatch):
+    calls = fake_upstream(monkeypatch)
+    monkeypatch.setattr(market_calendar, "market_now", lambda: market_calendar.get_market_tz().localize(datetime(2024, 1, 10, 12)))
+
+    first = asyncio.run(greek_flow.get_greek_flow("AAPL", "2024-01-02", "2024-01-04"))
+    second = asyncio.run(greek_flow.get_greek_flow("AAPL", "2024-01-03", "2024-01-05"))
+
+    assert [row["date"] for row in first["data"]] == ["2024-01-02", "2024-01-03", "2024-01-04"]
+    assert [row["date"] for row in second["data"]] == ["2024-01-03", "2024-01-04", "2024-01-05"]
+    # Only the one day not covered by the first range is fetched again
+    assert sorted(calls) == ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    # Closed days are cached with no expiry
+    assert all(expires_at is None for _, expires_at, _ in greek_flow.partition_cache.items())
+
+def test_empty_closed_days_expire(monkeypatch):
+    monkeypatch.setattr(market_calendar, "market_now", lambda: market_calendar.get_market_tz().localize(datetime(2024, 1, 10, 12)))
+    monkeypatch.setattr(greek_flow, "partition_cache", TTLCache(None))
+
+    async def empty_request(endpoint, params):
+        return {"data": []}
+
+    monkeypatch.setattr(greek_flow, "make_api_request", empty_request)
+    day = asyncio.run(greek_flow.fetch_greek_flow_day("AAPL", "2024-01-05", asyncio.Semaphore(1)))
+    assert day == []
+    # An outage or a late backfill is retried once the entry expires
+    [(_, expires_at, _)] = greek_flow.partition_cache.items()
+    assert expires_at is not None
+
+def test_route_answers_a_long_range_with_400():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    response = TestClient(app).get("/api/greek-flow/data", params={"ticker": "AAPL", "start_date": "2023-01-03", "end_date": "2023-12-29"})
+    assert response.status_code == 400
+    assert "at most" in response.json()["detail"]
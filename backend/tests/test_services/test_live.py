@@ -0,0 +1,91 @@
+import asyncio
+import json
+from app.services.live import LiveHub, HEARTBEAT
+
+def parse(event: bytes):
+    lines = event.decode().strip().split("\n")
+    return lines[0].split(": ", 1)[1], json.loads(lines[2].split(": ", 1)[1])
+
+def make_fetch(series, calls):
+    async def fetch():
+        calls.append(1)
+        return {"data": list(series), "insight": "ok"}
+    return fetch
+
+def test_subscribers_of_one_filter_set_share_a_poller():
+    series = [{"timestamp": "09:30"}, {"timestamp": "09:31"}]
+    calls = []
+
+    async def run():
+        hub = LiveHub(interval=0.01, heartbeat=1, queue_size=8, is_open=lambda: True)
+        fetch = make_fetch(series, calls)
+        first = hub.subscribe("tide", {"interval_5m": False}, fetch, lambda row: row["timestamp"])
+        second = hub.subscribe("tide", {"interval_5m": False}, fetch, lambda row: row["timestamp"])
+        assert len(hub.topics) == 1
+
+        events = [parse(await queue.get()) for _, queue in (first, second)]
+        series.append({"timestamp": "09:32"})
+        deltas = [parse(await queue.get()) for _, queue in (first, second)]
+        polls = first[0].polls
+
+        hub.unsubscribe(*first)
+        hub.unsubscribe(*second)
+        await asyncio.sleep(0)
+        return events, deltas, polls, hub.topics
+
+    events, deltas, polls, topics = asyncio.run(run())
+    assert all(kind == "snapshot" and len(data["data"]) == 2 for kind, data in events)
+    assert all(kind == "delta" and data["data"] == [{"timestamp": "09:32"}] for kind, data in deltas)
+    # One fetch per interval regardless of the two subscribers
+    assert len(calls) == polls
+    assert topics == {}
+
+def test_slow_subscriber_is_resynced_from_snapshot():
+    hub = LiveHub(interval=1, heartbeat=1, queue_size=2, is_open=lambda: True)
+
+    async def run():
+        topic, queue = hub.subscribe("tide", {}, make_fetch([], []), lambda row: row["t"])
+        topic.task.cancel()
+        for t in range(5):
+            hub.publish(topic, {"data": [{"t": i} for i in range(t + 1)]})
+        return topic, [parse(queue.get_nowait()) for _ in range(queue.qsize())]
+
+    topic, queued = asyncio.run(run())
+    assert topic.resyncs >= 1
+    kind, data = queued[0]
+    assert kind == "snapshot"
+    assert len(data["data"]) >= 4
+
+def test_idle_stream_sends_heartbeats():
+    hub = LiveHub(interval=10, heartbeat=0.01, queue_size=2, is_open=lambda: True)
+
+    async def run():
+        async def never():
+            await asyncio.sleep(10)
+        stream = hub.stream("tide", {}, never, lambda row: row["t"])
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(run()) == HEARTBEAT
+    assert hub.topics == {}
+
+def test_rows_arriving_or_changing_under_the_last_key_are_sent():
+    hub = LiveHub(interval=1, heartbeat=1, queue_size=8, is_open=lambda: True)
+    day = [{"date": "2024-03-01", "sector": "tech", "premium": 1}]
+
+    async def run():
+        topic, queue = hub.subscribe("flow", {}, make_fetch([], []), lambda row: (row["date"], ""))
+        topic.task.cancel()
+        hub.publish(topic, {"data": day})
+        # Daily rows all share one key: a new sector and an updated premium
+        hub.publish(topic, {"data": day + [{"date": "2024-03-01", "sector": "energy", "premium": 2}]})
+        hub.publish(topic, {"data": [{"date": "2024-03-01", "sector": "tech", "premium": 3}]})
+        # Nothing changed, so nothing is sent
+        hub.publish(topic, {"data": [{"date": "2024-03-01", "sector": "tech", "premium": 3}]})
+        return [parse(queue.get_nowait()) for _ in range(queue.qsize())]
+
+    events = asyncio.run(run())
+    assert [kind for kind, _ in events] == ["snapshot", "delta", "delta"]
+    assert events[1][1]["data"] == [{"date": "2024-03-01", "sector": "energy", "premium": 2}]
+    assert events[2][1]["data"] == [{"date": "2024-03-01", "sector": "tech", "premium": 3}]
@@ -0,0 +1,113 @@
+import asyncio
+import contextlib
+import os
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from app import responses
+from app.services import chatgpt, executors, insights, market_tide, memprofile, pagination, premium_flow, synthetic
+from app.services.cache import insight_cache
+
+ROWS = 5000
+
+@pytest.fixture
+def stages(monkeypatch):
+    message = SimpleNamespace(content="Stubbed insight.")
+    completions = SimpleNamespace(create=lambda **kwargs: SimpleNamespace(choices=[SimpleNamespace(message=message)]))
+    monkeypatch.setattr(chatgpt, "get_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    insight_cache.clear()
+    memprofile.reset()
+    memprofile.start()
+    # The services' debug prints would otherwise be traced too
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield memprofile.stats[memprofile.BACKGROUND]
+    memprofile.stop()
+    memprofile.reset()
+
+@pytest.fixture(scope="module")
+def rows():
+    # Generated before tracing starts, which would slow generation down
+    datasets = ("market_tide", "premium_flow", "congress_recent_trades", "earnings", "insider", "greek_flow")
+    return {dataset: synthetic.generate(dataset, ROWS, seed=11, end_date=date.today()) for dataset in datasets}
+
+def test_every_stage_stays_within_its_row_budget(rows, stages):
+    tide = rows["market_tide"]
+    flow = rows["premium_flow"]
+    market_tide.get_historical_stats(tide, 3650)
+    cumulative_tide = market_tide.add_cumulative_tide(tide)
+    premium_flow.get_historical_stats(flow, 3650)
+    cumulative_flow, stats = premium_flow.add_cumulative_flow(flow, 3650)
+    premium_flow.generate_mock_premium_flow(is_intraday=True)
+    insights.generate_congress_trades_insight(rows["congress_recent_trades"])
+    insights.generate_earnings_insight(rows["earnings"])
+    insights.generate_insider_trading_insight(rows["insider"])
+    insights.generate_premium_flow_insight(cumulative_flow, stats, True)
+    insights.generate_greek_flow_insight(rows["greek_flow"])
+    pagination.get_dataset("memprofile-test", rows["insider"], lambda dataset: {})
+    responses.render_payload({"data": cumulative_tide})
+
+    assert set(stages) == set(memprofile.ROW_BUDGETS)
+    over = {
+        name: entry["peak_bytes_per_row"]
+        for name, entry in stages.items()
+        if entry["peak_bytes_per_row"] > memprofile.ROW_BUDGETS[name]
+    }
+    assert over == {}
+
+def test_process_pool_stages_are_measured_in_the_worker(rows, stages):
+    flow = rows["premium_flow"]
+    assert executors.get_pool_kind(premium_flow.add_cumulative_flow) == "process"
+
+    async def run():
+        await executors.run_sync(premium_flow.add_cumulative_flow, flow, 3650)
+        await executors.run_sync(premium_flow.generate_mock_premium_flow, None, None, None, None, 30, True)
+
+    try:
+        asyncio.run(run())
+    finally:
+        executors.shutdown()
+    # The caller only unpickles results; the worker saw the transforms allocate
+    assert stages["premium_flow.mock"]["calls"] == 1
+    # The mock's own cumulative pass is filed alongside the direct call
+    assert stages["premium_flow.cumulative"]["calls"] == 2
+    assert stages["premium_flow.cumulative"]["rows"] > ROWS
+    for name in ("premium_flow.mock", "premium_flow.cumulative"):
+        assert 0 < stages[name]["peak_bytes_per_row"] <= memprofile.ROW_BUDGETS[name]
+    assert stages["premium_flow.cumulative"]["peak_bytes_per_row"] > memprofile.ROW_BUDGETS["premium_flow.cumulative"] / 3
+
+def test_merged_figures_add_counts_and_keep_the_worst_peaks(stages):
+    entry = {"calls": 1, "rows": 10, "peak_bytes": 500, "retained_bytes": 0, "peak_bytes_per_row": 50.0, "over_budget": 0}
+    memprofile.merge({memprofile.BACKGROUND: {"worker": entry}})
+    memprofile.merge({memprofile.BACKGROUND: {"worker": {**entry, "peak_bytes": 100, "peak_bytes_per_row": 10.0, "over_budget": 1}}})
+    assert stages["worker"] == {**entry, "calls": 2, "rows": 20, "over_budget": 1}
+
+def test_stages_report_peak_and_retained_bytes_and_nest(stages):
+    kept = []
+    with memprofile.stage("outer", rows=100):
+        with memprofile.stage("freed"):
+            scratch = [bytearray(1000) for _ in range(1000)]
+            del scratch
+        with memprofile.stage("kept"):
+            kept.append(bytearray(500_000))
+
+    assert stages["freed"]["peak_bytes"] >= 1_000_000
+    assert stages["freed"]["retained_bytes"] < 10_000
+    assert 500_000 <= stages["kept"]["retained_bytes"] < 510_000
+    # The outer stage's peak covers the inner one even though it reset the peak
+    assert stages["outer"]["peak_bytes"] >= 1_000_000
+    assert stages["outer"]["peak_bytes_per_row"] >= 10_000
+
+def test_going_over_a_row_budget_is_counted(stages, monkeypatch):
+    monkeypatch.setitem(memprofile.ROW_BUDGETS, "tight", 10)
+    with memprofile.stage("tight", rows=10):
+        scratch = bytearray(10_000)
+        del scratch
+    assert stages["tight"]["over_budget"] == 1
+
+def test_requests_are_profiled_under_their_route(stages):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    response = TestClient(app).get("/api/premium-flow/sectors")
+    assert response.status_code == 200
+    assert memprofile.get_stats()["/api/premium-flow/sectors"]["request"]["calls"] == 1
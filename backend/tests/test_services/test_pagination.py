@@ -0,0 +1,79 @@
+import pytest
+from app.services import pagination
+from app.services.cache import TTLCache
+from app.services.pagination import Dataset, InvalidCursor, get_dataset, paginate
+
+ROWS = [
+    {"ticker": "AAPL", "amounts": "$1,001 - $15,000", "transaction_date": "2024-03-01"},
+    {"ticker": "TSLA", "amounts": "$50,001 - $100,000", "transaction_date": "2024-03-02"},
+    {"ticker": "MSFT", "amounts": "$15,001 - $50,000", "transaction_date": "2024-03-02"},
+    {"ticker": "NVDA", "amounts": "$1,001 - $15,000", "transaction_date": "2024-03-03"},
+    {"ticker": "AMD", "amounts": "$100,001 - $250,000", "transaction_date": "2024-03-04"}
+]
+
+def walk(dataset, sort, order, limit):
+    pages, cursor = [], None
+    while True:
+        page = paginate(dataset, sort, order, limit, cursor)
+        pages.append([row["ticker"] for row in page["data"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+@pytest.mark.parametrize("sort,order", [("date", "desc"), ("date", "asc"), ("amount", "desc"), ("ticker", "asc")])
+def test_cursor_pages_cover_the_full_order_once(sort, order):
+    dataset = Dataset(ROWS, "v1", lambda rows: {})
+    pages = walk(dataset, sort, order, 2)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sum(pages, []) == [row["ticker"] for row in paginate(dataset, sort, order)["data"]]
+
+def test_sort_keys_and_amount_parsing():
+    dataset = Dataset(ROWS, "v1", lambda rows: {})
+    assert [row["ticker"] for row in paginate(dataset, "amount", "desc", 2)["data"]] == ["AMD", "TSLA"]
+    assert paginate(dataset, "date", "desc", 1)["data"][0]["ticker"] == "AMD"
+
+def test_cursor_is_stable_when_rows_are_added():
+    original = Dataset(ROWS, "v1", lambda rows: {})
+    first = paginate(original, "date", "desc", 2)
+    expected = paginate(original, "date", "desc", 2, first["next_cursor"])["data"]
+    newer = [{"ticker": "META", "amounts": "$1,001 - $15,000", "transaction_date": "2024-03-05"}] + ROWS
+    second = paginate(Dataset(newer, "v2", lambda rows: {}), "date", "desc", 2, first["next_cursor"])
+    # The new row sorts before the cursor, so the second page carries on unchanged
+    assert second["data"] == expected
+
+def test_cursor_from_another_sort_is_rejected():
+    dataset = Dataset(ROWS, "v1", lambda rows: {})
+    cursor = paginate(dataset, "date", "desc", 2)["next_cursor"]
+    with pytest.raises(InvalidCursor):
+        paginate(dataset, "ticker", "asc", 2, cursor)
+    with pytest.raises(InvalidCursor):
+        paginate(dataset, "date", "desc", 2, "not-a-cursor")
+    # Well-formed cursors whose key types cannot be compared with the dataset's
+    for sort, key in [
+        ("date", [[1, 5], "x"]), ("amount", [[1, "5"], "x"]), ("ticker", [[1, "AAPL"], 7]),
+        ("date", [[2, "2024-03-01"], "x"]), ("date", [[0, 5], "x"]), ("amount", [[1, True], "x"])
+    ]:
+        with pytest.raises(InvalidCursor):
+            paginate(dataset, sort, "desc", 2, pagination.encode_cursor(sort, "desc", key))
+    assert paginate(dataset, "amount", "desc", 2, pagination.encode_cursor("amount", "desc", [[1, 9000], "x"]))["data"]
+
+def test_aggregates_are_computed_once_per_version(monkeypatch):
+    monkeypatch.setattr(pagination, "dataset_cache", TTLCache(None))
+    calls = []
+
+    def aggregates(rows):
+        calls.append(len(rows))
+        return {"insight": "summary"}
+
+    hashed = []
+    row_id = pagination.row_id
+    monkeypatch.setattr(pagination, "row_id", lambda row: hashed.append(row) or row_id(row))
+
+    first = get_dataset("congress", ROWS, aggregates)
+    # The same rows object is the same version, without hashing the rows again
+    assert get_dataset("congress", ROWS, aggregates) is first
+    assert len(hashed) == 5
+    changed = get_dataset("congress", ROWS[:3], aggregates)
+    assert changed is not first and changed.version != first.version
+    assert calls == [5, 3]
+    assert paginate(first, limit=2)["insight"] == "summary"
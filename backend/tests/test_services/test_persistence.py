@@ -0,0 +1,122 @@
+import asyncio
+import os
+import pytest
+from datetime import datetime, timedelta
+from app.services import persistence
+from app.services import greek_flow
+from app.services.cache import TTLCache
+
+def test_to_record_extracts_indexed_columns():
+    row = {
+        "ticker": "AAPL",
+        "reporter": "Jane Doe",
+        "txn_type": "Buy",
+        "amounts": "$1,001 - $15,000",
+        "transaction_date": "2024-03-15"
+    }
+    record = persistence.to_record("congress_trades", row)
+    assert record[:6] == ("2024-03-15", None, "AAPL", None, "Jane Doe", "Buy")
+    assert len(record) == len(persistence.COLUMNS)
+
+def test_to_record_skips_rows_without_date():
+    assert persistence.to_record("greek_flow", {"ticker": "AAPL"}) is None
+
+def test_month_bounds_wrap_year():
+    assert persistence.month_bounds("2024-12-31") == ("2024-12-01", "2025-01-01")
+    assert persistence.partition_name("market_tide", "2024-12-31") == "market_tide_2024_12"
+
+def test_schema_indexes_ticker_and_sector_by_date():
+    statements = "\n".join(persistence.schema_statements("insider_trades"))
+    assert "PARTITION BY RANGE (date)" in statements
+    assert "(ticker, date)" in statements
+    assert "(sector, date)" in statements
+
+def test_build_query_filters():
+    query, params = persistence.build_query(
+        "congress_trades", ticker="AAPL", start_date="2024-01-01", end_date="2024-01-31"
+    )
+    assert "ticker = %s" in query and "date >= %s" in query and "date <= %s" in query
+    assert params == ["AAPL", "2024-01-01", "2024-01-31"]
+
+def test_coverage_is_recorded_for_closed_spans_only():
+    record = persistence.coverage_record("congress_trades", {"ticker": "AAPL", "start_date": "2024-01-01", "end_date": "2024-01-31"})
+    assert record == ("congress_trades", "AAPL", None, None, None, "2024-01-01", "2024-01-31")
+    today = datetime.now().strftime("%Y-%m-%d")
+    assert persistence.coverage_record("greek_flow", {"start_date": today, "end_date": today}) is None
+    assert persistence.coverage_record("congress_trades", {"end_date": "2024-01-31"}) is None
+
+def test_coverage_query_needs_an_ingest_at_least_as_broad():
+    query, params = persistence.build_coverage_query(
+        "congress_trades", ticker="AAPL", start_date="2024-01-01", end_date="2024-01-31"
+    )
+    # A ticker-wide ingest or an unfiltered one covers the ticker; a member's does not
+    assert "(ticker IS NULL OR ticker = %s)" in query and "member IS NULL" in query
+    assert params == ["congress_trades", "2024-01-01", "2024-01-31", "AAPL"]
+    assert persistence.build_coverage_query("congress_trades", end_date="2024-01-31") is None
+
+def test_historical_greek_flow_reads_database_first(monkeypatch):
+    async def fake_fetch_rows(dataset, **filters):
+        assert dataset == "greek_flow"
+        assert filters["ticker"] == "AAPL"
+        return [{"ticker": "AAPL", "date": filters["start_date"], "dir_delta_flow": "1.0"}]
+
+    async def fail_request(*args, **kwargs):
+        raise AssertionError("upstream should not be called")
+
+    monkeypatch.setattr(persistence, "fetch_rows", fake_fetch_rows)
+    monkeypatch.setattr(greek_flow, "make_api_request", fail_request)
+    monkeypatch.setattr(greek_flow, "generate_greek_flow_insight", lambda data: "stored")
+    monkeypatch.setattr(greek_flow, "partition_cache", TTLCache(None))
+
+    result = asyncio.run(greek_flow.get_greek_flow("AAPL", "2024-01-01", "2024-01-05"))
+    # 2024-01-01 is a market holiday
+    assert [row["date"] for row in result["data"]] == ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    assert result["insight"] == "stored"
+
+@pytest.fixture(scope="module")
+def database_url(tmp_path_factory):
+    """TEST_DATABASE_URL when set, else a throwaway embedded Postgres"""
+    if os.getenv("TEST_DATABASE_URL"):
+        yield os.getenv("TEST_DATABASE_URL")
+        return
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(tmp_path_factory.mktemp("postgres") / "data", cleanup_mode="delete")
+    yield server.get_uri()
+    server.cleanup()
+
+def test_ingest_round_trip(monkeypatch, database_url):
+    monkeypatch.setattr(persistence, "DATABASE_URL", database_url)
+    monkeypatch.setattr(persistence, "_pool", None)
+    monkeypatch.setattr(persistence, "_ready_datasets", set())
+    monkeypatch.setattr(persistence, "_ready_partitions", set())
+    day = (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")
+    earlier = (datetime.now() - timedelta(days=40)).strftime("%Y-%m-%d")
+    rows = [
+        {"sector": "tech", "ticker": "AAPL", "reporter": "Jane Doe", "txn_type": "Buy", "amounts": "$1,001 - $15,000", "transaction_date": day},
+        {"sector": "energy", "ticker": "XOM", "reporter": "John Smith", "txn_type": "Sell", "amounts": "$15,001 - $50,000", "transaction_date": day},
+        {"sector": "tech", "ticker": "MSFT", "reporter": "Jane Doe", "txn_type": "Buy", "amounts": "$1,001 - $15,000", "transaction_date": earlier}
+    ]
+
+    async def run():
+        await persistence.ingest("congress_trades", rows[:1], coverage={"sector": "tech", "start_date": day, "end_date": day})
+        # Rows ingested for one sector say nothing about the whole day
+        narrow = await persistence.fetch_rows("congress_trades", start_date=day, end_date=day)
+        inserted = await persistence.ingest("congress_trades", rows, coverage={"start_date": earlier, "end_date": day})
+        # Re-ingesting the same rows must not duplicate them
+        again = await persistence.ingest("congress_trades", rows)
+        tech = await persistence.fetch_rows("congress_trades", sector="tech", start_date=earlier, end_date=day)
+        async with persistence.get_pool().connection() as conn:
+            cursor = await conn.execute(
+                "SELECT inhrelid::regclass::text FROM pg_inherits "
+                "WHERE inhparent = 'congress_trades'::regclass ORDER BY 1"
+            )
+            partitions = [row[0] for row in await cursor.fetchall()]
+        await persistence.close_pool()
+        return narrow, inserted, again, tech, partitions
+
+    narrow, inserted, again, tech, partitions = asyncio.run(run())
+    assert narrow == []
+    assert (inserted, again) == (2, 0)
+    assert tech == [rows[2], rows[0]]
+    # Each month's rows land in their own partition
+    assert partitions == sorted({persistence.partition_name("congress_trades", row["transaction_date"]) for row in rows})
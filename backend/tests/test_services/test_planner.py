@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+from app.services import planner
+from app.services.earnings import generate_mock_earnings_data
+from app.services.greek_flow import generate_mock_greek_flow
+from app.services.insider_trading import generate_mock_insider_data
+from app.services.mock_data import generate_mock_congress_trades
+from app.services.premium_flow import generate_mock_premium_flow
+
+def test_plan_dates_intersects_the_window_with_the_range():
+    first, last = date(2024, 3, 1), date(2024, 3, 31)
+    assert len(planner.plan_dates(first, last, None, None)) == 31
+    assert planner.plan_dates(first, last, "2024-03-30", "2024-04-10") == ["2024-03-30", "2024-03-31"]
+    assert planner.plan_dates(first, last, "2024-04-01", None) == []
+    assert planner.shift_date("2024-02-28", 2) == "2024-03-01"
+    # Bounds that are not ISO dates filter as strings instead of failing
+    assert planner.plan_dates(first, last, "foo", None) == []
+    assert len(planner.plan_dates(first, last, None, "bar")) == 31
+    assert planner.plan_dates(first, last, "2024-3-5", None) == []
+
+def test_filters_are_pushed_into_generation_with_exact_sizes():
+    today = date.today()
+    start = (today - timedelta(days=10)).isoformat()
+    end = (today - timedelta(days=5)).isoformat()
+
+    for _ in range(5):
+        earnings = generate_mock_earnings_data("tech", "negative", start, end)
+        assert len(earnings) == 50
+        assert all(row["earnings_surprise"] <= 0 and start <= row["report_date"] <= end for row in earnings)
+
+        trades = generate_mock_congress_trades(None, "Jane Doe", start, end)
+        assert len(trades) == 20
+        assert {row["congress_member"] for row in trades} == {"Jane Doe"}
+
+        insider = generate_mock_insider_data("CFO", "sell", start, end)
+        assert 30 <= len(insider) <= 90
+        assert all(start <= row["trade_date"] <= end for row in insider)
+        assert {(row["insider_role"], row["trade_type"]) for row in insider} == {("CFO", "sell")}
+
+    greek = generate_mock_greek_flow("AAPL", start, end)
+    assert len(greek) == 6 and all(start <= row["date"] <= end for row in greek)
+
+def test_out_of_range_filters_generate_nothing():
+    future = (date.today() + timedelta(days=5)).isoformat()
+    assert generate_mock_earnings_data(None, None, future, None) == []
+    assert generate_mock_insider_data(None, None, future, None) == []
+    data, _ = generate_mock_premium_flow(None, None, future, (date.today() + timedelta(days=1)).isoformat(), is_intraday=True)
+    assert data == []
@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.services import executors, insights, market_calendar, market_tide, premium_flow
+from app.services.projection import parse_fields, project
+
+POINTS = [
+    {"date": "2024-03-01", "net_call_premium": "10", "net_put_premium": "4", "net_volume": "1", "timestamp": "2024-03-01T14:31:00Z"},
+    {"date": "2024-03-01", "net_call_premium": "5", "net_put_premium": "1", "net_volume": "2", "timestamp": "2024-03-01T14:30:00Z"}
+]
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields(" , ") is None
+    assert parse_fields("market_time, net_premium") == {"market_time", "net_premium"}
+
+def test_market_tide_skips_unrequested_derived_fields(monkeypatch):
+    def fail():
+        raise AssertionError("timezone should not be loaded")
+
+    monkeypatch.setattr(market_tide, "get_market_tz", fail)
+    rows = market_tide.add_cumulative_tide(POINTS, frozenset({"net_premium"}))
+    assert [row["net_premium"] for row in rows] == [4.0, 10.0]
+    assert "market_time" not in rows[0] and "cumulative_call_premium" not in rows[0]
+    assert project(rows, frozenset({"net_premium"})) == [{"net_premium": 4.0}, {"net_premium": 10.0}]
+
+def test_market_tide_builds_every_field_by_default():
+    rows = market_tide.add_cumulative_tide(POINTS)
+    assert rows[0]["market_time"] == "2024-03-01 09:30:00"
+    assert rows[1]["cumulative_call_premium"] == 15.0
+
+def test_premium_flow_generator_honours_fields():
+    fields = frozenset({"premium", "net_premium"})
+    day = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    data, stats = premium_flow.generate_mock_premium_flow(
+        sector="tech", start_date=day, is_intraday=True, fields=fields
+    )
+    assert data and all("avg_strike" not in row and "market_time" not in row for row in data)
+    assert all("net_premium" in row and "cumulative_call_premium" not in row for row in data)
+    # Aggregates still see the raw fields
+    assert stats["max_call_premium"] > 0
+
+def test_premium_flow_builds_only_the_requested_fields(monkeypatch):
+    def fail():
+        raise AssertionError("timezone should not be loaded")
+
+    monkeypatch.setattr(executors, "EXECUTOR_MODE", "inline")
+    day = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    with monkeypatch.context() as patched:
+        patched.setattr(premium_flow, "get_market_tz", fail)
+        patched.setattr(market_calendar, "get_market_tz", fail)
+        data, stats = asyncio.run(premium_flow.get_premium_flow(
+            sector="tech", start_date=day, is_intraday=True, fields=frozenset({"premium"})
+        ))
+    derived = {"market_time", "cumulative_call_premium", "cumulative_put_premium", "net_premium", "net_volume", "avg_strike"}
+    assert data and all(derived.isdisjoint(row.keys()) for row in data)
+    # The insight reads the raw fields, so it matches the one over every field
+    full, _ = premium_flow.add_cumulative_flow(data)
+    assert insights.generate_premium_flow_insight(data, stats, True) == insights.generate_premium_flow_insight(full, stats, True)
+    assert "As of " in insights.generate_premium_flow_insight(data, stats, True)
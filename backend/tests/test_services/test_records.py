@@ -0,0 +1,46 @@
+import pickle
+import sys
+from app.responses import dumps
+from app.services.columnar import to_columnar
+from app.services.projection import project
+from app.services.records import MISSING, FlowPoint, TidePoint
+
+ROW = {
+    "date": "2024-03-15",
+    "net_call_premium": "1.5",
+    "net_put_premium": "-2.5",
+    "net_volume": "10",
+    "timestamp": "2024-03-15T13:30:00Z"
+}
+
+def test_records_read_like_the_dicts_they_replace():
+    point = TidePoint.from_dict(ROW)
+    point.net_premium = 4.0
+    assert point == {**ROW, "net_premium": 4.0}
+    assert point["net_call_premium"] == "1.5"
+    assert point.get("market_time") is None and point.get("market_time", "") == ""
+    assert "net_premium" in point and "market_time" not in point
+    assert list(point) == [*ROW, "net_premium"]
+    assert len(point) == 6
+    assert str([point]) == str([{**ROW, "net_premium": 4.0}])
+
+def test_missing_fields_are_left_out_of_serialized_output():
+    point = FlowPoint("tech", "call", 100.0, 5, "2024-03-15")
+    assert point.timestamp is MISSING
+    assert dumps([point]) == dumps([{"sector": "tech", "option_type": "call", "premium": 100.0, "volume": 5, "date": "2024-03-15"}])
+    assert project([point], frozenset({"premium", "timestamp"})) == [{"premium": 100.0}]
+    assert to_columnar([point])["columns"]["premium"] == [100.0]
+
+def test_unknown_keys_survive_the_round_trip():
+    point = TidePoint.from_dict({**ROW, "source": "upstream"})
+    point["note"] = "x"
+    assert point["source"] == "upstream"
+    assert point.to_dict() == {**ROW, "source": "upstream", "note": "x"}
+    assert project([point], frozenset({"date", "note"})) == [{"date": "2024-03-15", "note": "x"}]
+    copied = pickle.loads(pickle.dumps(point.copy()))
+    assert copied == point
+    assert copied.cumulative_call_premium is MISSING
+
+def test_records_are_smaller_than_dicts():
+    point = FlowPoint("tech", "call", 100.0, 5, "2024-03-15", "2024-03-15T13:30:00Z", MISSING, 100, 30, 1.0, 0.0, 1.0, 5, "x")
+    assert sys.getsizeof(point) < sys.getsizeof(point.to_dict()) / 3
@@ -0,0 +1,58 @@
+import asyncio
+from datetime import date, datetime
+from app.services import market_calendar
+from app.services.cache import TTLCache, is_refreshing
+from app.services.scheduler import Job, PrewarmScheduler
+
+def at(*args):
+    return market_calendar.get_market_tz().localize(datetime(*args))
+
+def test_holidays_and_early_closes():
+    assert not market_calendar.is_trading_day(date(2024, 3, 29))  # Good Friday
+    assert not market_calendar.is_trading_day(date(2026, 7, 3))  # July 4th observed
+    assert market_calendar.is_trading_day(date(2024, 7, 3))
+    assert market_calendar.session_bounds(date(2024, 7, 3))[1].hour == 13
+    assert market_calendar.session_bounds(date(2024, 12, 28)) is None  # Saturday
+
+def test_market_hours_and_next_open():
+    assert market_calendar.is_market_open(at(2024, 1, 2, 10, 0))
+    assert not market_calendar.is_market_open(at(2024, 1, 2, 16, 0))
+    # Friday after the close rolls over the weekend to Monday's open
+    assert market_calendar.next_open(at(2024, 1, 5, 17, 0)) == at(2024, 1, 8, 9, 30)
+
+def test_scheduler_waits_for_open_and_respects_interval():
+    now = [at(2024, 1, 6, 12, 0)]  # Saturday
+    job = Job("tide", 60, lambda: None)
+    scheduler = PrewarmScheduler([job], clock=lambda: now[0])
+    assert scheduler.seconds_until_next_run(job) == 900
+
+    now[0] = at(2024, 1, 8, 10, 0)
+    assert scheduler.seconds_until_next_run(job) == 0
+    job.last_run = at(2024, 1, 8, 9, 59, 30)
+    assert scheduler.seconds_until_next_run(job) == 30
+
+def test_run_once_bypasses_cache_reads():
+    seen = []
+
+    async def run():
+        seen.append(is_refreshing())
+
+    job = Job("tide", 60, run)
+    scheduler = PrewarmScheduler([job], clock=lambda: at(2024, 1, 8, 10, 0))
+    asyncio.run(scheduler.run_once(job))
+    assert seen == [True]
+    assert job.last_run == at(2024, 1, 8, 10, 0)
+    assert not is_refreshing()
+
+def test_ttl_cache_expiry_and_lru(monkeypatch):
+    cache = TTLCache(default_ttl=10, max_entries=2)
+    clock = [1000.0]
+    monkeypatch.setattr("app.services.cache.time.time", lambda: clock[0])
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=None)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None  # evicted as least recently used
+    clock[0] += 11
+    assert cache.get("a") is None
+    assert cache.get("c") is None
@@ -0,0 +1,85 @@
+import asyncio
+import gc
+import time
+from datetime import date
+from app.services import synthetic, unusual_whales
+from app.services.mock_data import MOCK_CONGRESS_MEMBERS, generate_mock_congress_trades, mock_congress_tickers
+from app.services.search import SearchIndex
+from app.services.trade_store import TradeStore
+
+END = date(2024, 3, 15)
+
+def values(results):
+    return [result["value"] for result in results]
+
+def test_typos_and_prefixes_find_mock_members():
+    index = SearchIndex()
+    index.add_trades(generate_mock_congress_trades())
+    assert values(index.search("Robret Jonson", kind="member"))[0] == "Robert Johnson"
+    assert values(index.search("rob"))[0] == "Robert Johnson"
+    assert values(index.search("  JANE   doe"))[0] == "Jane Doe"
+    # Every typed word starting a word of the name counts before fuzzy matches
+    assert values(index.search("will ma"))[0] == "Mary Williams"
+    assert index.search("zzzz") == []
+
+def test_tickers_are_found_by_symbol_and_company_name():
+    index = SearchIndex()
+    index.add_trades([{"reporter": "Jane Doe", "ticker": "AAPL", "transaction_date": "2024-03-01"}])
+    assert index.search("aapl")[0] == {"kind": "ticker", "value": "AAPL", "trades": 1, "name": "Apple"}
+    assert values(index.search("appel", kind="ticker")) == ["AAPL"]
+    assert values(index.search("aapl", kind="member")) == []
+
+def test_activity_ranks_matches_and_new_reporters_are_added_in_place():
+    index = SearchIndex()
+    index.add("member", "John Smith", 3)
+    index.add("member", "John Smithers", 10)
+    # Equal matches rank by trades; an exact name still comes first
+    assert values(index.search("john smi")) == ["John Smithers", "John Smith"]
+    assert values(index.search("john smith")) == ["John Smith", "John Smithers"]
+
+    assert index.search("ann") == []
+    index.add_trades([{"congress_member": "Ann Lee", "ticker": "MSFT", "trade_date": "2024-03-01"}] * 2)
+    assert index.search("ann") == [{"kind": "member", "value": "Ann Lee", "trades": 2}]
+    index.add("member", "ann lee ")
+    assert index.search("ann")[0]["trades"] == 3 and len(index) == 4
+
+def test_queries_answer_in_microseconds():
+    index = SearchIndex()
+    index.add_trades(synthetic.generate("congress_recent_trades", 20_000, seed=9, end_date=END))
+    for member in range(2000):
+        index.add("member", f"Member {member:04d} Rep{member}")
+    queries = ["jon", "jane do", "robret johnsn", "aap", "micro", "rep17", "member 019"]
+    # A full collection over whatever earlier tests left behind is not search time
+    gc.collect()
+    started = time.perf_counter()
+    for query in queries:
+        index.search(query)
+    assert (time.perf_counter() - started) / len(queries) < 0.002
+    # Repeated keystrokes are served from the result cache
+    started = time.perf_counter()
+    for _ in range(100):
+        for query in queries:
+            index.search(query)
+    assert (time.perf_counter() - started) / (100 * len(queries)) < 0.00005
+
+def test_mock_fallback_indexes_only_its_fixed_roster(monkeypatch):
+    index = SearchIndex()
+    monkeypatch.setattr(unusual_whales, "congress_search", index)
+    monkeypatch.setattr(unusual_whales, "congress_store", TradeStore("congress_trades"))
+
+    async def failing_request(endpoint, params):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(unusual_whales, "make_api_request", failing_request)
+
+    async def run():
+        for _ in range(3):
+            await unusual_whales.get_congress_rows(ticker="ZZZQ", congress_member="Robrt Jonson")
+            await unusual_whales.get_congress_rows()
+
+    asyncio.run(run())
+    # A caller's typo is never suggested, and repeated mock calls add no activity
+    assert index.search("rob", kind="member") == [{"kind": "member", "value": "Robert Johnson", "trades": 0}]
+    assert index.search("zzzq") == []
+    assert len(index) == len(MOCK_CONGRESS_MEMBERS) + len(mock_congress_tickers())
+    assert all(entry.trades == 0 for entry in index.entries)
@@ -0,0 +1,53 @@
+import time
+from app.services import snapshot
+from app.services.cache import TTLCache
+
+def test_snapshot_round_trip_restores_lazily(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.snapshot")
+    source = {"responses": TTLCache(60), "insights": TTLCache(None)}
+    source["responses"].set("tide", {"data": [{"net_volume": "10"}]})
+    source["responses"].set("stale", {"data": []}, ttl=-30)
+    source["insights"].set("insight", "30-day High: $1.0M.")
+    monkeypatch.setattr(snapshot, "_restored", None)
+    written = snapshot.write_snapshot(snapshot.collect_entries(source), path)
+    assert written == 2
+
+    target = {"responses": TTLCache(60), "insights": TTLCache(None)}
+    restored = snapshot.restore(path, target)
+    assert restored is not None
+    assert len(target["responses"]) == 0  # nothing decoded yet
+    assert target["responses"].get("tide") == {"data": [{"net_volume": "10"}]}
+    assert target["responses"].get("stale") is None
+    assert target["insights"].get("insight") == "30-day High: $1.0M."
+
+    # Untouched restored entries survive the next snapshot
+    next_path = str(tmp_path / "next.snapshot")
+    snapshot.write_snapshot(snapshot.collect_entries(target), next_path)
+    assert snapshot.Snapshot(next_path).lookup("insights", "insight")[1] == "30-day High: $1.0M."
+    restored.close()
+
+def test_deleted_and_cleared_keys_stay_gone(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.snapshot")
+    monkeypatch.setattr(snapshot, "_restored", None)
+    snapshot.write_snapshot({"responses": [("a", None, 1), ("b", None, 2)], "insights": [("c", None, 3)]}, path)
+    target = {"responses": TTLCache(60), "insights": TTLCache(None)}
+    restored = snapshot.restore(path, target)
+    monkeypatch.setattr(snapshot, "_restored", restored)
+
+    target["responses"].delete("a")
+    target["insights"].clear()
+    assert target["responses"].get("a") is None and target["insights"].get("c") is None
+    assert target["responses"].get("b") == 2
+    entries = snapshot.collect_entries(target)
+    assert [key for key, _, _ in entries["responses"]] == ["b"] and entries["insights"] == []
+    # A key set again after its delete is served as usual
+    target["responses"].set("a", 4)
+    assert target["responses"].get("a") == 4
+    restored.close()
+
+def test_old_snapshot_is_ignored(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.snapshot")
+    monkeypatch.setattr(snapshot, "_restored", None)
+    snapshot.write_snapshot({"responses": [("k", None, {"a": 1})]}, path)
+    monkeypatch.setattr(snapshot.time, "time", lambda: time.monotonic() + 10 ** 10)
+    assert snapshot.restore(path, {"responses": TTLCache(60)}) is None
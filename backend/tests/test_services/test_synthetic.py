@@ -0,0 +1,51 @@
+from datetime import date
+from app.services import synthetic
+
+END = date(2024, 3, 15)
+
+def test_same_seed_gives_same_rows_whatever_the_chunk_size():
+    for dataset in synthetic.DATASETS:
+        whole = synthetic.generate(dataset, 9000, seed=7, end_date=END)
+        chunks = list(synthetic.stream(dataset, 9000, seed=7, chunk_size=1000, end_date=END))
+        assert len(whole) == 9000
+        assert [len(chunk) for chunk in chunks] == [1000] * 9
+        assert [row for chunk in chunks for row in chunk] == whole
+        assert synthetic.generate(dataset, 100, seed=8, end_date=END) != whole[:100]
+
+def test_time_series_rows_are_consecutive_minutes_ending_at_the_close():
+    rows = synthetic.generate("market_tide", 1000, seed=1, end_date=END)
+    timestamps = [row["timestamp"] for row in rows]
+    assert timestamps == sorted(timestamps)
+    assert len(set(timestamps)) == 1000
+    # 2024-03-15 is after the DST switch, so the 16:00 ET close is 20:00 UTC
+    assert timestamps[-1] == "2024-03-15T19:59:00Z"
+    assert {row["date"] for row in rows} <= {"2024-03-12", "2024-03-13", "2024-03-14", "2024-03-15"}
+
+def test_premium_flow_follows_the_intraday_volume_curve():
+    # Twenty full sessions, all within daylight saving time
+    rows = synthetic.generate("premium_flow", 12 * 390 * 20, seed=2, end_date=date(2024, 7, 31))
+    by_minute = {}
+    for row in rows:
+        minute = row["timestamp"][11:16]
+        by_minute[minute] = by_minute.get(minute, 0) + row["volume"]
+    open_volume = by_minute["13:30"]
+    midday_volume = by_minute["17:00"]
+    assert open_volume > 2 * midday_volume
+
+def test_event_rows_use_the_universe_with_fat_tailed_amounts():
+    universe = synthetic.build_universe(2000, seed=3)
+    assert len(universe) == len(set(universe.tickers)) == 2000
+    rows = synthetic.generate("congress", 50_000, seed=3, universe=universe, end_date=END, days=20)
+    tickers = {row["ticker"] for row in rows}
+    assert len(tickers) > 500
+    assert all(row["disclosure_date"] > row["trade_date"] for row in rows)
+    amounts = sorted(row["amount"] for row in rows)
+    median = amounts[len(amounts) // 2]
+    assert amounts[int(len(amounts) * 0.999)] > 50 * median
+
+def test_insider_sector_volume_carries_across_blocks():
+    rows = synthetic.generate("insider", synthetic.BLOCK_ROWS * 2 + 10, seed=4, end_date=END)
+    totals = {}
+    for row in rows:
+        totals[row["sector"]] = totals.get(row["sector"], 0) + row["amount"]
+        assert row["sector_volume"] == totals[row["sector"]]
@@ -0,0 +1,90 @@
+import csv
+import os
+from app.services import insights, synthetic, tickers
+from app.services.earnings import generate_mock_earnings_data
+from app.services.greek_flow import generate_mock_greek_flow
+from app.services.insider_trading import generate_mock_insider_data
+from app.services.mock_data import generate_mock_congress_trades
+from app.services.premium_flow import generate_mock_premium_flow
+
+def write_universe(path, size, sector_override=None):
+    universe = synthetic.build_universe(size, seed=5)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ticker", "name", "sector", "industry", "market_cap"])
+        for rank, ticker in enumerate(universe.tickers):
+            sector = sector_override or universe.sector_of[ticker]
+            writer.writerow([ticker, f"{ticker} Inc", sector, f"{sector.title()} {rank % 7}", "large" if rank < 100 else "small"])
+    return universe
+
+def test_bundled_file_covers_the_six_sectors():
+    registry = tickers.read(tickers.TICKER_METADATA_PATH)
+    assert len(registry) > 500
+    assert set(registry.sectors) == {"tech", "healthcare", "energy", "finance", "consumer", "industrial"}
+    assert registry.lookup("aapl ") == {
+        "ticker": "AAPL", "name": "Apple", "sector": "tech", "industry": "Hardware", "market_cap": "mega"
+    }
+    assert registry.sector("NOPE") == "other"
+    assert registry.market_cap("NOPE") is None
+    assert list(registry.lookup_many(["XOM", "NOPE", "CAT"])) == ["XOM", "CAT"]
+
+def test_thousands_of_symbols_share_interned_columns(tmp_path):
+    path = tmp_path / "tickers.csv"
+    universe = write_universe(path, 5000)
+    registry = tickers.read(str(path))
+
+    assert len(registry) == 5000
+    assert registry.sectors_of(universe.tickers) == [universe.sector_of[ticker] for ticker in universe.tickers]
+    first, last = universe.sectors["tech"][0], universe.sectors["tech"][-1]
+    assert registry.industry(first) is registry.industry(first) and registry.sector(first) is registry.sector(last)
+    assert registry.tickers_in("tech") == universe.sectors["tech"]
+    assert set(registry.tickers_in("tech", ("large",))) == set(universe.sectors["tech"]) & set(universe.tickers[:100])
+
+def test_registry_reloads_when_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "tickers.csv"
+    write_universe(path, 2000)
+    monkeypatch.setattr(tickers, "TICKER_METADATA_PATH", str(path))
+    monkeypatch.setattr(tickers, "_registry", None)
+    monkeypatch.setattr(tickers, "RELOAD_INTERVAL", 0.001)
+
+    loaded = tickers.get_registry()
+    assert tickers.get_registry() is loaded
+
+    write_universe(path, 3000, sector_override="energy")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    monkeypatch.setattr(tickers, "_next_check", 0.0)
+    reloaded = tickers.get_registry()
+    assert reloaded is not loaded
+    assert len(reloaded) == 3000 and reloaded.sectors == ["energy"]
+
+    # A missing file keeps what was loaded
+    os.remove(path)
+    monkeypatch.setattr(tickers, "_next_check", 0.0)
+    assert tickers.get_registry() is reloaded
+    assert tickers.reload(str(path)) is reloaded
+
+def test_congress_insight_sectors_come_from_the_registry(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(insights, "generate_insight", lambda summary, context: captured.setdefault("summary", summary))
+    trades = [
+        {"ticker": ticker, "reporter": "Jane Doe", "amounts": "$15,001 - $50,000", "txn_type": "Buy", "transaction_date": "2024-03-01"}
+        for ticker in ["CAT", "NEE", "ZZZZ"]
+    ]
+    insights.generate_congress_trades_insight(trades)
+    # Tickers outside the old hand-kept map are now placed; unknown ones still stay out
+    assert {entry["sector"] for entry in captured["summary"]["sector_summary"]} == {"industrial", "energy"}
+
+def test_mocks_draw_tickers_from_the_registry():
+    registry = tickers.get_registry()
+    for row in generate_mock_insider_data() + generate_mock_earnings_data():
+        assert registry.sector(row["ticker"]) == row["sector"]
+        assert registry.market_cap(row["ticker"]) in tickers.MOCK_MARKET_CAPS
+    for row in generate_mock_congress_trades() + generate_mock_greek_flow():
+        assert registry.market_cap(row["ticker"]) in tickers.MOCK_MARKET_CAPS
+    flow, _ = generate_mock_premium_flow()
+    assert {row["sector"] for row in flow} == set(registry.sectors)
+    # Cap-filtered lists are built with the registry, not on first use
+    assert registry.tickers_in(None, tickers.MOCK_MARKET_CAPS) is registry.tickers_in(None, tickers.MOCK_MARKET_CAPS)
+    assert set(registry.tickers_in("energy", ("mega", "mid"))) == set(registry.tickers_in("energy", ("mega",)) + registry.tickers_in("energy", ("mid",)))
+    assert {row["sector"] for row in generate_mock_earnings_data(sector="consumer")} == {"consumer"}
@@ -0,0 +1,164 @@
+import asyncio
+import itertools
+import time
+from datetime import date
+from app.services import synthetic, unusual_whales
+from app.services.pagination import row_id
+from app.services.tickers import get_registry
+from app.services.trade_store import TradeStore
+
+END = date(2024, 3, 15)
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def unique(rows):
+    seen = set()
+    return [row for row in rows if not (row_id(row) in seen or seen.add(row_id(row)))]
+
+def newest_first(rows, field):
+    # Same-day rows come latest added first, as the store returns them
+    return sorted(rows, key=lambda row: row[field])[::-1]
+
+def brute_force(rows, start_date=None, end_date=None, ticker=None, member=None, sector=None, category=None):
+    """Matching rows in the order the store gives them, for rows already deduplicated"""
+    registry = get_registry()
+    matches = [
+        row for row in rows
+        if (not start_date or row["transaction_date"] >= start_date)
+        and (not end_date or row["transaction_date"] <= end_date)
+        and (not ticker or row["ticker"] == ticker)
+        and (not member or row["reporter"].lower() == member.lower())
+        and (not sector or registry.sector(row["ticker"]) == sector)
+        and (not category or row["txn_type"].lower() == category)
+    ]
+    return newest_first(matches, "transaction_date")
+
+def test_indexed_queries_match_a_full_scan():
+    rows = synthetic.generate("congress_recent_trades", 50_000, seed=4, end_date=END)
+    store = TradeStore("congress_trades")
+    store.add(rows[:30_000])
+    # A later batch reaching back before the newest rows is merged into the date index
+    store.add(rows[20_000:])
+    rows = unique(rows)
+    assert len(store) == len(rows)
+
+    combinations = list(itertools.product(
+        [None, "2024-02-01"], [None, "2024-02-20"], [None, "AAPL"], [None, "jane doe "], [None, "tech"], [None, "Sell"]
+    ))
+    for start_date, end_date, ticker, member, sector, category in combinations:
+        got = store.query(start_date, end_date, ticker=ticker, member=member, sector=sector, category=category)
+        assert got == brute_force(rows, start_date, end_date, ticker, member.strip() if member else None, sector,
+                                  category.lower() if category else None)
+    assert store.query(ticker="NOPE") == []
+
+    # A few late rows are slotted into the existing lists
+    late = [{**row, "reporter": "Jane Doe"} for row in synthetic.generate("congress_recent_trades", 20, seed=5, end_date=END)]
+    store.add(late)
+    rows += late
+    assert store.query() == brute_force(rows)
+    assert store.query("2024-02-01", member="Jane Doe") == brute_force(rows, "2024-02-01", member="Jane Doe")
+
+    # A member or ticker filter touches only its own rows, whatever the store holds
+    selective = [combination for combination in combinations if combination[2] or combination[3]]
+    started = time.perf_counter()
+    for start_date, end_date, ticker, member, sector, category in selective:
+        store.query(start_date, end_date, ticker=ticker, member=member, sector=sector, category=category)
+    assert (time.perf_counter() - started) / len(selective) < 0.001
+
+def test_coverage_follows_complete_refreshes():
+    clock = Clock()
+    store = TradeStore("congress_trades", max_age=60, clock=clock)
+    first = [{"ticker": "AAPL", "reporter": "Jane Doe", "txn_type": "Buy", "transaction_date": f"2024-03-{day:02d}"} for day in range(1, 11)]
+    assert not store.covers()
+
+    store.add(first[5:], complete=True)
+    assert store.covers() and store.covers("2024-03-06") and not store.covers("2024-03-05")
+    # Filtered fetches add rows but do not extend coverage
+    store.add(first[:5])
+    assert not store.covers("2024-03-05")
+    # An unbroken run of refreshes keeps what earlier ones covered
+    clock.now = 30
+    assert store.add(first[4:], complete=True) == []
+    assert store.covers("2024-03-05")
+
+    clock.now = 91
+    assert not store.covers()
+    store.add(first[8:], complete=True)
+    assert store.covers("2024-03-09") and not store.covers("2024-03-05")
+
+def test_store_keeps_the_newest_rows_within_its_limit():
+    store = TradeStore("insider_trades", max_rows=100)
+    rows = synthetic.generate("insider", 250, seed=6, end_date=END)
+    store.replace(rows)
+    kept = store.query()
+    assert kept == newest_first(unique(rows), "trade_date")[:90]
+    assert store.covered_from == kept[-1]["trade_date"]
+    assert sum(store.counts("member").values()) == 90
+
+def test_repeated_queries_return_the_same_rows_until_the_store_changes():
+    store = TradeStore("congress_trades")
+    rows = synthetic.generate("congress_recent_trades", 500, seed=9, end_date=END)
+    member, day = rows[0]["reporter"], rows[0]["transaction_date"]
+    store.add(rows[:400])
+    first = store.query(day, member=member)
+    assert first and store.query(day, member=f" {member.upper()} ") is first
+    # Rows already held change nothing; new ones give a new result
+    store.add(rows[:10])
+    assert store.query(day, member=member) is first
+    store.add(rows[400:])
+    assert store.query(day, member=member) is not first
+    assert store.query() == brute_force(unique(rows))
+
+def test_filtered_congress_requests_are_answered_without_upstream(monkeypatch):
+    rows = synthetic.generate("congress_recent_trades", 5000, seed=8, end_date=END)
+    store = TradeStore("congress_trades")
+    monkeypatch.setattr(unusual_whales, "congress_store", store)
+    calls = []
+
+    async def fake_request(endpoint, params):
+        calls.append(params)
+        return {"data": rows}
+
+    async def no_store(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(unusual_whales, "make_api_request", fake_request)
+    monkeypatch.setattr(unusual_whales.persistence, "store_rows", no_store)
+
+    async def run():
+        everything = await unusual_whales.get_congress_rows()
+        picked = await unusual_whales.get_congress_rows(ticker="MSFT", start_date="2024-03-01", sector="tech")
+        return everything, picked
+
+    everything, picked = asyncio.run(run())
+    assert everything is rows and len(calls) == 1
+    assert picked == brute_force(unique(rows), "2024-03-01", None, "MSFT", None, "tech")
+    assert picked
+
+def test_sector_filter_matches_alike_on_fetch_and_store(monkeypatch):
+    rows = synthetic.generate("congress_recent_trades", 2000, seed=10, end_date=END)
+    monkeypatch.setattr(unusual_whales, "congress_store", TradeStore("congress_trades"))
+
+    async def fake_request(endpoint, params):
+        return {"data": rows}
+
+    async def no_store(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(unusual_whales, "make_api_request", fake_request)
+    monkeypatch.setattr(unusual_whales.persistence, "store_rows", no_store)
+
+    async def run():
+        # The first request is fetched, after which the store covers the second
+        fetched = await unusual_whales.get_congress_rows(sector=" Tech")
+        stored = await unusual_whales.get_congress_rows(sector="TECH")
+        return fetched, stored
+
+    fetched, stored = asyncio.run(run())
+    expected = brute_force(unique(rows), sector="tech")
+    assert expected and sorted(map(row_id, fetched)) == sorted(map(row_id, stored)) == sorted(map(row_id, expected))
@@ -0,0 +1,5 @@
+from benchmarks.startup import LAZY_MODULES, eagerly_imported
+
+def test_app_import_defers_heavy_dependencies():
+    assert LAZY_MODULES
+    assert eagerly_imported() == []